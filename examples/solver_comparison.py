@@ -13,16 +13,12 @@
 
 import os
 import sys
-import time
-import pickle
 import numpy as np
 from math import pi
 import matplotlib.pyplot as plt
 
-from hyppopy.SolverPool import SolverPool
-from hyppopy.HyppopyProject import HyppopyProject
 from hyppopy.FunctionSimulator import FunctionSimulator
-from hyppopy.BlackboxFunction import BlackboxFunction
+from hyppopy.benchmark.ComparisonRunner import ComparisonRunner
 
 OUTPUTDIR = os.path.abspath(os.path.join(os.path.dirname(__file__), *("solver_comparison", "gfx")))
 
@@ -45,29 +41,22 @@ ITERATIONS.append(1000)
 # plottet are the mean and std dev of these independent trials
 STATREPEATS = 50
 
-# evaluations are stored using pickle, if OVERWRITE is True these
-# are ignored and overwritten each time, set to False when only the
-# plottings need to be re-evaluated
-OVERWRITE = False
+# number of worker processes the independent repeats are distributed
+# to, None uses all cores
+PROCESSES = None
 
+# each finished repeat is appended to a json lines file, a restarted
+# comparison only computes the missing repeats. If OVERWRITE is True
+# the file is deleted and all repeats are computed again, set to False
+# when only the plottings need to be re-evaluated
+OVERWRITE = False
 
-def compute_deviation(solver_name, vfunc_id, iterations, N, fname):
-    project = HyppopyProject()
-    project.add_hyperparameter(name="axis_00", domain="uniform", data=[0, 1], type=float)
-    project.add_hyperparameter(name="axis_01", domain="uniform", data=[0, 1], type=float)
-    project.add_hyperparameter(name="axis_02", domain="uniform", data=[0, 1], type=float)
-    project.add_hyperparameter(name="axis_03", domain="uniform", data=[0, 1], type=float)
-    project.add_hyperparameter(name="axis_04", domain="uniform", data=[0, 1], type=float)
 
+def compute_deviation(records, solver_name, vfunc_id, iterations):
     vfunc = FunctionSimulator()
     vfunc.load_default(vfunc_id)
     minima = vfunc.minima()
 
-    def my_loss_function(data, params):
-        return vfunc(**params)
-
-    blackbox = BlackboxFunction(data=[], blackbox_func=my_loss_function)
-
     results = {}
     results["gt"] = []
     for mini in minima:
@@ -77,61 +66,22 @@ def compute_deviation(solver_name, vfunc_id, iterations, N, fname):
         results[iter] = {"minima": {},
                          "distance": {},
                          "duration": None,
-                         "set_difference": None,
                          "loss": None,
                          "loss_history": {}}
-        for i in range(vfunc.dims()):
-            results[iter]["minima"]["axis_0{}".format(i)] = []
-            results[iter]["distance"]["axis_0{}".format(i)] = []
-
-        project.add_setting("max_iterations", iter)
-        project.add_setting("solver", solver_name)
+        runs = [r for r in records if r["solver"] == solver_name and r["function"] == vfunc_id and
+                r["iterations"] == iter and "error" not in r]
+        runs.sort(key=lambda r: r["repeat"])
 
-        solver = SolverPool.get(project=project)
-        solver.blackbox = blackbox
-
-        axis_minima = []
-        best_losses = []
-        best_sets_diff = []
-        for i in range(vfunc.dims()):
-            axis_minima.append([])
-
-        loss_history = []
-        durations = []
-        for n in range(N):
-            print("\rSolver={} iteration={} round={}".format(solver, iter, n), end="")
-
-            start = time.time()
-            solver.run(print_stats=False)
-            end = time.time()
-            durations.append(end-start)
-
-            df, best = solver.get_results()
-
-            loss_history.append(np.flip(np.sort(df['losses'].values)))
-            best_row = df['losses'].idxmin()
-            best_losses.append(df['losses'][best_row])
-            best_sets_diff.append(abs(df['axis_00'][best_row] - best['axis_00'])+
-                                  abs(df['axis_01'][best_row] - best['axis_01'])+
-                                  abs(df['axis_02'][best_row] - best['axis_02'])+
-                                  abs(df['axis_03'][best_row] - best['axis_03'])+
-                                  abs(df['axis_04'][best_row] - best['axis_04']))
-            for i in range(vfunc.dims()):
-                tmp = df['axis_0{}'.format(i)][best_row]
-                axis_minima[i].append(tmp)
-
-        results[iter]["loss_history"] = loss_history
+        results[iter]["loss_history"] = [np.flip(np.sort(r["losses"])) for r in runs]
         for i in range(vfunc.dims()):
-            results[iter]["minima"]["axis_0{}".format(i)] = [np.mean(axis_minima[i]), np.std(axis_minima[i])]
-            dist = np.sqrt((axis_minima[i]-results["gt"][i])**2)
+            axis_minima = np.array([r["best"]["axis_0{}".format(i)] for r in runs])
+            results[iter]["minima"]["axis_0{}".format(i)] = [np.mean(axis_minima), np.std(axis_minima)]
+            dist = np.sqrt((axis_minima-results["gt"][i])**2)
             results[iter]["distance"]["axis_0{}".format(i)] = [np.mean(dist), np.std(dist)]
+        best_losses = [r["best_loss"] for r in runs]
         results[iter]["loss"] = [np.mean(best_losses), np.std(best_losses)]
-        results[iter]["set_difference"] = sum(best_sets_diff)
-        results[iter]["duration"] = np.mean(durations)
-
-    file = open(fname, 'wb')
-    pickle.dump(results, file)
-    file.close()
+        results[iter]["duration"] = np.mean([r["duration"] for r in runs])
+    return results
 
 
 def make_radarplot(results, title, fname=None):
@@ -331,23 +281,20 @@ if __name__ == "__main__":
 
     ##################################################
     ############### create datasets ##################
-    fnames = []
-    for solver_name in SOLVER:
-        fname = os.path.join(OUTPUTDIR, solver_name)
-        fnames.append(fname)
-        if OVERWRITE or not os.path.isfile(fname):
-            compute_deviation(solver_name, vfunc_ID, ITERATIONS, N=STATREPEATS, fname=fname)
+    fname = os.path.join(OUTPUTDIR, "comparison.jsonl")
+    if OVERWRITE and os.path.isfile(fname):
+        os.remove(fname)
+    runner = ComparisonRunner(fname, SOLVER, [vfunc_ID], ITERATIONS, repeats=STATREPEATS, processes=PROCESSES)
+    records = runner.run()
     ##################################################
     ##################################################
 
     ##################################################
     ############## create radarplots #################
     all_results = {}
-    for solver_name, fname in zip(SOLVER, fnames):
-        file = open(fname, 'rb')
-        results = pickle.load(file)
-        file.close()
-        make_radarplot(results, solver_name, fname + "_deviation")
+    for solver_name in SOLVER:
+        results = compute_deviation(records, solver_name, vfunc_ID, ITERATIONS)
+        make_radarplot(results, solver_name, os.path.join(OUTPUTDIR, solver_name) + "_deviation")
         all_results[solver_name] = results
 
     fname = os.path.join(OUTPUTDIR, "errorbars")
@@ -358,11 +305,6 @@ if __name__ == "__main__":
 
     fname = os.path.join(OUTPUTDIR, "durations")
     print_durations(all_results, fname)
-
-    for solver_name, iterations in all_results.items():
-        for iter, numbers in iterations.items():
-            if numbers["set_difference"] != 0:
-                print("solver {} has a different parameter set match in iteration {}".format(solver_name, iter))
     ##################################################
     ##################################################
 
@@ -10,12 +10,16 @@
 #
 # See LICENSE
 
-__all__ = ['BlackboxFunction']
+__all__ = ['BlackboxFunction', 'resolve_call_convention', 'call_with_params', 'load_array']
 
 import os
+import inspect
 import logging
+import datetime
 import functools
+import numpy as np
 from hyppopy.globals import DEBUGLEVEL
+from hyppopy.CandidateDescriptor import CandidateBatch
 
 LOG = logging.getLogger(os.path.basename(__file__))
 LOG.setLevel(DEBUGLEVEL)
@@ -29,14 +33,119 @@ def default_kwargs(**defaultKwargs):
     def actual_decorator(fn):
         @functools.wraps(fn)
         def g(*args, **kwargs):
-            defaultKwargs.update(kwargs)
-            return fn(*args, **defaultKwargs)
+            actualKwargs = dict(defaultKwargs)
+            actualKwargs.update(kwargs)
+            return fn(*args, **actualKwargs)
 
         return g
 
     return actual_decorator
 
 
+CALL_PARAMS = 'params'              # func(params)
+CALL_KWARGS = 'kwargs'              # func(**params)
+CALL_DATA_PARAMS = 'data_params'    # func(data, params)
+CALL_DATA_KWARGS = 'data_kwargs'    # func(data, **params)
+
+
+def resolve_call_convention(func, names, data_available=False, reserved=()):
+    """
+    Determines how func expects its hyperparameters by inspecting its signature. A function is called data first if its
+    first positional parameter is named data, or if a data object is available and it has at least two positional
+    parameters of which the first is no hyperparameter. The hyperparameters are passed as a single dict if exactly one
+    positional parameter remains that is no hyperparameter name and func takes no **kwargs, else as keyword arguments.
+
+    :param func: [callable] blackbox function
+    :param names: [iterable] hyperparameter names
+    :param data_available: [bool] a data object is passed with each call, default=False
+    :param reserved: [iterable] names of additional keyword arguments passed with each call, e.g. reporter, which are
+                     ignored when counting the positional parameters, default=()
+
+    :return: [str] one of CALL_PARAMS, CALL_KWARGS, CALL_DATA_PARAMS, CALL_DATA_KWARGS or None if func can't be inspected
+    """
+    try:
+        signature = inspect.signature(func)
+    except (TypeError, ValueError):
+        return None
+    positional = [p.name for p in signature.parameters.values()
+                  if p.kind in (inspect.Parameter.POSITIONAL_ONLY, inspect.Parameter.POSITIONAL_OR_KEYWORD)
+                  and p.name not in reserved]
+    var_keyword = any(p.kind == inspect.Parameter.VAR_KEYWORD for p in signature.parameters.values())
+    data_first = len(positional) > 0 and positional[0] not in names and \
+        (positional[0] == 'data' or (data_available and len(positional) >= 2))
+    if data_first:
+        positional = positional[1:]
+    single_dict = len(positional) == 1 and positional[0] not in names and not var_keyword
+    if data_first:
+        return CALL_DATA_PARAMS if single_dict else CALL_DATA_KWARGS
+    return CALL_PARAMS if single_dict else CALL_KWARGS
+
+
+def _legacy_call(func, params, data=None, extra=None):
+    # tries all conventions, only used for callables whose signature can't be inspected
+    extra = extra if extra is not None else {}
+    try:
+        try:
+            return func(data, params, **extra)
+        except:
+            return func(data, **params, **extra)
+    except:
+        try:
+            return func(params, **extra)
+        except:
+            return func(**params, **extra)
+
+
+def call_with_params(func, params, data=None, data_available=False, conventions=None, extra=None):
+    """
+    Calls func with the hyperparameter dict params using the convention determined by resolve_call_convention. Thus
+    each evaluation is a single invocation, an exception raised inside func is not caught and retried with another
+    convention.
+
+    :param func: [callable] blackbox function
+    :param params: [dict] hyperparameter set
+    :param data: [object] data object passed to data first functions, default=None
+    :param data_available: [bool] see resolve_call_convention, default=False
+    :param conventions: [dict] cache of resolved conventions per hyperparameter names, owned by the caller and to be
+                        cleared if func changes, default=None
+    :param extra: [dict] additional keyword arguments, e.g. {'reporter': ...}, default=None
+
+    :return: [object] return value of func
+    """
+    extra = extra if extra is not None else {}
+    names = tuple(params.keys())
+    key = (names, tuple(extra.keys()))
+    if conventions is not None and key in conventions:
+        convention = conventions[key]
+    else:
+        convention = resolve_call_convention(func, names, data_available, reserved=tuple(extra.keys()))
+        if conventions is not None:
+            conventions[key] = convention
+    if convention == CALL_KWARGS:
+        return func(**params, **extra)
+    if convention == CALL_PARAMS:
+        return func(params, **extra)
+    if convention == CALL_DATA_PARAMS:
+        return func(data, params, **extra)
+    if convention == CALL_DATA_KWARGS:
+        return func(data, **params, **extra)
+    return _legacy_call(func, params, data, extra)
+
+
+def load_array(data, mmap_mode='r'):
+    """
+    Loads data given as path of a .npy file via numpy.load using mmap_mode, any other object is returned unchanged.
+
+    :param data: [object] data object or .npy file path
+    :param mmap_mode: [str] numpy mmap_mode, None loads the whole array into memory, default='r'
+
+    :return: [object] data object, numpy.memmap or ndarray in case of a .npy file
+    """
+    if isinstance(data, (str, os.PathLike)) and str(data).endswith('.npy') and os.path.isfile(data):
+        return np.load(data, mmap_mode=mmap_mode)
+    return data
+
+
 class BlackboxFunction(object):
     """
     This class is a BlackboxFunction wrapper class encapsulating the loss function. Additional function pointer can be
@@ -49,7 +158,13 @@ class BlackboxFunction(object):
                        the params are passed from constructor params.
     - callback_func: this function is called at each iteration step getting passed the trail info content, can be used for
                      custom visualization
-    - data: add a data object directly
+    - data: add a data object directly or the path of a .npy file which is loaded memory mapped
+
+    If vectorized is True, the blackbox_func is called once per candidate batch instead of once per candidate. It then
+    gets passed the whole batch and must return one loss per candidate, the signature is foo(data, batch) if a data
+    object is available, else foo(batch). Depending on batch_format the batch is either a dict of numpy arrays
+    {'name': array of N values, ...} ('dict') or a float array of shape (N, d) whose columns are the hyperparameters in
+    alphabetical order ('array').
 
     The constructor accepts several function pointers or a data object which are all None by default (see below).
     Additionally one can define an arbitrary number of arg pairs. These are passed as input to each function pointer as
@@ -59,10 +174,18 @@ class BlackboxFunction(object):
     :param preprocess_func: data preprocessing function pointer, default=None
     :param callback_func: callback function pointer, default=None
     :param data: data object, default=None
+    :param vectorized: [bool] blackbox_func evaluates a whole candidate batch per call, default=False
+    :param batch_format: [str] batch representation passed to a vectorized blackbox_func, 'dict' or 'array',
+                         default='dict'
+    :param lazy: [bool] defer dataloader_func and preprocess_func to the first evaluation, default=False
+    :param keep_raw_data: [bool] keep raw_data after preprocess_func returned a new data object, default=True
+    :param mmap_mode: [str] numpy mmap_mode used if the data is given as path to a .npy file, None loads the whole
+                      array into memory, default='r'
     :param kwargs: additional arg=value pairs
     """
 
-    @default_kwargs(blackbox_func=None, dataloader_func=None, preprocess_func=None, callback_func=None, data=None)
+    @default_kwargs(blackbox_func=None, dataloader_func=None, preprocess_func=None, callback_func=None, data=None,
+                    vectorized=False, batch_format='dict', lazy=False, keep_raw_data=True, mmap_mode='r')
     def __init__(self, **kwargs):
         self._blackbox_func = None
         self._preprocess_func = None
@@ -70,26 +193,68 @@ class BlackboxFunction(object):
         self._callback_func = None
         self._raw_data = None
         self._data = None
+        self._vectorized = False
+        self._batch_format = 'dict'
+        self._call_conventions = {}
+        self._params = {}
+        self._lazy = False
+        self._keep_raw_data = True
+        self._mmap_mode = 'r'
+        self._loaded = False
         self.setup(kwargs)
 
     def __call__(self, **kwargs):
         """
-        Call method calls blackbox_func passing the data object and the args passed
+        Call method calls blackbox_func passing the data object and the args passed. The calling convention of
+        blackbox_func is resolved once via its signature (see resolve_call_convention).
 
         :param kwargs: [dict] args
 
         :return: blackbox_func(data, kwargs)
         """
-        try:
-            try:
-                return self.blackbox_func(self.data, kwargs)
-            except:
-                return self.blackbox_func(self.data, **kwargs)
-        except:
-            try:
-                return self.blackbox_func(kwargs)
-            except:
-                return self.blackbox_func(**kwargs)
+        extra = None
+        if 'reporter' in kwargs:
+            extra = {'reporter': kwargs.pop('reporter')}
+        return call_with_params(self.blackbox_func, kwargs, data=self.data, data_available=True,
+                                conventions=self._call_conventions, extra=extra)
+
+    def call_vectorized(self, candidates):
+        """
+        Evaluates a candidate batch with a single call of the vectorized blackbox_func. The measured duration of the
+        call is split evenly among the candidates, so the summed trial durations match the wall time.
+
+        :param candidates: [list of CandidateDescriptors or CandidateBatch] candidates to evaluate
+
+        :return: [dict] results {candidate.ID: {'loss': ..., 'book_time': ..., 'refresh_time': ...}, ...}
+        """
+        assert self.vectorized, "precondition violation, call_vectorized requires vectorized=True!"
+        if not isinstance(candidates, CandidateBatch):
+            candidates = CandidateBatch.from_candidates(candidates)
+        if self._batch_format == 'array':
+            keys = sorted(candidates.keys())
+            batch = np.column_stack([candidates.column(key).astype(float) for key in keys])
+        else:
+            batch = {key: candidates.column(key) for key in candidates.keys()}
+
+        book_time = datetime.datetime.now()
+        if self.data is not None:
+            losses = self.blackbox_func(self.data, batch)
+        else:
+            losses = self.blackbox_func(batch)
+        refresh_time = datetime.datetime.now()
+
+        losses = np.asarray(losses, dtype=float).ravel()
+        if len(losses) != len(candidates):
+            msg = "vectorized blackbox_func returned {} losses for {} candidates!".format(len(losses), len(candidates))
+            LOG.error(msg)
+            raise ValueError(msg)
+        step = (refresh_time - book_time) / max(len(candidates), 1)
+        results = dict()
+        for i, (cand_id, loss) in enumerate(zip(candidates.IDs.tolist(), losses.tolist())):
+            results[cand_id] = {'loss': loss if loss == loss else np.nan,
+                                'book_time': book_time + i * step,
+                                'refresh_time': book_time + (i + 1) * step}
+        return results
 
     def setup(self, kwargs):
         """
@@ -102,24 +267,76 @@ class BlackboxFunction(object):
         self._dataloader_func = kwargs['dataloader_func']
         self._callback_func = kwargs['callback_func']
         self._raw_data = kwargs['data']
-        self._data = self._raw_data
+        self._data = None
+        self._call_conventions = {}
+        self._vectorized = kwargs.pop('vectorized', False)
+        self._batch_format = kwargs.pop('batch_format', 'dict')
+        self._lazy = kwargs.pop('lazy', False)
+        self._keep_raw_data = kwargs.pop('keep_raw_data', True)
+        self._mmap_mode = kwargs.pop('mmap_mode', 'r')
+        self._loaded = False
+        assert self._batch_format in ['dict', 'array'], "precondition violation, batch_format needs to be 'dict' or " \
+                                                        "'array', got {}".format(self._batch_format)
         del kwargs['blackbox_func']
         del kwargs['preprocess_func']
         del kwargs['dataloader_func']
         del kwargs['data']
-        params = kwargs
+        self._params = kwargs
 
-        if self.dataloader_func is not None:
-            self._raw_data = self.dataloader_func(params=params)
         assert self.blackbox_func is not None, "Missing blackbox function exception!"
+        if not self._lazy:
+            self.load()
+
+    def load(self):
+        """
+        Runs dataloader_func and preprocess_func if not done yet. Called by setup, or on first access of data or
+        raw_data if lazy is True. If the data object, or the object returned by dataloader_func, is the path of a .npy
+        file, the array is loaded memory mapped using mmap_mode, so processes forked after loading share its pages. If
+        keep_raw_data is False, raw_data is released once preprocess_func returned a new object.
+        """
+        if self._loaded:
+            return
+        if self.dataloader_func is not None:
+            self._raw_data = self.dataloader_func(params=self._params)
+        self._raw_data = load_array(self._raw_data, self._mmap_mode)
         if self.preprocess_func is not None:
-            result = self.preprocess_func(data=self._raw_data, params=params)
+            result = self.preprocess_func(data=self._raw_data, params=self._params)
             if result is not None:
                 self._data = result
             else:
                 self._data = self._raw_data
         else:
             self._data = self._raw_data
+        if not self._keep_raw_data and self._data is not self._raw_data:
+            self._raw_data = None
+        self._loaded = True
+
+    @property
+    def loaded(self):
+        """
+        True if the data was loaded and preprocessed.
+
+        :return: [bool] loaded flag
+        """
+        return self._loaded
+
+    @property
+    def vectorized(self):
+        """
+        True if blackbox_func evaluates a whole candidate batch per call.
+
+        :return: [bool] vectorized flag
+        """
+        return self._vectorized
+
+    @property
+    def batch_format(self):
+        """
+        Batch representation passed to a vectorized blackbox_func, 'dict' or 'array'.
+
+        :return: [str] batch format
+        """
+        return self._batch_format
 
     @property
     def blackbox_func(self):
@@ -170,6 +387,7 @@ class BlackboxFunction(object):
 
         :return: [object] raw_data
         """
+        self.load()
         return self._raw_data
 
     @property
@@ -179,4 +397,5 @@ class BlackboxFunction(object):
 
         :return: [object] data
         """
+        self.load()
         return self._data
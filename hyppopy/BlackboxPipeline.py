@@ -0,0 +1,306 @@
+# Hyppopy - A Hyper-Parameter Optimization Toolbox
+#
+# Copyright (c) German Cancer Research Center,
+# Division of Medical Image Computing.
+# All rights reserved.
+#
+# This software is distributed WITHOUT ANY WARRANTY; without
+# even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE.
+#
+# See LICENSE
+
+########################################################################################################################
+# USAGE
+#
+# A BlackboxPipeline splits a loss function into stages, each declaring the hyperparameters it depends on. The output
+# of a stage is the data input of the next one, the last stage returns the loss. Stage outputs are cached keyed on the
+# hyperparameters the stage and all upstream stages depend on, thus candidates sharing e.g. the preprocessing
+# parameters reuse the preprocessed data and only run the downstream stages:
+#
+#    def extract_patches(data, params):        # expensive, depends on patch_size and normalization only
+#        ...
+#        return patches
+#
+#    def train_model(patches, params):         # cheap, depends on all remaining parameters
+#        ...
+#        return loss
+#
+#    pipeline = BlackboxPipeline([PipelineStage(extract_patches, depends_on=["patch_size", "normalization"]),
+#                                 PipelineStage(train_model, cache=False)],
+#                                cache_size=16, cache_dir="/tmp/patch_cache")
+#    blackbox = BlackboxFunction(blackbox_func=pipeline, dataloader_func=my_dataloader_function)
+#
+# The in memory cache holds at most cache_size stage outputs and drops the least recently used one, if cache_dir is
+# set, stage outputs are additionally pickled there and reused across runs and processes. A pipeline can be called
+# from several threads, e.g. by the ASHASolver with max_parallel > 1.
+#
+# Besides the hyperparameters, the cache keys contain a fingerprint of the input data and the versions of the stage
+# and its upstream stages, thus a changed dataset or stage function does not reuse stale outputs. The data is hashed
+# once per data object, numpy arrays chunkwise and memory mapped ones by file name, position and modification time
+# without reading them. Data modified in place or too large to hash is better identified by passing a data_key, e.g.
+# the dataset path. A stage version defaults to a hash of the function code, a changed helper called by the stage
+# function is not detected, in that case pass version="2" etc. to the PipelineStage.
+########################################################################################################################
+
+__all__ = ['PipelineStage', 'BlackboxPipeline']
+
+import os
+import pickle
+import uuid
+import hashlib
+import logging
+import threading
+import numpy as np
+from collections import OrderedDict
+from hyppopy.globals import DEBUGLEVEL
+
+LOG = logging.getLogger(os.path.basename(__file__))
+LOG.setLevel(DEBUGLEVEL)
+
+
+class PipelineStage(object):
+    """
+    A single step of a BlackboxPipeline.
+    """
+    def __init__(self, func, depends_on=None, cache=True, name=None, version=None):
+        """
+        :param func: [callable] stage function with signature foo(data, params), params only contains the
+                     hyperparameters in depends_on
+        :param depends_on: [list] names of the hyperparameters the stage depends on, if None all, default=None
+        :param cache: [bool] memoize the stage output, default=True
+        :param name: [str] stage name used for the cache, default=func.__name__
+        :param version: [str] stage version used for the cache, default=hash of the function code
+        """
+        assert callable(func), "precondition violation, func needs to be callable!"
+        if depends_on is not None:
+            assert isinstance(depends_on, (list, tuple)), "precondition violation, depends_on needs to be of type " \
+                                                          "list, got {}".format(type(depends_on))
+            depends_on = list(depends_on)
+        self.func = func
+        self.depends_on = depends_on
+        self.cache = cache
+        self.name = name if name is not None else getattr(func, '__name__', 'stage')
+        self.version = str(version) if version is not None else _code_hash(func)
+
+    def select(self, params):
+        """
+        Returns the subset of params the stage depends on.
+
+        :param params: [dict] hyperparameter set
+
+        :return: [dict] hyperparameters of the stage
+        """
+        if self.depends_on is None:
+            return dict(params)
+        return {name: params[name] for name in self.depends_on}
+
+
+def _code_hash(func):
+    code = getattr(func, '__code__', None)
+    if code is None:
+        code = getattr(getattr(func, '__call__', None), '__code__', None)
+    if code is None:
+        return ''
+    # nested code objects are represented by their address, only the other constants are stable across runs
+    consts = [c for c in code.co_consts if not hasattr(c, 'co_code')]
+    return hashlib.sha1(code.co_code + repr(consts).encode()).hexdigest()
+
+
+# bytes of an array hashed at once, larger arrays are hashed in chunks instead of being copied as a whole
+_CHUNK_BYTES = 1 << 24
+
+
+def _array_fingerprint(data):
+    if isinstance(data, np.memmap) and getattr(data, 'filename', None) is not None:
+        # a memory mapped array is identified by its file and position instead of reading all pages
+        root = data
+        while isinstance(root.base, np.ndarray):
+            root = root.base
+        key = (data.filename, data.offset, data.ctypes.data - root.ctypes.data, data.shape, data.strides,
+               data.dtype.str, os.stat(data.filename).st_mtime_ns)
+        return hashlib.sha1(repr(key).encode()).hexdigest()
+    sha = hashlib.sha1(repr((data.shape, data.dtype.str)).encode())
+    if data.ndim == 0 or data.size == 0:
+        sha.update(data.tobytes())
+        return sha.hexdigest()
+    rows = max(1, _CHUNK_BYTES // max(data[0].nbytes, 1))
+    for start in range(0, len(data), rows):
+        sha.update(np.ascontiguousarray(data[start:start + rows]).data)
+    return sha.hexdigest()
+
+
+def _fingerprint(data):
+    try:
+        if isinstance(data, np.ndarray) and data.dtype != object:
+            return _array_fingerprint(data)
+        return hashlib.sha1(pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)).hexdigest()
+    except Exception as e:
+        # an unpicklable object gets a unique key, its outputs are not shared with other data objects
+        LOG.warning("Failed to hash the pipeline data, pass a data_key to reuse cached outputs: {}".format(e))
+        return uuid.uuid4().hex
+
+
+def _hashable(value):
+    try:
+        hash(value)
+        return value
+    except TypeError:
+        return repr(value)
+
+
+class BlackboxPipeline(object):
+    """
+    Callable chaining PipelineStages with a bounded LRU cache of stage outputs. An instance has the signature
+    foo(data, params) and is passed as blackbox_func to a BlackboxFunction.
+    """
+    def __init__(self, stages, cache_size=32, cache_dir=None, data_key=None):
+        """
+        :param stages: [list] PipelineStage instances or functions, the latter depending on all hyperparameters
+        :param cache_size: [int] maximum number of stage outputs kept in memory, default=32
+        :param cache_dir: [str] directory stage outputs are pickled to, if None outputs are cached in memory only,
+                          default=None
+        :param data_key: [object] key identifying the input data, a callable gets the data and returns the key, if None
+                         the data is hashed, default=None
+        """
+        assert isinstance(stages, (list, tuple)) and len(stages) > 0, "precondition violation, stages needs to be " \
+                                                                      "a non empty list!"
+        assert isinstance(cache_size, int) and cache_size >= 0, "precondition violation, cache_size needs to be a " \
+                                                                "non negative int!"
+        self._stages = [s if isinstance(s, PipelineStage) else PipelineStage(s) for s in stages]
+        self._cache_size = cache_size
+        self._cache_dir = cache_dir
+        self._cache = OrderedDict()
+        self._hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+        self._data_key = data_key
+        self._data = None
+        self._data_fingerprint = None
+        self._lock = threading.Lock()    # guards the in memory cache, the counters and the data fingerprint
+        if cache_dir is not None and not os.path.isdir(cache_dir):
+            os.makedirs(cache_dir)
+
+    def __call__(self, data, params):
+        """
+        Runs the stages, the first one gets data, each other one the output of its predecessor. Execution starts after
+        the last stage whose output is found in the cache, upstream stages are skipped.
+
+        :param data: [object] input data of the first stage
+        :param params: [dict] hyperparameter set
+
+        :return: [object] output of the last stage
+        """
+        data_key = self._fingerprint(data)
+        keys = []
+        upstream = set()
+        versions = ()
+        for n, stage in enumerate(self._stages):
+            if stage.depends_on is None:
+                upstream = set(params.keys())
+            else:
+                upstream.update(stage.depends_on)
+            versions += (stage.version,)
+            keys.append((n, stage.name, versions, data_key,
+                         tuple(sorted((name, _hashable(params[name])) for name in upstream))))
+
+        first = 0
+        for n in reversed(range(len(self._stages))):
+            if self._stages[n].cache:
+                found, result = self._lookup(keys[n])
+                if found:
+                    data = result
+                    first = n + 1
+                    break
+
+        for n in range(first, len(self._stages)):
+            stage = self._stages[n]
+            data = stage.func(data, stage.select(params))
+            if stage.cache:
+                with self._lock:
+                    self._misses += 1
+                self._store(keys[n], data)
+        return data
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def _fingerprint(self, data):
+        if self._data_key is not None:
+            return _hashable(self._data_key(data) if callable(self._data_key) else self._data_key)
+        with self._lock:
+            if self._data is not data or self._data_fingerprint is None:
+                self._data = data
+                self._data_fingerprint = _fingerprint(data)
+            return self._data_fingerprint
+
+    def _cache_file(self, key):
+        return os.path.join(self._cache_dir, hashlib.sha1(repr(key).encode()).hexdigest() + ".pkl")
+
+    def _lookup(self, key):
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self._hits += 1
+                return True, self._cache[key]
+        if self._cache_dir is not None:
+            fname = self._cache_file(key)
+            if os.path.isfile(fname):
+                try:
+                    with open(fname, 'rb') as f:
+                        result = pickle.load(f)
+                    with self._lock:
+                        self._disk_hits += 1
+                    self._store(key, result, write=False)
+                    return True, result
+                except Exception as e:
+                    LOG.warning("Failed to read cached output of stage {}: {}".format(key[1], e))
+        return False, None
+
+    def _store(self, key, value, write=True):
+        if write and self._cache_dir is not None:
+            fname = self._cache_file(key)
+            # written to a temporary file and renamed, concurrent readers don't see partial files
+            tmp = "{}.{}.{}.tmp".format(fname, os.getpid(), threading.get_ident())
+            try:
+                with open(tmp, 'wb') as f:
+                    pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp, fname)
+            except Exception as e:
+                LOG.warning("Failed to write cached output of stage {}: {}".format(key[1], e))
+                if os.path.isfile(tmp):
+                    os.remove(tmp)
+        if self._cache_size == 0:
+            return
+        with self._lock:
+            self._cache[key] = value
+            self._cache.move_to_end(key)
+            while len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+
+    def clear_cache(self):
+        """
+        Empties the in memory cache, files in cache_dir are kept.
+        """
+        with self._lock:
+            self._cache.clear()
+
+    def cache_info(self):
+        """
+        Returns the cache statistics.
+
+        :return: [dict] {'hits': ..., 'disk_hits': ..., 'misses': ..., 'size': ..., 'max_size': ...}
+        """
+        with self._lock:
+            return {'hits': self._hits, 'disk_hits': self._disk_hits, 'misses': self._misses,
+                    'size': len(self._cache), 'max_size': self._cache_size}
+
+    @property
+    def stages(self):
+        return self._stages
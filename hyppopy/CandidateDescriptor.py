@@ -1,24 +1,44 @@
+import itertools
+import numpy as np
+
+# process wide source of candidate IDs, cheaper than uuid4 and monotonically increasing
+_candidate_ids = itertools.count()
+
+
 class CandidateDescriptor(object):
     """
     Descriptor that defines an candidate the solver wants to be checked.
     It is used to lable/identify the candidates and their results in the case of batch processing.
+
+    Solvers create millions of candidates for large grid and random searches, thus the class uses __slots__ instead
+    of an instance __dict__, a cheap integer ID and computes its canonical key (used for hashing) only on demand.
     """
+    __slots__ = ('_definingValues', 'ID', '_key')
 
     def __init__(self, **definingValues):
         """
         @param definingValues Class assumes that all variables passed to the computer are parameters of the candidate
         the instance should represent.
         """
-        import uuid
-
         self._definingValues = definingValues
+        self._key = None
+        self.ID = next(_candidate_ids)
 
-        self._definingStr = str()
+    @classmethod
+    def with_id(cls, ID, definingValues):
+        """
+        Creates a candidate with a given ID instead of drawing a new one, used for the row views of a CandidateBatch.
 
-        for item in sorted(definingValues.items()):
-            self._definingStr = self._definingStr + "'" + str(item[0]) + "':'" + str(item[1]) + "',"
+        :param ID: [int] candidate ID
+        :param definingValues: [dict] parameter values
 
-        self.ID = str(uuid.uuid4())
+        :return: [CandidateDescriptor] candidate instance
+        """
+        candidate = cls.__new__(cls)
+        candidate._definingValues = definingValues
+        candidate._key = None
+        candidate.ID = ID
+        return candidate
 
     def __missing__(self, key):
         return None
@@ -36,7 +56,7 @@ class CandidateDescriptor(object):
             return False
 
     def __hash__(self):
-        return hash(self._definingStr)
+        return hash(self.key())
 
     def __ne__(self, other):
         return not self.__eq__(other)
@@ -58,6 +78,180 @@ class CandidateDescriptor(object):
     def get_values(self):
         return self._definingValues
 
+    def key(self):
+        """
+        Returns the canonical key of the candidate, a tuple of the (name, value) pairs sorted by name. Values that are
+        not hashable are represented by their string. The key is computed on the first request and cached.
+
+        :return: [tuple] canonical key
+        """
+        if self._key is None:
+            key = tuple(sorted(self._definingValues.items()))
+            try:
+                hash(key)
+            except TypeError:
+                key = tuple((name, str(value)) for name, value in key)
+            self._key = key
+        return self._key
+
+
+def _as_column(values):
+    """
+    Converts a sequence of parameter values into a one dimensional numpy array. Values numpy would broadcast into
+    a higher dimensional array (e.g. lists) and values of different types (e.g. a categorical ['a', 1, None]), which
+    numpy would coerce to a common dtype, are kept as objects.
+    """
+    if isinstance(values, np.ndarray):
+        column = values
+    elif len(set(type(value) for value in values)) > 1:
+        column = np.empty(len(values), dtype=object)
+        column[:] = list(values)
+        return column
+    else:
+        column = np.asarray(values)
+    if column.ndim != 1:
+        column = np.empty(len(values), dtype=object)
+        column[:] = list(values)
+    return column
+
+
+class CandidateBatch(object):
+    """
+    Columnar container of candidates. Instead of a list of CandidateDescriptors, each wrapping its own dict, a batch
+    stores one numpy array per parameter and an array of candidate IDs. Column access returns a CandidateColumn
+    supporting vectorized boundary checks, integer access returns a CandidateDescriptor view of the row carrying the
+    batch ID, slicing returns a new batch sharing the IDs. Iterating a batch yields the row views, thus a batch can be
+    passed wherever a list of CandidateDescriptors is expected.
+    """
+    __slots__ = ('_columns', '_ids')
+
+    def __init__(self, columns, ids=None):
+        """
+        :param columns: [dict] parameter name -> sequence of values, all of the same length
+        :param ids: [sequence] candidate IDs, if None new IDs are drawn, default=None
+        """
+        self._columns = {name: _as_column(values) for name, values in columns.items()}
+        lengths = set(len(column) for column in self._columns.values())
+        assert len(lengths) <= 1, "precondition violation, all columns need to be of the same length!"
+        size = lengths.pop() if len(lengths) > 0 else 0
+        if ids is None:
+            ids = [next(_candidate_ids) for _ in range(size)]
+        self._ids = np.asarray(ids, dtype=np.int64)
+        assert len(self._ids) == size, "precondition violation, number of ids does not match the column length!"
+
+    @classmethod
+    def from_candidates(cls, candidates):
+        """
+        Creates a batch from CandidateDescriptors, keeping their IDs.
+
+        :param candidates: [list] CandidateDescriptor instances sharing the same parameter names
+
+        :return: [CandidateBatch] batch instance
+        """
+        candidates = list(candidates)
+        keys = list(candidates[0].keys()) if len(candidates) > 0 else []
+        columns = {key: [candidate[key] for candidate in candidates] for key in keys}
+        return cls(columns, ids=[candidate.ID for candidate in candidates])
+
+    @classmethod
+    def from_dicts(cls, dicts):
+        """
+        Creates a batch from parameter dicts sharing the same keys, e.g. the sequence a solver lib passes to its map
+        function.
+
+        :param dicts: [list] parameter dicts
+
+        :return: [CandidateBatch] batch instance
+        """
+        dicts = list(dicts)
+        keys = list(dicts[0].keys()) if len(dicts) > 0 else []
+        return cls({key: [d[key] for d in dicts] for key in keys})
+
+    @property
+    def IDs(self):
+        return self._ids
+
+    def keys(self):
+        return self._columns.keys()
+
+    def column(self, key):
+        """
+        Returns the values of a parameter as numpy array.
+
+        :param key: [str] parameter name
+
+        :return: [ndarray] parameter values
+        """
+        return self._columns[key]
+
+    def row(self, index):
+        """
+        Returns a CandidateDescriptor view of a single row. Numpy scalars are converted to native types.
+
+        :param index: [int] row index
+
+        :return: [CandidateDescriptor] candidate with the batch ID
+        """
+        values = {}
+        for key, column in self._columns.items():
+            value = column[index]
+            values[key] = value.item() if isinstance(value, np.generic) else value
+        return CandidateDescriptor.with_id(int(self._ids[index]), values)
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __iter__(self):
+        for index in range(len(self._ids)):
+            yield self.row(index)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return CandidateBatch({name: column[key] for name, column in self._columns.items()}, ids=self._ids[key])
+        if isinstance(key, (int, np.integer)):
+            return self.row(key)
+        if key in self._columns:
+            return CandidateColumn(self._columns[key])
+        raise KeyError('Unkown defining value key was requested. Key: {}; self: {}'.format(key, self))
+
+    def __repr__(self):
+        return 'CandidateBatch(%s, ids=%s)' % (self._columns, self._ids)
+
+    def get(self):
+        return list(self)
+
+
+class CandidateColumn(object):
+    """
+    Values of one parameter over a CandidateBatch. The comparison operators evaluate the condition for all values at
+    once and are true only if all values fulfill it, that's what boundary checks of solver libs expect.
+    """
+    __slots__ = ('_values',)
+
+    def __init__(self, values):
+        self._values = values
+
+    def __gt__(self, other):
+        return bool(np.all(self._values > other))
+
+    def __lt__(self, other):
+        return bool(np.all(self._values < other))
+
+    def __ge__(self, other):
+        return bool(np.all(self._values >= other))
+
+    def __le__(self, other):
+        return bool(np.all(self._values <= other))
+
+    def __len__(self):
+        return len(self._values)
+
+    def __array__(self, dtype=None, copy=None):
+        return np.asarray(self._values, dtype=dtype)
+
+    def get(self):
+        return self._values.tolist()
+
 
 class CandicateDescriptorWrapper:
 
@@ -27,18 +27,53 @@
 #    vfunc.load_images(path/of/your/binaryfiles/and/the/configfile)
 #
 # 4. use vfunc like a normal function, if you loaded 4 dimension binary images use it like f = vfunc(a,b,c,d)
+#
+# 5. evaluate many positions at once via losses = vfunc.evaluate_batch(X) with X of shape (N, 4)
+#
+# The sampled curves and axis ranges are cached in HYPPOPY_CACHE_DIR (default ~/.cache/hyppopy) on the first load, or
+# in the file .functionsimulator.npz next to the images if the cache dir is not writable. Later loads read the cache
+# instead of the images as long as the images and the .cfg file are unchanged, load_images(path, mmap_mode='r') memory
+# maps the cached curves.
 ########################################################################################################################
 
 __all__ = ['FunctionSimulator']
 
 import os
 import sys
+import json
+import struct
+import hashlib
+import logging
+import zipfile
 import numpy as np
 import configparser
 from glob import glob
-import matplotlib.pyplot as plt
-import matplotlib.image as mpimg
-from hyppopy.globals import FUNCTIONSIMULATOR_DATAPATH
+from hyppopy.globals import DEBUGLEVEL, FUNCTIONSIMULATOR_DATAPATH, FUNCTIONSIMULATOR_CACHEFILE, \
+    FUNCTIONSIMULATOR_CACHEDIR
+
+LOG = logging.getLogger(os.path.basename(__file__))
+LOG.setLevel(DEBUGLEVEL)
+
+CACHE_VERSION = 1
+
+
+def _memmap_npz(fname, key, mode):
+    # np.load memory maps .npy files only, the members of an uncompressed .npz are mapped at their offset instead
+    with zipfile.ZipFile(fname) as archive:
+        info = archive.getinfo(key + ".npy")
+    assert info.compress_type == zipfile.ZIP_STORED, "precondition violation, {} is compressed!".format(fname)
+    with open(fname, "rb") as f:
+        # local file header, the lengths of file name and extra field are stored at byte 26
+        f.seek(info.header_offset)
+        name_length, extra_length = struct.unpack("<HH", f.read(30)[26:30])
+        f.seek(info.header_offset + 30 + name_length + extra_length)
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+        offset = f.tell()
+    return np.memmap(fname, dtype=dtype, mode=mode, offset=offset, shape=shape, order="F" if fortran_order else "C")
 
 
 class FunctionSimulator(object):
@@ -81,6 +116,30 @@ class FunctionSimulator(object):
         fr = self.data[(list(range(self.dims())), rpos)]
         return np.sum(fl*np.array(fracs) + fr*(1-np.array(fracs)))
 
+    def evaluate_batch(self, X):
+        """
+        Evaluates N positions at once using array indexing and linear interpolation between the samples. The array
+        columns are the axis in order, thus the function can be used as vectorized BlackboxFunction with
+        batch_format='array', the hyperparameter being named axis_00, axis_01, ...
+
+        :param X: [array] positions of shape (N, dims)
+
+        :return: [array] N losses
+        """
+        X = np.asarray(X, dtype=float)
+        assert X.ndim == 2 and X.shape[1] == self.dims(), \
+            "precondition violation, expected positions of shape (N, {}), got {}!".format(self.dims(), X.shape)
+        axis = np.asarray(self.axis, dtype=float)
+        outside = np.any((X < axis[:, 0]) | (X > axis[:, 1]), axis=0)
+        assert not np.any(outside), "out of range access on axis {}!".format(int(np.argmax(outside)))
+        pos = (X - axis[:, 0]) / np.abs(axis[:, 1] - axis[:, 0]) * (self.size() - 1)
+        lpos = np.floor(pos)
+        fracs = 1.0 - (pos - lpos)
+        lpos = np.clip(lpos, 0, self.size() - 1).astype(int)
+        rpos = np.clip(np.ceil(pos), 0, self.size() - 1).astype(int)
+        dims = np.arange(self.dims())
+        return np.sum(self.data[dims, lpos] * fracs + self.data[dims, rpos] * (1 - fracs), axis=1)
+
     def clear(self):
         """
         Clears all data structures
@@ -163,6 +222,8 @@ class FunctionSimulator(object):
         :param dim: [int] axis index
         :param title: [str] plot title
         """
+        import matplotlib.pyplot as plt
+
         if dim is None:
             dim = list(range(self.dims()))
         else:
@@ -198,27 +259,92 @@ class FunctionSimulator(object):
             self.data = tmp.reshape((dims+1, size))
         self.axis.append(x_range)
 
-    def load_default(self, name="3D"):
+    def load_default(self, name="3D", cache=True, mmap_mode=None):
         """
         load default images as axis
 
         :param name: [str] subfolder name
+        :param cache: [bool] use and create the compiled cache, see load_images, default=True
+        :param mmap_mode: [str] numpy mmap_mode for the cached curves, None loads them into memory, default=None
         """
         path = os.path.join(FUNCTIONSIMULATOR_DATAPATH, "{}".format(name))
         if os.path.exists(path):
-            self.load_images(path)
+            self.load_images(path, cache=cache, mmap_mode=mmap_mode)
         else:
             raise FileExistsError("No FunctionSimulator of dimension {} available".format(name))
 
-    def load_images(self, path):
+    def load_images(self, path, cache=True, mmap_mode=None):
         """
-        Load axis images and config files from path.
+        Load axis images and config files from path. If cache is True the sampled curves and axis ranges are read from
+        the compiled cache if it matches the files in path, otherwise the images are sampled and the cache is written.
 
         :param path: [str] data path
+        :param cache: [bool] use and create the compiled cache, default=True
+        :param mmap_mode: [str] numpy mmap_mode for the cached curves, None loads them into memory, default=None
         """
         self.config = None
         self.data = None
         self.axis.clear()
+        if not cache:
+            self._read_images(path)
+            return
+        signature = self._signature(path)
+        for fname in self._cache_files(path):
+            if self._load_cache(fname, signature, mmap_mode):
+                for cfg in glob(os.path.join(path, "*.cfg")):
+                    self.config = self.read_config(cfg)
+                return
+        self._read_images(path)
+        fname = self._write_cache(path, signature)
+        if fname is not None and mmap_mode is not None:
+            self.data = _memmap_npz(fname, "data", mmap_mode)
+
+    def _signature(self, path):
+        files = sorted(f for f in glob(os.path.join(path, "*")) if f.endswith(".png") or f.endswith(".cfg"))
+        return json.dumps([[os.path.basename(f), os.stat(f).st_size, os.stat(f).st_mtime_ns] for f in files])
+
+    def _cache_files(self, path):
+        key = hashlib.sha1(os.path.abspath(path).encode("utf-8")).hexdigest()
+        return [os.path.join(FUNCTIONSIMULATOR_CACHEDIR, "functionsimulator", key + ".npz"),
+                os.path.join(path, FUNCTIONSIMULATOR_CACHEFILE)]
+
+    def _load_cache(self, fname, signature, mmap_mode):
+        if not os.path.isfile(fname):
+            return False
+        try:
+            with np.load(fname) as cache:
+                if int(cache["version"]) != CACHE_VERSION or str(cache["signature"]) != signature:
+                    LOG.info("cache %s is outdated", fname)
+                    return False
+                axis = cache["axis"].tolist()
+                data = cache["data"] if mmap_mode is None else _memmap_npz(fname, "data", mmap_mode)
+        except Exception as e:
+            LOG.warning("reading cache %s failed: %s", fname, e)
+            return False
+        self.data = data
+        self.axis.extend(axis)
+        return True
+
+    def _write_cache(self, path, signature):
+        for fname in self._cache_files(path):
+            # written to a temporary file and renamed, workers building the same cache don't read partial files
+            tmp = "{}.{}.tmp".format(fname, os.getpid())
+            try:
+                os.makedirs(os.path.dirname(fname), exist_ok=True)
+                with open(tmp, "wb") as f:
+                    np.savez(f, data=self.data, axis=np.array(self.axis, dtype=float), signature=np.array(signature),
+                             version=np.array(CACHE_VERSION))
+                os.replace(tmp, fname)
+                return fname
+            except OSError as e:
+                LOG.info("writing cache %s failed: %s", fname, e)
+                if os.path.isfile(tmp):
+                    os.remove(tmp)
+        return None
+
+    def _read_images(self, path):
+        import matplotlib.image as mpimg
+
         img_fnames = []
         for f in glob(path + os.sep + "*"):
             if f.endswith(".png"):
@@ -267,12 +393,10 @@ class FunctionSimulator(object):
         self.axis.append([float(settings['min_x']), float(settings['max_x'])])
         y_range = [float(settings['min_y']), float(settings['max_y'])]
 
-        for x in range(img.shape[1]):
-            candidates = np.where(img[:, x] > 0)
-            assert len(candidates[0]) > 0, "non function value in image detected, ensure each column has at least one value > 0!"
-
-            y_pos = candidates[0][0]/img.shape[0]
-            self.data[dim, x] = 1-y_pos
+        mask = img > 0
+        assert np.all(np.any(mask, axis=0)), "non function value in image detected, ensure each column has at least one value > 0!"
+        # row of the first pixel > 0 per column
+        self.data[dim, :] = 1-np.argmax(mask, axis=0)/img.shape[0]
 
         self.data[dim, :] *= np.abs(y_range[1] - y_range[0])
         self.data[dim, :] += y_range[0]
@@ -0,0 +1,170 @@
+# Hyppopy - A Hyper-Parameter Optimization Toolbox
+#
+# Copyright (c) German Cancer Research Center,
+# Division of Medical Image Computing.
+# All rights reserved.
+#
+# This software is distributed WITHOUT ANY WARRANTY; without
+# even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE.
+#
+# See LICENSE
+
+########################################################################################################################
+# USAGE
+#
+# The LocalCommunicator is a stand-in for an mpi4py communicator on machines without MPI. It implements the subset of
+# the communicator interface used by MPISolverWrapper, MPIWorkerPool and MPIBlackboxFunction (send, recv, Get_rank,
+# Get_size) on top of multiprocessing queues, thus the same distributed scheduling code can be run, benchmarked and
+# tested on a single machine. Instead of starting the script via mpiexec, the code that would run on each rank is put
+# into a function which gets the communicator as first argument and is started via run_local:
+#
+#    def main(comm):
+#        solver = MPISolverWrapper(solver=SolverPool.get(project=project), mpi_comm=comm)
+#        solver.blackbox = my_loss_function
+#        solver.run()
+#        return solver.get_results()
+#
+#    df, best = run_local(main, size=4)
+#
+# Rank 0 is executed in the calling process, the other ranks in child processes. If a child rank raises, the error is
+# sent to rank 0 and raised there as LocalRankError by the next recv, thus a crashing worker does not block rank 0.
+########################################################################################################################
+
+__all__ = ['LocalCommunicator', 'LocalRankError', 'run_local']
+
+import os
+import logging
+import multiprocessing
+from hyppopy.globals import DEBUGLEVEL
+
+LOG = logging.getLogger(os.path.basename(__file__))
+LOG.setLevel(DEBUGLEVEL)
+
+# tag of the message a failing child rank sends to rank 0, not available to send
+_FAILURE_TAG = -2
+
+
+class LocalRankError(RuntimeError):
+    """
+    Raised on rank 0 if a child rank of run_local failed.
+    """
+    pass
+
+
+class LocalCommunicator(object):
+    """
+    Communicator-compatible local backend. Each rank owns an inbox queue, send puts a (source, tag, message) triple
+    into the inbox of the destination rank. Messages not matching the source and tag requested by recv are kept back
+    until a matching recv is called, so messages from one source with the same tag are received in order, as with MPI.
+    """
+    ANY_SOURCE = -1
+    ANY_TAG = -1
+
+    def __init__(self, rank, queues):
+        """
+        :param rank: [int] rank of the process owning this instance
+        :param queues: [list] one multiprocessing queue per rank
+        """
+        self._rank = rank
+        self._queues = queues
+        self._pending = []
+
+    def Get_rank(self):
+        return self._rank
+
+    def Get_size(self):
+        return len(self._queues)
+
+    def send(self, obj, dest, tag=0):
+        """
+        Sends a picklable object to rank dest.
+
+        :param obj: [object] message
+        :param dest: [int] destination rank
+        :param tag: [int] message tag, default=0
+        """
+        assert tag != _FAILURE_TAG, "precondition violation, tag {} is reserved!".format(_FAILURE_TAG)
+        self._queues[dest].put((self._rank, tag, obj))
+
+    def recv(self, buf=None, source=ANY_SOURCE, tag=ANY_TAG):
+        """
+        Blocks until a message from source with tag arrived and returns it.
+
+        :param buf: ignored, exists for mpi4py signature compatibility
+        :param source: [int] source rank, default=ANY_SOURCE
+        :param tag: [int] message tag, default=ANY_TAG
+
+        :return: [object] message
+        """
+        for msg_source, msg_tag, obj in self._pending:
+            if msg_tag == _FAILURE_TAG:
+                raise LocalRankError(obj)
+        for n, (msg_source, msg_tag, obj) in enumerate(self._pending):
+            if self.__matches(msg_source, msg_tag, source, tag):
+                del self._pending[n]
+                return obj
+        while True:
+            msg_source, msg_tag, obj = self._queues[self._rank].get()
+            if msg_tag == _FAILURE_TAG:
+                self._pending.append((msg_source, msg_tag, obj))
+                raise LocalRankError(obj)
+            if self.__matches(msg_source, msg_tag, source, tag):
+                return obj
+            self._pending.append((msg_source, msg_tag, obj))
+
+    @staticmethod
+    def __matches(msg_source, msg_tag, source, tag):
+        return (source == LocalCommunicator.ANY_SOURCE or source == msg_source) and \
+               (tag == LocalCommunicator.ANY_TAG or tag == msg_tag)
+
+
+def _run_rank(func, comm, args, kwargs):
+    try:
+        func(comm, *args, **kwargs)
+    except Exception as e:
+        LOG.error("Local rank {} failed: {}".format(comm.Get_rank(), e))
+        # rank 0 may wait for a message of this rank, it raises the error instead of blocking forever
+        comm._queues[0].put((comm.Get_rank(), _FAILURE_TAG,
+                             "Local rank {} failed: {}: {}".format(comm.Get_rank(), type(e).__name__, e)))
+        raise
+
+
+def run_local(func, size, *args, **kwargs):
+    """
+    Runs func(comm, *args, **kwargs) on size local processes, each getting a LocalCommunicator of its rank. Rank 0 runs
+    in the calling process, the function returns after all ranks finished.
+
+    :param func: [callable] function executed on each rank, must be picklable if the platform does not support fork
+    :param size: [int] number of ranks
+    :param args: additional positional arguments passed to func
+    :param kwargs: additional keyword arguments passed to func
+
+    :return: [object] return value of func on rank 0, a LocalRankError is raised if a child rank failed
+    """
+    assert isinstance(size, int) and size > 0, "precondition violation, size needs to be a positive int!"
+    if 'fork' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('fork')
+    else:
+        context = multiprocessing.get_context()
+    queues = [context.Queue() for _ in range(size)]
+    processes = []
+    for rank in range(1, size):
+        process = context.Process(target=_run_rank, args=(func, LocalCommunicator(rank, queues), args, kwargs))
+        process.daemon = True
+        process.start()
+        processes.append(process)
+    try:
+        result = func(LocalCommunicator(0, queues), *args, **kwargs)
+    except BaseException:
+        # the other ranks would wait for the finish signal forever
+        for process in processes:
+            process.terminate()
+        raise
+    finally:
+        for process in processes:
+            process.join()
+    failed = [rank for rank, process in enumerate(processes, 1) if process.exitcode != 0]
+    if len(failed) > 0:
+        raise LocalRankError("Local ranks {} failed".format(failed))
+    return result
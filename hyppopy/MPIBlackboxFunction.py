@@ -10,14 +10,14 @@
 #
 # See LICENSE
 from hyppopy.BlackboxFunction import BlackboxFunction
+from hyppopy.CandidateDescriptor import CandidateBatch
 
-__all__ = ['MPIBlackboxFunction']
+__all__ = ['MPIBlackboxFunction', 'dispatch_candidates', 'split_candidates']
 
 import os
 import logging
 import functools
 from hyppopy.globals import DEBUGLEVEL, MPI_TAGS
-from mpi4py import MPI
 
 LOG = logging.getLogger(os.path.basename(__file__))
 LOG.setLevel(DEBUGLEVEL)
@@ -30,12 +30,58 @@ def default_kwargs(**defaultKwargs):
     def actual_decorator(fn):
         @functools.wraps(fn)
         def g(*args, **kwargs):
-            defaultKwargs.update(kwargs)
-            return fn(*args, **defaultKwargs)
+            actualKwargs = dict(defaultKwargs)
+            actualKwargs.update(kwargs)
+            return fn(*args, **actualKwargs)
         return g
     return actual_decorator
 
 
+def dispatch_candidates(mpi_comm, candidates):
+    """
+    Distributes the candidates round robin to all ranks > 0 of mpi_comm and collects the results.
+
+    :param mpi_comm: [MPI communicator] communicator whose rank 0 is the calling process
+    :param candidates: [list] CandidateDescriptor instances or a CandidateBatch
+
+    :return: [dict] results {candidate.ID: {'loss': ..., 'book_time': ..., 'refresh_time': ...}, ...}
+    """
+    results = dict()
+    size = mpi_comm.Get_size()
+
+    for i, candidate in enumerate(candidates):
+        dest = (i % (size-1)) + 1
+        mpi_comm.send(candidate, dest=dest, tag=MPI_TAGS.MPI_SEND_CANDIDATE.value)
+
+    while True:
+        for i in range(size - 1):
+            if len(candidates) == len(results):
+                return results
+            cand_id, result_dict = mpi_comm.recv(source=i + 1, tag=MPI_TAGS.MPI_SEND_RESULTS.value)
+            results[cand_id] = result_dict
+
+
+def split_candidates(candidates, weights):
+    """
+    Splits a candidate list into len(weights) contiguous blocks whose sizes are proportional to weights.
+
+    :param candidates: [list] CandidateDescriptor instances or a CandidateBatch
+    :param weights: [list] relative block sizes, e.g. the number of workers behind each sub-master
+
+    :return: [list] list of candidate lists
+    """
+    total = float(sum(weights))
+    blocks = []
+    start = 0
+    accumulated = 0
+    for weight in weights:
+        accumulated += weight
+        stop = int(round(len(candidates) * accumulated / total))
+        blocks.append(candidates[start:stop])
+        start = stop
+    return blocks
+
+
 class MPIBlackboxFunction(BlackboxFunction):
     """
     This class is a BlackboxFunction wrapper class encapsulating the loss function.
@@ -48,18 +94,26 @@ class MPIBlackboxFunction(BlackboxFunction):
     :param preprocess_func: data preprocessing function pointer, default=None
     :param callback_func: callback function pointer, default=None
     :param data: data object, default=None
-    :param mpi_comm: [MPI communicator] MPI communicator instance. If None, we create a new MPI.COMM_WORLD, default=None
+    :param mpi_comm: [MPI communicator] MPI communicator instance or a LocalCommunicator. If None, we create a new
+                     MPI.COMM_WORLD, default=None
+    :param block_weights: [list] if set, mpi_comm is expected to connect the master with sub-masters and candidates are
+                          sent as one block per sub-master, sized proportional to the weights, default=None
     :param kwargs: additional arg=value pairs
     """
 
-    @default_kwargs(blackbox_func=None, dataloader_func=None, preprocess_func=None, callback_func=None, data=None, mpi_comm=None)
+    @default_kwargs(blackbox_func=None, dataloader_func=None, preprocess_func=None, callback_func=None, data=None, mpi_comm=None, block_weights=None)
     def __init__(self, **kwargs):
         mpi_comm = kwargs['mpi_comm']
+        self._block_weights = kwargs['block_weights']
+        self._idle_workers = None       # ranks without a submitted candidate, created on the first submit
+        self._pending = {}              # candidate ID -> rank evaluating it
         del kwargs['mpi_comm']
+        del kwargs['block_weights']
         self._mpi_comm = None
 
         if mpi_comm is None:
-            print('MPIBlackboxFunction: No mpi_comm given: Using MPI.COMM_WORLD')
+            from mpi4py import MPI
+            LOG.info('MPIBlackboxFunction: No mpi_comm given: Using MPI.COMM_WORLD')
             self._mpi_comm = MPI.COMM_WORLD
         else:
             self._mpi_comm = mpi_comm
@@ -67,17 +121,97 @@ class MPIBlackboxFunction(BlackboxFunction):
         super().__init__(**kwargs)
 
     def call_batch(self, candidates):
+        if self._block_weights is not None:
+            return self.call_batch_blocks(candidates)
+        results = dispatch_candidates(self._mpi_comm, candidates)
+        LOG.debug('All results received!')
+        return results
+
+    def call_batch_blocks(self, candidates):
+        """
+        Hierarchical counterpart of call_batch. The candidates are split into one block per sub-master, each sub-master
+        distributes its block among the workers on its node and returns a single aggregated result dict.
+
+        :param candidates: [list] CandidateDescriptor instances or a CandidateBatch, the latter is sent as columnar
+                           blocks
+
+        :return: [dict] results {candidate.ID: {'loss': ..., 'book_time': ..., 'refresh_time': ...}, ...}
+        """
         results = dict()
-        size = self._mpi_comm.Get_size()
-
-        for i, candidate in enumerate(candidates):
-            dest = (i % (size-1)) + 1
-            self._mpi_comm.send(candidate, dest=dest, tag=MPI_TAGS.MPI_SEND_CANDIDATE.value)
-
-        while True:
-            for i in range(size - 1):
-                if len(candidates) == len(results):
-                    print('All results received!')
-                    return results
-                cand_id, result_dict = self._mpi_comm.recv(source=i + 1, tag=MPI_TAGS.MPI_SEND_RESULTS.value)
-                results[cand_id] = result_dict
\ No newline at end of file
+        if not isinstance(candidates, CandidateBatch):
+            candidates = list(candidates)
+        blocks = split_candidates(candidates, self._block_weights)
+        for i, block in enumerate(blocks):
+            if len(block) > 0:
+                self._mpi_comm.send(block, dest=i + 1, tag=MPI_TAGS.MPI_SEND_CANDIDATE_BLOCK.value)
+        for i, block in enumerate(blocks):
+            if len(block) > 0:
+                results.update(self._mpi_comm.recv(source=i + 1, tag=MPI_TAGS.MPI_SEND_RESULTS_BLOCK.value))
+        return results
+
+    def supports_async(self):
+        """
+        True if candidates can be submitted one by one via submit and receive, which requires the flat topology.
+
+        :return: [bool] async support
+        """
+        return self._block_weights is None
+
+    def num_workers(self):
+        """
+        Returns the number of ranks evaluating candidates. In hierarchical mode these are the workers behind all
+        sub-masters, not the sub-masters the communicator connects to.
+
+        :return: [int] number of workers
+        """
+        if self._block_weights is not None:
+            return int(sum(self._block_weights))
+        return self._mpi_comm.Get_size() - 1
+
+    def num_idle_workers(self):
+        """
+        Returns the number of workers a candidate can be submitted to without waiting.
+
+        :return: [int] number of idle workers
+        """
+        return self.num_workers() - len(self._pending)
+
+    def num_pending(self):
+        """
+        Returns the number of submitted candidates whose results were not received yet.
+
+        :return: [int] number of pending candidates
+        """
+        return len(self._pending)
+
+    def submit(self, candidate):
+        """
+        Sends a single candidate to an idle worker and returns immediately. Together with receive this allows solvers
+        to keep all workers busy instead of waiting for the slowest candidate of a batch.
+
+        :param candidate: [CandidateDescriptor] candidate to evaluate
+        """
+        assert self.supports_async(), "precondition violation, submit is not supported in hierarchical mode!"
+        if self._idle_workers is None:
+            self._idle_workers = list(range(1, self._mpi_comm.Get_size()))
+        assert len(self._idle_workers) > 0, "precondition violation, no idle worker available!"
+        dest = self._idle_workers.pop(0)
+        self._pending[candidate.ID] = dest
+        self._mpi_comm.send(candidate, dest=dest, tag=MPI_TAGS.MPI_SEND_CANDIDATE.value)
+
+    def receive(self):
+        """
+        Blocks until the result of any submitted candidate arrived, the worker becomes idle again.
+
+        :return: [int], [dict] candidate ID and result {'loss': ..., 'book_time': ..., 'refresh_time': ...}
+        """
+        assert len(self._pending) > 0, "precondition violation, no candidate submitted!"
+        cand_id, result_dict = self._mpi_comm.recv(source=self._any_source(), tag=MPI_TAGS.MPI_SEND_RESULTS.value)
+        self._idle_workers.append(self._pending.pop(cand_id))
+        return cand_id, result_dict
+
+    def _any_source(self):
+        if hasattr(self._mpi_comm, 'ANY_SOURCE'):
+            return self._mpi_comm.ANY_SOURCE
+        from mpi4py import MPI
+        return MPI.ANY_SOURCE
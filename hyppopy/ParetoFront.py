@@ -0,0 +1,215 @@
+# Hyppopy - A Hyper-Parameter Optimization Toolbox
+#
+# Copyright (c) German Cancer Research Center,
+# Division of Medical Image Computing.
+# All rights reserved.
+#
+# This software is distributed WITHOUT ANY WARRANTY; without
+# even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE.
+#
+# See LICENSE
+
+########################################################################################################################
+# USAGE
+#
+# A blackbox function returning a list, tuple or 1d array of losses is treated as multi-objective, all objectives are
+# minimized. Each solver keeps the non-dominated trials in a ParetoFront that is updated with every evaluation:
+#
+#    def my_loss_function(data, params):
+#        ...
+#        return [error, runtime]
+#
+#    solver.blackbox = my_loss_function
+#    solver.run()
+#    front = solver.get_pareto_front()      # DataFrame with the parameters and loss_0, loss_1, ...
+#
+# The NSGA2Solver [nsga2] optimizes all objectives at once. Sampling solvers like randomsearch accept vector losses as
+# well, their best parameter set is the Pareto optimal one with the smallest sum of normalized losses.
+########################################################################################################################
+
+__all__ = ['is_multi_objective', 'dominates', 'non_dominated_sort', 'crowding_distance', 'best_compromise',
+           'ParetoFront']
+
+import os
+import logging
+import numpy as np
+from hyppopy.globals import DEBUGLEVEL
+
+LOG = logging.getLogger(os.path.basename(__file__))
+LOG.setLevel(DEBUGLEVEL)
+
+
+def is_multi_objective(loss):
+    """
+    Returns True if a blackbox return value is a vector of losses.
+
+    :param loss: [object] blackbox return value
+
+    :return: [bool] True for lists, tuples and 1d arrays
+    """
+    return isinstance(loss, (list, tuple, np.ndarray)) and np.ndim(loss) == 1
+
+
+def dominates(a, b):
+    """
+    Returns True if loss vector a dominates b, i.e. a is nowhere worse and somewhere better.
+
+    :param a: [array] loss vector
+    :param b: [array] loss vector
+
+    :return: [bool] dominance flag
+    """
+    a, b = np.asarray(a), np.asarray(b)
+    return bool(np.all(a <= b) and np.any(a < b))
+
+
+def non_dominated_sort(F):
+    """
+    Sorts loss vectors into fronts via efficient non-dominated sorting with binary search (ENS-BS, Zhang et al. 2015).
+    The points are processed in lexicographic order, thus a point can only be dominated by points already assigned,
+    for each point the first front not dominating it is found by binary search. In contrast to the fast non-dominated
+    sort of NSGA-II no O(n^2) dominance matrix is built.
+
+    :param F: [ndarray] loss vectors (n, objectives)
+
+    :return: [list] fronts, each an int array of row indices, the first one is the Pareto front
+    """
+    F = np.asarray(F, dtype=float)
+    if len(F) == 0:
+        return []
+    if F.ndim == 1:
+        F = F[:, None]
+    order = np.lexsort(F.T[::-1])
+    fronts = []
+    members = []
+    for i in order:
+        f = F[i]
+        lo, hi = 0, len(fronts)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            front = members[mid]
+            dominated = np.any(np.all(front <= f, axis=1) & np.any(front < f, axis=1))
+            if dominated:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo == len(fronts):
+            fronts.append([i])
+            members.append(f[None, :])
+        else:
+            fronts[lo].append(i)
+            members[lo] = np.vstack([members[lo], f])
+    return [np.array(front, dtype=int) for front in fronts]
+
+
+def crowding_distance(F):
+    """
+    Crowding distance of the points of one front, boundary points get an infinite distance.
+
+    :param F: [ndarray] loss vectors of a front (n, objectives)
+
+    :return: [ndarray] crowding distances (n,)
+    """
+    F = np.asarray(F, dtype=float)
+    n, m = F.shape
+    distance = np.zeros(n)
+    if n <= 2:
+        distance[:] = np.inf
+        return distance
+    order = np.argsort(F, axis=0, kind='stable')
+    sorted_F = np.take_along_axis(F, order, axis=0)
+    span = sorted_F[-1] - sorted_F[0]
+    span[span == 0] = 1.0
+    gaps = (sorted_F[2:] - sorted_F[:-2]) / span
+    for k in range(m):
+        distance[order[1:-1, k]] += gaps[:, k]
+        distance[order[[0, -1], k]] = np.inf
+    return distance
+
+
+def best_compromise(F):
+    """
+    Returns the Pareto optimal point with the smallest sum of losses normalized to [0, 1] per objective, used where a
+    single best parameter set is required.
+
+    :param F: [ndarray] loss vectors (n, objectives), rows containing nan are ignored
+
+    :return: [int] row index, None if there is no valid row
+    """
+    F = np.asarray(F, dtype=float)
+    valid = np.where(~np.any(np.isnan(F), axis=1))[0]
+    if len(valid) == 0:
+        return None
+    front = valid[non_dominated_sort(F[valid])[0]]
+    lo, hi = np.min(F[front], axis=0), np.max(F[front], axis=0)
+    span = np.where(hi > lo, hi - lo, 1.0)
+    scores = np.sum((F[front] - lo) / span, axis=1)
+    return int(front[np.argmin(scores)])
+
+
+class ParetoFront(object):
+    """
+    Incrementally maintained set of non-dominated loss vectors. Adding a point compares it against the current front
+    only, O(front size * objectives), instead of rescanning all trials.
+    """
+    def __init__(self):
+        self._ids = []
+        self._losses = None
+
+    def add(self, point_id, losses):
+        """
+        Adds a point if it is not dominated by the front and removes the front members it dominates.
+
+        :param point_id: [object] identifier, e.g. the trial id
+        :param losses: [array] loss vector
+
+        :return: [bool] True if the point entered the front
+        """
+        f = np.asarray(losses, dtype=float).ravel()
+        if np.any(np.isnan(f)):
+            return False
+        if self._losses is None:
+            self._ids = [point_id]
+            self._losses = f[None, :]
+            return True
+        assert self._losses.shape[1] == len(f), "precondition violation, all loss vectors need the same length!"
+        if np.any(np.all(self._losses <= f, axis=1)):
+            # dominated or duplicate
+            return False
+        keep = ~(np.all(f <= self._losses, axis=1) & np.any(f < self._losses, axis=1))
+        self._ids = [i for i, k in zip(self._ids, keep) if k] + [point_id]
+        self._losses = np.vstack([self._losses[keep], f])
+        return True
+
+    def hypervolume(self, reference):
+        """
+        Dominated hypervolume with respect to a reference point, implemented for two objectives.
+
+        :param reference: [array] reference point, members not dominating it are ignored
+
+        :return: [float] hypervolume
+        """
+        assert len(reference) == 2, "precondition violation, hypervolume is implemented for two objectives only!"
+        if len(self) == 0:
+            return 0.0
+        F = self._losses[np.all(self._losses < np.asarray(reference), axis=1)]
+        F = F[np.argsort(F[:, 0])]
+        widths = np.diff(np.append(F[:, 0], reference[0]))
+        return float(np.sum(widths * (reference[1] - F[:, 1])))
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __contains__(self, point_id):
+        return point_id in self._ids
+
+    @property
+    def ids(self):
+        return list(self._ids)
+
+    @property
+    def losses(self):
+        if self._losses is None:
+            return np.zeros((0, 0))
+        return self._losses.copy()
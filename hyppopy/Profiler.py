@@ -0,0 +1,192 @@
+# Hyppopy - A Hyper-Parameter Optimization Toolbox
+#
+# Copyright (c) German Cancer Research Center,
+# Division of Medical Image Computing.
+# All rights reserved.
+#
+# This software is distributed WITHOUT ANY WARRANTY; without
+# even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE.
+#
+# See LICENSE
+
+########################################################################################################################
+# USAGE
+#
+# The PhaseProfiler records the time a solver run spends in each phase. Assign it to a solver before calling run:
+#
+#    solver.profiler = PhaseProfiler(trace=True, cprofile=True)
+#    solver.run()
+#    report = solver.profiler.report()          # {'wall': ..., 'phases': {'blackbox': {'count': ..., 'total': ...}}}
+#    solver.profiler.print_report()
+#    solver.profiler.write_chrome_trace("trace.json")   # open in chrome://tracing or https://ui.perfetto.dev
+#    solver.profiler.dump_cprofile("run.prof")          # inspect with python -m pstats run.prof or snakeviz
+#
+# The phases are exclusive:
+#
+#    convert_searchspace     conversion of the hyppopy parameter space into the solver format
+#    candidate_generation    proposing new parameter sets (random sampling, designs, acquisition optimization, ...)
+#    model_update            updating the solver state with evaluated losses (surrogate model, CMA-ES, selection, ...)
+#    dispatch                BlackboxFunction.call_batch, for MPI the serialization, sending and waiting for the workers
+#    blackbox                local blackbox calls
+#    bookkeeping             creation of the trials
+#    callbacks               callback_func of the BlackboxFunction and evaluation hooks
+#    solver                  the remaining time of execute_solver, e.g. the suggestion logic of hyperopt or optuna
+#
+# Without a profiler the solvers don't measure anything.
+########################################################################################################################
+
+__all__ = ['PHASES', 'PhaseProfiler']
+
+import os
+import time
+import json
+import logging
+import threading
+from contextlib import contextmanager
+from hyppopy.globals import DEBUGLEVEL
+
+LOG = logging.getLogger(os.path.basename(__file__))
+LOG.setLevel(DEBUGLEVEL)
+
+PHASES = ["convert_searchspace", "candidate_generation", "model_update", "dispatch", "blackbox", "bookkeeping",
+          "callbacks", "solver"]
+
+
+class PhaseProfiler(object):
+    """
+    Accumulates the time spent in named phases of a solver run, optionally keeps every interval for a Chrome trace and
+    runs cProfile during execute_solver.
+    """
+    def __init__(self, trace=False, cprofile=False):
+        """
+        :param trace: [bool] keep each interval for write_chrome_trace, default=False
+        :param cprofile: [bool] run cProfile during execute_solver, default=False
+        """
+        self.trace = trace
+        self.cprofile = cprofile
+        self._lock = threading.Lock()
+        self._cprofile = None
+        self.reset()
+
+    def reset(self):
+        """
+        Clears all measurements, called by HyppopySolver.run.
+        """
+        self._totals = {}
+        self._counts = {}
+        self._events = []
+        self._origin = time.perf_counter()
+        self._wall = None
+        self._execute = None
+        self._cprofile = None
+
+    def record(self, name, start, end):
+        """
+        Adds an interval measured with time.perf_counter.
+
+        :param name: [str] phase name
+        :param start: [float] start time
+        :param end: [float] end time
+        """
+        with self._lock:
+            self._totals[name] = self._totals.get(name, 0.0) + end - start
+            self._counts[name] = self._counts.get(name, 0) + 1
+            if self.trace:
+                self._events.append((name, start, end, threading.get_ident()))
+
+    @contextmanager
+    def phase(self, name):
+        """
+        Context manager measuring the enclosed code as phase name.
+
+        :param name: [str] phase name
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, start, time.perf_counter())
+
+    def start_run(self):
+        self.reset()
+        if self.cprofile:
+            import cProfile
+            self._cprofile = cProfile.Profile()
+
+    def start_execute(self):
+        self._execute = time.perf_counter()
+        if self._cprofile is not None:
+            self._cprofile.enable()
+
+    def stop_execute(self):
+        end = time.perf_counter()
+        if self._cprofile is not None:
+            self._cprofile.disable()
+        if self.trace:
+            self._events.append(("execute_solver", self._execute, end, threading.get_ident()))
+        inner = sum(total for name, total in self._totals.items() if name not in ["convert_searchspace", "solver"])
+        self._totals["solver"] = max(end - self._execute - inner, 0.0)
+        self._counts["solver"] = 1
+
+    def stop_run(self):
+        self._wall = time.perf_counter() - self._origin
+
+    def report(self):
+        """
+        Returns the measurements of the last run.
+
+        :return: [dict] {'wall': seconds, 'phases': {name: {'count', 'total', 'mean', 'fraction'}}, 'overhead': seconds
+                 outside the blackbox and dispatch}
+        """
+        wall = self._wall if self._wall is not None else time.perf_counter() - self._origin
+        phases = {}
+        for name in PHASES + sorted(n for n in self._totals if n not in PHASES):
+            if name not in self._totals:
+                continue
+            total = self._totals[name]
+            count = self._counts[name]
+            phases[name] = {'count': count, 'total': total, 'mean': total / count,
+                            'fraction': total / wall if wall > 0 else 0.0}
+        overhead = sum(p['total'] for name, p in phases.items() if name not in ["blackbox", "dispatch"])
+        return {'wall': wall, 'phases': phases, 'overhead': overhead}
+
+    def print_report(self):
+        """
+        Prints the measurements of the last run.
+        """
+        report = self.report()
+        print("#" * 64)
+        print("###{:^58}###".format("Phase Profile"))
+        print("#" * 64)
+        print(" {:<22}{:>10}{:>12}{:>12}{:>8}".format("phase", "count", "total [s]", "mean [ms]", "[%]"))
+        for name, p in report['phases'].items():
+            print(" {:<22}{:>10}{:>12.4f}{:>12.4f}{:>8.1f}".format(name, p['count'], p['total'], p['mean'] * 1e3,
+                                                                   p['fraction'] * 100))
+        print(" {:<22}{:>10}{:>12.4f}".format("wall", "", report['wall']))
+        print(" {:<22}{:>10}{:>12.4f}".format("overhead", "", report['overhead']))
+        print("#" * 64)
+
+    def write_chrome_trace(self, filename):
+        """
+        Writes the recorded intervals in the Chrome trace event format, requires trace=True.
+
+        :param filename: [str] output file
+        """
+        assert self.trace, "precondition violation, the profiler needs trace=True to write a trace!"
+        pid = os.getpid()
+        events = [{"name": name, "cat": "hyppopy", "ph": "X", "pid": pid, "tid": tid,
+                   "ts": (start - self._origin) * 1e6, "dur": (end - start) * 1e6}
+                  for name, start, end, tid in self._events]
+        with open(filename, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+    def dump_cprofile(self, filename):
+        """
+        Writes the cProfile statistics of execute_solver, requires cprofile=True. Only the thread calling run is
+        profiled.
+
+        :param filename: [str] output file, readable via pstats.Stats
+        """
+        assert self._cprofile is not None, "precondition violation, the profiler needs cprofile=True and a finished run!"
+        self._cprofile.dump_stats(filename)
@@ -0,0 +1,234 @@
+# Hyppopy - A Hyper-Parameter Optimization Toolbox
+#
+# Copyright (c) German Cancer Research Center,
+# Division of Medical Image Computing.
+# All rights reserved.
+#
+# This software is distributed WITHOUT ANY WARRANTY; without
+# even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE.
+#
+# See LICENSE
+
+########################################################################################################################
+# USAGE
+#
+# A blackbox function with a parameter named reporter gets passed a TrialReporter each evaluation. It reports
+# intermediate losses, e.g. per epoch, and asks whether the trial should be stopped early:
+#
+#    def my_loss_function(data, params, reporter):
+#        for epoch in range(100):
+#            loss = train_one_epoch(data, params)
+#            reporter.report(epoch, loss)
+#            if reporter.should_prune():
+#                raise TrialPruned()
+#        return loss
+#
+# The decision is taken by the pruner of the solver, a MedianPruner by default, that compares the reported values
+# with the values of the completed trials at the same step. A pruned trial gets the status 'pruned' and its last
+# reported value as loss. Set solver.pruner to use another pruner, e.g. PercentilePruner(percentile=25.0).
+########################################################################################################################
+
+__all__ = ['TrialPruned', 'TrialReporter', 'Pruner', 'PercentilePruner', 'MedianPruner', 'accepts_reporter']
+
+import os
+import inspect
+import logging
+import numpy as np
+from hyppopy.globals import DEBUGLEVEL
+
+LOG = logging.getLogger(os.path.basename(__file__))
+LOG.setLevel(DEBUGLEVEL)
+
+
+class TrialPruned(Exception):
+    """
+    Raised by a blackbox function to stop a trial early. The solver stores the last reported value as loss.
+    """
+    def __init__(self, *args):
+        Exception.__init__(self, *args)
+        self.value = None
+
+
+def accepts_reporter(func):
+    """
+    Checks if a blackbox has a parameter named reporter. BlackboxFunction instances are checked via their
+    blackbox_func.
+
+    :param func: [callable] blackbox function or BlackboxFunction instance
+
+    :return: [bool] True if func accepts a reporter
+    """
+    while hasattr(func, 'blackbox_func'):
+        func = func.blackbox_func
+    try:
+        return 'reporter' in inspect.signature(func).parameters
+    except (TypeError, ValueError):
+        return False
+
+
+class TrialReporter(object):
+    """
+    The TrialReporter is passed to the blackbox function of a single trial. It forwards intermediate values to the
+    pruner and asks it whether the trial should be stopped.
+    """
+    def __init__(self, pruner=None, trial_id=None):
+        """
+        :param pruner: [Pruner] pruner instance, if None the trial is never pruned, default=None
+        :param trial_id: [object] trial identifier, default=None
+        """
+        self._pruner = pruner
+        self._trial_id = trial_id
+        self._values = {}
+        self._last_step = None
+
+    def report(self, step, value):
+        """
+        Reports an intermediate loss.
+
+        :param step: [int] step, e.g. the epoch
+        :param value: [float] intermediate loss
+        """
+        self._values[step] = value
+        self._last_step = step
+        if self._pruner is not None:
+            self._pruner.report(self._trial_id, step, value)
+
+    def should_prune(self):
+        """
+        Returns True if the trial should be stopped according to the values reported so far.
+
+        :return: [bool] prune decision
+        """
+        if self._pruner is None or self._last_step is None:
+            return False
+        return self._pruner.should_prune(self._trial_id, self._last_step)
+
+    def complete(self):
+        """
+        Marks the trial as completed, its values are used as reference for later trials.
+        """
+        if self._pruner is not None:
+            self._pruner.complete(self._trial_id)
+
+    def discard(self):
+        """
+        Drops the values of a pruned or failed trial, they are not used as reference for later trials.
+        """
+        if self._pruner is not None:
+            self._pruner.discard(self._trial_id)
+
+    @property
+    def values(self):
+        return self._values
+
+    @property
+    def last_value(self):
+        if self._last_step is None:
+            return None
+        return self._values[self._last_step]
+
+
+class Pruner(object):
+    """
+    Base class of the pruners. A pruner keeps the intermediate values of all trials and decides on a trial based on
+    the history of the completed trials. Child classes implement prune.
+    """
+    def __init__(self, n_startup_trials=5, n_warmup_steps=0):
+        """
+        :param n_startup_trials: [int] no pruning until this number of trials completed, default=5
+        :param n_warmup_steps: [int] no pruning before this step, default=0
+        """
+        self.n_startup_trials = n_startup_trials
+        self.n_warmup_steps = n_warmup_steps
+        self._running = {}
+        self._completed = []
+
+    def reset(self):
+        """
+        Forgets the history of all trials.
+        """
+        self._running = {}
+        self._completed = []
+
+    def report(self, trial_id, step, value):
+        self._running.setdefault(trial_id, {})[step] = value
+
+    def complete(self, trial_id):
+        if trial_id in self._running:
+            self._completed.append(self._running.pop(trial_id))
+
+    def discard(self, trial_id):
+        self._running.pop(trial_id, None)
+
+    def should_prune(self, trial_id, step):
+        """
+        Returns True if the trial should be stopped at step.
+
+        :param trial_id: [object] trial identifier
+        :param step: [int] current step
+
+        :return: [bool] prune decision
+        """
+        if len(self._completed) < self.n_startup_trials or step < self.n_warmup_steps:
+            return False
+        values = self._running.get(trial_id, {})
+        current = _best_until(values, step)
+        if current is None:
+            return False
+        references = [_best_until(history, step) for history in self._completed]
+        references = [v for v in references if v is not None]
+        if len(references) == 0:
+            return False
+        return self.prune(current, np.array(references))
+
+    def prune(self, value, references):
+        """
+        Decides on a trial. Needs to be implemented by child classes.
+
+        :param value: [float] best value of the trial up to the current step
+        :param references: [ndarray] best values of the completed trials up to the current step
+
+        :return: [bool] prune decision
+        """
+        raise NotImplementedError('users must define prune to use this class')
+
+
+def _best_until(history, step):
+    values = [v for s, v in history.items() if s <= step and v is not None and not np.isnan(v)]
+    if len(values) == 0:
+        return None
+    return min(values)
+
+
+class PercentilePruner(Pruner):
+    """
+    Prunes a trial if its best intermediate loss is worse than the given percentile of the best intermediate losses of
+    the completed trials at the same step.
+    """
+    def __init__(self, percentile=25.0, n_startup_trials=5, n_warmup_steps=0):
+        """
+        :param percentile: [float] percentile in [0, 100] of the completed trials a trial needs to reach, default=25.0
+        :param n_startup_trials: [int] no pruning until this number of trials completed, default=5
+        :param n_warmup_steps: [int] no pruning before this step, default=0
+        """
+        assert 0.0 <= percentile <= 100.0, "precondition violation, percentile needs to be in [0, 100]!"
+        Pruner.__init__(self, n_startup_trials=n_startup_trials, n_warmup_steps=n_warmup_steps)
+        self.percentile = percentile
+
+    def prune(self, value, references):
+        return value > np.percentile(references, self.percentile)
+
+
+class MedianPruner(PercentilePruner):
+    """
+    Median stopping rule, prunes a trial if its best intermediate loss is worse than the median of the completed
+    trials at the same step.
+    """
+    def __init__(self, n_startup_trials=5, n_warmup_steps=0):
+        """
+        :param n_startup_trials: [int] no pruning until this number of trials completed, default=5
+        :param n_warmup_steps: [int] no pruning before this step, default=0
+        """
+        PercentilePruner.__init__(self, percentile=50.0, n_startup_trials=n_startup_trials,
+                                  n_warmup_steps=n_warmup_steps)
@@ -16,36 +16,80 @@ from .Singleton import *
 
 import os
 import logging
+import importlib
 from hyppopy.HyppopyProject import HyppopyProject
-from hyppopy.solvers.OptunaSolver import OptunaSolver
-from hyppopy.solvers.HyperoptSolver import HyperoptSolver
-from hyppopy.solvers.OptunitySolver import OptunitySolver
-from hyppopy.solvers.GridsearchSolver import GridsearchSolver
-from hyppopy.solvers.RandomsearchSolver import RandomsearchSolver
-from hyppopy.solvers.QuasiRandomsearchSolver import QuasiRandomsearchSolver
 from hyppopy.globals import DEBUGLEVEL
 
 LOG = logging.getLogger(os.path.basename(__file__))
 LOG.setLevel(DEBUGLEVEL)
 
+# entry point group third-party packages use to register solvers, e.g. in their setup.py:
+#   entry_points={"hyppopy.solvers": ["mysolver = mypackage.MySolver:MySolver"]}
+ENTRY_POINT_GROUP = "hyppopy.solvers"
+
+
+def _solver_entry_points():
+    try:
+        from importlib.metadata import entry_points
+    except ImportError:
+        return []
+    eps = entry_points()
+    if hasattr(eps, "select"):
+        return list(eps.select(group=ENTRY_POINT_GROUP))
+    return list(eps.get(ENTRY_POINT_GROUP, []))
+
 
 @singleton_object
 class SolverPool(metaclass=Singleton):
     """
     The SolverPool is a helper singleton class to get the desired solver either by name and a HyppopyProject instance or
-    by a HyppopyProject instance only, if it defines a setting field called solver.
+    by a HyppopyProject instance only, if it defines a setting field called solver. Solvers are registered by name and
+    import path, a solver module and the library it wraps are imported only when the solver is requested via get.
+    Third-party solvers register via the entry point group hyppopy.solvers or by calling register.
     """
 
     def __init__(self):
         """
-        Constructor defines the solvers available. If a new solver should be added, add it's name to this list.
+        Constructor defines the solvers available. If a new solver should be added, add it's name and import path
+        "module:ClassName" to this dict.
         """
-        self._solver_list = ["hyperopt",
-                             "optunity",
-                             "optuna",
-                             "randomsearch",
-                             "quasirandomsearch",
-                             "gridsearch"]
+        self._solvers = {"hyperopt": "hyppopy.solvers.HyperoptSolver:HyperoptSolver",
+                         "optunity": "hyppopy.solvers.OptunitySolver:OptunitySolver",
+                         "optuna": "hyppopy.solvers.OptunaSolver:OptunaSolver",
+                         "randomsearch": "hyppopy.solvers.RandomsearchSolver:RandomsearchSolver",
+                         "quasirandomsearch": "hyppopy.solvers.QuasiRandomsearchSolver:QuasiRandomsearchSolver",
+                         "gridsearch": "hyppopy.solvers.GridsearchSolver:GridsearchSolver",
+                         "hyperband": "hyppopy.solvers.HyperbandSolver:HyperbandSolver",
+                         "asha": "hyppopy.solvers.ASHASolver:ASHASolver",
+                         "gaussianprocess": "hyppopy.solvers.GaussianProcessSolver:GaussianProcessSolver",
+                         "cmaes": "hyppopy.solvers.CMAESSolver:CMAESSolver",
+                         "designofexperiments": "hyppopy.solvers.DesignOfExperimentsSolver:DesignOfExperimentsSolver",
+                         "nsga2": "hyppopy.solvers.NSGA2Solver:NSGA2Solver",
+                         "portfolio": "hyppopy.solvers.PortfolioSolver:PortfolioSolver"}
+        self._entry_points_loaded = False
+
+    def _load_entry_points(self):
+        if self._entry_points_loaded:
+            return
+        self._entry_points_loaded = True
+        for ep in _solver_entry_points():
+            if ep.name in self._solvers:
+                LOG.warning("solver entry point {} ignored, the name is already registered!".format(ep.name))
+                continue
+            self._solvers[ep.name] = ep
+
+    def register(self, solver_name, solver):
+        """
+        Registers a solver under a name.
+
+        :param solver_name: [str] solver name
+        :param solver: [str, class] import path "module:ClassName" or a HyppopySolver subclass
+        """
+        assert isinstance(solver_name, str), "precondition violation, solver_name type str expected, got {} instead!".format(type(solver_name))
+        assert isinstance(solver, (str, type)), "precondition violation, solver import path or class expected, got {} instead!".format(type(solver))
+        if isinstance(solver, str):
+            assert ":" in solver, "precondition violation, solver import path of the form module:ClassName expected, got {} instead!".format(solver)
+        self._solvers[solver_name] = solver
 
     def get_solver_names(self):
         """
@@ -53,7 +97,29 @@ class SolverPool(metaclass=Singleton):
 
         :return: [list] solver list
         """
-        return self._solver_list
+        self._load_entry_points()
+        return list(self._solvers.keys())
+
+    def get_solver_class(self, solver_name):
+        """
+        Imports the module of a registered solver and returns its class.
+
+        :param solver_name: [str] solver name
+
+        :return: [class] the solver class
+        """
+        self._load_entry_points()
+        if solver_name not in self._solvers:
+            raise AssertionError("Solver named [{}] not implemented!".format(solver_name))
+        solver = self._solvers[solver_name]
+        if isinstance(solver, str):
+            module_name, class_name = solver.split(":")
+            solver = getattr(importlib.import_module(module_name), class_name)
+        elif not isinstance(solver, type):
+            # entry point
+            solver = solver.load()
+        self._solvers[solver_name] = solver
+        return solver
 
     def get(self, solver_name=None, project=None):
         """
@@ -70,30 +136,7 @@ class SolverPool(metaclass=Singleton):
             assert isinstance(project, HyppopyProject), "precondition violation, project type HyppopyProject expected, got {} instead!".format(type(project))
             if "solver" in project.__dict__:
                 solver_name = project.solver
-        if solver_name not in self._solver_list:
-            raise AssertionError("Solver named [{}] not implemented!".format(solver_name))
-
-        if solver_name == "hyperopt":
-            if project is not None:
-                return HyperoptSolver(project)
-            return HyperoptSolver()
-        elif solver_name == "optunity":
-            if project is not None:
-                return OptunitySolver(project)
-            return OptunitySolver()
-        elif solver_name == "optuna":
-            if project is not None:
-                return OptunaSolver(project)
-            return OptunaSolver()
-        elif solver_name == "gridsearch":
-            if project is not None:
-                return GridsearchSolver(project)
-            return GridsearchSolver()
-        elif solver_name == "randomsearch":
-            if project is not None:
-                return RandomsearchSolver(project)
-            return RandomsearchSolver()
-        elif solver_name == "quasirandomsearch":
-            if project is not None:
-                return QuasiRandomsearchSolver(project)
-            return QuasiRandomsearchSolver()
+        solver_class = self.get_solver_class(solver_name)
+        if project is not None:
+            return solver_class(project)
+        return solver_class()
@@ -14,7 +14,6 @@ __all__ = ['VisdomViewer']
 
 import warnings
 import numpy as np
-from visdom import Visdom
 
 
 def time_formatter(time_s):
@@ -46,6 +45,8 @@ class VisdomViewer(object):
         :param port: [int] server port, default=8097
         :param server: [str] server name, default=http://localhost
         """
+        from visdom import Visdom
+
         self._viz = Visdom(port=port, server=server)
         self._enabled = self._viz.check_connection(timeout_seconds=3)
         if not self._enabled:
@@ -0,0 +1,276 @@
+# Hyppopy - A Hyper-Parameter Optimization Toolbox
+#
+# Copyright (c) German Cancer Research Center,
+# Division of Medical Image Computing.
+# All rights reserved.
+#
+# This software is distributed WITHOUT ANY WARRANTY; without
+# even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE.
+#
+# See LICENSE
+
+########################################################################################################################
+# USAGE
+#
+# The ComparisonRunner evaluates solvers statistically on the virtual parameter spaces of the FunctionSimulator. Each
+# combination of solver, function, iteration budget and repeat is an independent task, seeded with seed+repeat, the
+# tasks are executed in a process pool:
+#
+#    runner = ComparisonRunner("comparison.jsonl", solvers=["randomsearch", "hyperopt"], functions=["5D"],
+#                              iterations=[15, 50, 300], repeats=50, processes=16)
+#    records = runner.run()
+#    summary = summarize(records)        # summary["hyperopt"]["5D"][50]["loss"] -> [mean, std]
+#
+# Every finished task is appended as one JSON line to the output file. Calling run again, e.g. after an interruption,
+# only executes the tasks missing in the file. The same is available on the command line:
+#
+#    $ python -m hyppopy.benchmark.ComparisonRunner comparison.jsonl --solvers randomsearch hyperopt --repeats 50
+########################################################################################################################
+
+__all__ = ['ComparisonRunner', 'run_task', 'load_records', 'summarize', 'main']
+
+import os
+import json
+import time
+import logging
+import argparse
+import multiprocessing
+import numpy as np
+from hyppopy.globals import DEBUGLEVEL
+
+LOG = logging.getLogger(os.path.basename(__file__))
+LOG.setLevel(DEBUGLEVEL)
+
+KEY = ["solver", "function", "iterations", "repeat", "seed"]
+# FunctionSimulator instances loaded by this process, pool workers load each function once
+_FUNCTIONS = {}
+
+
+def _function(name):
+    from hyppopy.benchmark.SolverBenchmark import _load_function
+    if name not in _FUNCTIONS:
+        _FUNCTIONS[name] = _load_function(name)
+    return _FUNCTIONS[name]
+
+
+def _to_builtin(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError("{} is not JSON serializable".format(type(value)))
+
+
+def run_task(task):
+    """
+    Runs one repeat of a solver, executed by the pool workers.
+
+    :param task: [dict] solver, function, iterations, repeat and seed
+
+    :return: [dict] the task with duration, best_loss, best parameter set and the losses in evaluation order, or the
+             task with an error message
+    """
+    from hyppopy.benchmark.SolverBenchmark import _create_solver
+    record = dict(task)
+    try:
+        vfunc = _function(task["function"])
+        solver = _create_solver(task["solver"], vfunc, task["iterations"], task["seed"])
+        start = time.perf_counter()
+        solver.run(print_stats=False)
+        record["duration"] = time.perf_counter() - start
+        losses = [trial['result']['loss'] for trial in solver.trials.trials]
+        record["losses"] = losses
+        record["best_loss"] = float(np.nanmin(losses))
+        record["best"] = solver.best
+    except Exception as e:
+        LOG.warning("task %s failed: %s", task, e)
+        record["error"] = "{}: {}".format(type(e).__name__, e)
+    return record
+
+
+def _key(record):
+    return tuple(record[k] for k in KEY)
+
+
+def load_records(filename):
+    """
+    Reads the records of a ComparisonRunner output file, a line truncated by an interruption is skipped.
+
+    :param filename: [str] JSON lines file
+
+    :return: [list] records
+    """
+    records = []
+    if not os.path.isfile(filename):
+        return records
+    with open(filename) as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                LOG.warning("skipped incomplete record in %s", filename)
+    return records
+
+
+class ComparisonRunner(object):
+    """
+    Runs solver x function x iterations x repeats tasks in a process pool, streams the records to a JSON lines file and
+    resumes from it.
+    """
+    def __init__(self, output, solvers, functions=("5D",), iterations=(50,), repeats=10, seed=0, processes=None,
+                 retry_failed=False):
+        """
+        :param output: [str] JSON lines file the records are appended to
+        :param solvers: [list] SolverPool names
+        :param functions: [list] names of default virtual parameter spaces, default=["5D"]
+        :param iterations: [list] iteration budgets, default=[50]
+        :param repeats: [int] number of repeats per solver, function and budget, default=10
+        :param seed: [int] seed of the first repeat, repeat i uses seed+i, default=0
+        :param processes: [int] number of worker processes, 1 runs in the calling process, default=None all cores
+        :param retry_failed: [bool] run tasks again that are stored with an error, default=False
+        """
+        assert repeats > 0, "precondition violation, repeats must be positive!"
+        self.output = output
+        self.solvers = list(solvers)
+        self.functions = list(functions)
+        self.iterations = list(iterations)
+        self.repeats = repeats
+        self.seed = seed
+        self.processes = os.cpu_count() if processes is None else processes
+        self.retry_failed = retry_failed
+
+    def tasks(self):
+        """
+        Returns all tasks of the comparison.
+
+        :return: [list] task dicts
+        """
+        return [{"solver": solver, "function": function, "iterations": iterations, "repeat": repeat,
+                 "seed": self.seed + repeat}
+                for function in self.functions
+                for solver in self.solvers
+                for iterations in self.iterations
+                for repeat in range(self.repeats)]
+
+    def pending(self):
+        """
+        Returns the tasks without a record in the output file.
+
+        :return: [list] task dicts
+        """
+        done = set(_key(r) for r in self._records() if not self.retry_failed or "error" not in r)
+        return [task for task in self.tasks() if _key(task) not in done]
+
+    def _records(self):
+        records = load_records(self.output)
+        if not os.path.isfile(self.output):
+            return records
+        with open(self.output) as f:
+            content = f.read()
+        if content and (not content.endswith("\n") or len(content.splitlines()) != len(records)):
+            # an interrupted write left an incomplete line, keep the valid records only
+            with open(self.output, "w") as f:
+                for record in records:
+                    f.write(json.dumps(record, default=_to_builtin) + "\n")
+        return records
+
+    def run(self):
+        """
+        Executes the pending tasks, each finished task is appended to the output file immediately.
+
+        :return: [list] records of the comparison
+        """
+        folder = os.path.dirname(os.path.abspath(self.output))
+        if not os.path.isdir(folder):
+            os.makedirs(folder)
+        pending = self.pending()
+        total = len(self.tasks())
+        LOG.info("%d of %d tasks pending", len(pending), total)
+        if len(pending) > 0:
+            with open(self.output, "a") as f:
+                for n, record in enumerate(self._execute(pending)):
+                    f.write(json.dumps(record, default=_to_builtin) + "\n")
+                    f.flush()
+                    LOG.info("finished task %d/%d: %s", n + 1, len(pending), _key(record))
+        keys = set(_key(task) for task in self.tasks())
+        records = {}
+        for record in load_records(self.output):
+            if _key(record) in keys:
+                records[_key(record)] = record
+        return list(records.values())
+
+    def _execute(self, tasks):
+        processes = min(self.processes, len(tasks))
+        if processes <= 1:
+            for task in tasks:
+                yield run_task(task)
+            return
+        if 'fork' in multiprocessing.get_all_start_methods():
+            context = multiprocessing.get_context('fork')
+        else:
+            context = multiprocessing.get_context()
+        with context.Pool(processes) as pool:
+            for record in pool.imap_unordered(run_task, tasks):
+                yield record
+
+
+def summarize(records):
+    """
+    Aggregates the records over the repeats.
+
+    :param records: [list] records returned by ComparisonRunner.run or load_records
+
+    :return: [dict] summary[solver][function][iterations] = {'repeats', 'errors', 'loss': [mean, std],
+             'duration': mean, 'best': {parameter: [mean, std]}}
+    """
+    groups = {}
+    for record in records:
+        groups.setdefault((record["solver"], record["function"], record["iterations"]), []).append(record)
+    summary = {}
+    for (solver, function, iterations), group in sorted(groups.items()):
+        ok = [r for r in group if "error" not in r]
+        entry = {"repeats": len(ok), "errors": len(group) - len(ok), "loss": None, "duration": None, "best": {}}
+        if len(ok) > 0:
+            losses = [r["best_loss"] for r in ok]
+            entry["loss"] = [float(np.mean(losses)), float(np.std(losses))]
+            entry["duration"] = float(np.mean([r["duration"] for r in ok]))
+            for name in ok[0]["best"]:
+                values = [r["best"][name] for r in ok]
+                if all(isinstance(v, (int, float)) for v in values):
+                    entry["best"][name] = [float(np.mean(values)), float(np.std(values))]
+        summary.setdefault(solver, {}).setdefault(function, {})[iterations] = entry
+    return summary
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Statistical comparison of hyppopy solvers on the FunctionSimulator.")
+    parser.add_argument("output", help="JSON lines file, existing records are reused")
+    parser.add_argument("--solvers", nargs="+", default=["randomsearch", "quasirandomsearch", "hyperopt", "optuna"],
+                        help="solver names, default: %(default)s")
+    parser.add_argument("--functions", nargs="+", default=["5D"], help="virtual parameter spaces, default: %(default)s")
+    parser.add_argument("--iterations", nargs="+", type=int, default=[15, 50, 300],
+                        help="iteration budgets, default: %(default)s")
+    parser.add_argument("--repeats", type=int, default=10, help="repeats per budget, default: %(default)s")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first repeat, default: %(default)s")
+    parser.add_argument("--processes", type=int, default=None, help="worker processes, default: all cores")
+    parser.add_argument("--retry-failed", action="store_true", help="run failed tasks again")
+    args = parser.parse_args(args)
+
+    runner = ComparisonRunner(args.output, args.solvers, args.functions, args.iterations, args.repeats, args.seed,
+                              args.processes, args.retry_failed)
+    summary = summarize(runner.run())
+    print(" {:<22}{:>6}{:>12}{:>10}{:>22}{:>14}".format("solver", "func", "iterations", "repeats", "best loss",
+                                                       "duration [s]"))
+    for solver, functions in summary.items():
+        for function, budgets in functions.items():
+            for iterations, entry in budgets.items():
+                loss = "{:.4f} +/- {:.4f}".format(*entry["loss"]) if entry["loss"] is not None else "-"
+                duration = "{:.3f}".format(entry["duration"]) if entry["duration"] is not None else "-"
+                print(" {:<22}{:>6}{:>12}{:>10}{:>22}{:>14}".format(solver, function, iterations, entry["repeats"],
+                                                                   loss, duration))
+    return summary
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,323 @@
+# Hyppopy - A Hyper-Parameter Optimization Toolbox
+#
+# Copyright (c) German Cancer Research Center,
+# Division of Medical Image Computing.
+# All rights reserved.
+#
+# This software is distributed WITHOUT ANY WARRANTY; without
+# even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE.
+#
+# See LICENSE
+
+########################################################################################################################
+# USAGE
+#
+# The solver benchmark runs the SolverPool solvers on the virtual parameter spaces of the FunctionSimulator and measures
+# per solver and function:
+#
+#    overhead_per_iteration  time outside the blackbox per evaluation, measured via the PhaseProfiler
+#    throughput              evaluations per second of time outside the blackbox
+#    memory_peak             peak of the python heap during the run in bytes, measured via tracemalloc in a separate run
+#    time_to_target          seconds until the best loss falls below the target loss, None if it is never reached
+#
+# The target loss of a function is its global minimum plus target_gap times its value range. Each repeat is seeded
+# with seed+repeat, the reported values are the medians over the repeats:
+#
+#    $ python -m hyppopy.benchmark.SolverBenchmark --functions 5D 6D --iterations 200 --repeats 5 --output new.json
+#    $ python -m hyppopy.benchmark.SolverBenchmark --input new.json --baseline old.json
+#
+# or from python:
+#
+#    from hyppopy.benchmark.SolverBenchmark import run_benchmarks, compare_results
+#    result = run_benchmarks(solvers=["randomsearch", "cmaes"], functions=["5D"], max_iterations=100, repeats=3)
+#    regressions = compare_results(baseline, result, tolerance=0.25)
+#
+# Solvers that fail on a function are reported with an error entry instead of stopping the benchmark.
+########################################################################################################################
+
+__all__ = ['DEFAULT_FUNCTIONS', 'SOLVER_SETTINGS', 'benchmark_solver', 'run_benchmarks', 'compare_results', 'main']
+
+import os
+import sys
+import json
+import time
+import random
+import logging
+import platform
+import argparse
+import tracemalloc
+import numpy as np
+from hyppopy.globals import DEBUGLEVEL
+
+LOG = logging.getLogger(os.path.basename(__file__))
+LOG.setLevel(DEBUGLEVEL)
+
+DEFAULT_FUNCTIONS = ["5D"]
+# settings the solvers need besides the hyperparameter space and max_iterations
+SOLVER_SETTINGS = {"hyperband": {"max_budget": 9},
+                   "asha": {"max_budget": 9}}
+# metric: True if higher values are better
+METRICS = {"overhead_per_iteration": False,
+           "throughput": True,
+           "memory_peak": False,
+           "time_to_target": False}
+
+
+def _load_function(name):
+    from hyppopy.FunctionSimulator import FunctionSimulator
+    vfunc = FunctionSimulator()
+    vfunc.load_default(name)
+    return vfunc
+
+
+def _target_loss(vfunc, target_gap):
+    fmin = float(np.sum(np.min(vfunc.data, axis=1)))
+    fmax = float(np.sum(np.max(vfunc.data, axis=1)))
+    return fmin + target_gap * (fmax - fmin)
+
+
+def _config(solver_name, vfunc, max_iterations):
+    config = {"hyperparameter": {}, "max_iterations": max_iterations, "solver": solver_name}
+    frequency = max(2, int(round(max_iterations ** (1.0 / vfunc.dims()))))
+    for dim in range(vfunc.dims()):
+        config["hyperparameter"]["axis_{}".format(str(dim).zfill(2))] = {"domain": "uniform",
+                                                                         "data": list(vfunc.axis[dim]),
+                                                                         "type": float,
+                                                                         "frequency": frequency}
+    config.update(SOLVER_SETTINGS.get(solver_name, {}))
+    return config
+
+
+def _create_solver(solver_name, vfunc, max_iterations, seed):
+    from hyppopy.SolverPool import SolverPool
+    from hyppopy.HyppopyProject import HyppopyProject
+
+    np.random.seed(seed)
+    random.seed(seed)
+    project = HyppopyProject(_config(solver_name, vfunc, max_iterations))
+    solver = SolverPool.get(project=project)
+    budget_name = getattr(solver, "budget_name", None)
+
+    def blackbox(**params):
+        params.pop(budget_name, None)
+        return vfunc(**params)
+
+    solver.blackbox = blackbox
+    return solver
+
+
+def _run_once(solver_name, vfunc, max_iterations, seed, memory=False):
+    from hyppopy.Profiler import PhaseProfiler
+
+    solver = _create_solver(solver_name, vfunc, max_iterations, seed)
+    evaluations = []
+    solver.add_evaluation_hook(lambda cbd: evaluations.append((time.perf_counter(), cbd["loss"])))
+    if memory:
+        tracemalloc.start()
+        try:
+            solver.run(print_stats=False)
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    solver.profiler = PhaseProfiler()
+    start = time.perf_counter()
+    solver.run(print_stats=False)
+    return start, evaluations, solver.profiler.report()
+
+
+def _time_to_target(start, evaluations, target):
+    for iteration, (stamp, loss) in enumerate(evaluations):
+        if loss is not None and loss <= target:
+            return stamp - start, iteration + 1
+    return None, None
+
+
+def _median(values):
+    values = [v for v in values if v is not None]
+    return float(np.median(values)) if values else None
+
+
+def benchmark_solver(solver_name, function="5D", max_iterations=100, repeats=3, seed=0, target_gap=0.25, memory=True):
+    """
+    Benchmarks a SolverPool solver on a virtual parameter space of the FunctionSimulator.
+
+    :param solver_name: [str] SolverPool name of the solver
+    :param function: [str or FunctionSimulator] name of a default virtual parameter space or a loaded simulator,
+                     default=5D
+    :param max_iterations: [int] evaluation budget per run, default=100
+    :param repeats: [int] number of timed runs, default=3
+    :param seed: [int] seed of the first repeat, repeat i uses seed+i, default=0
+    :param target_gap: [float] target loss as fraction of the value range above the global minimum, default=0.25
+    :param memory: [bool] measure the memory peak in an additional run, default=True
+
+    :return: [dict] medians over the repeats and the measurements of each run
+    """
+    assert repeats > 0, "precondition violation, repeats must be positive!"
+    vfunc = _load_function(function) if isinstance(function, str) else function
+    target = _target_loss(vfunc, target_gap)
+    runs = []
+    for repeat in range(repeats):
+        start, evaluations, report = _run_once(solver_name, vfunc, max_iterations, seed + repeat)
+        n = len(evaluations)
+        overhead = report["overhead"]
+        losses = [loss for _, loss in evaluations if loss is not None]
+        time_to_target, iterations_to_target = _time_to_target(start, evaluations, target)
+        runs.append({"seed": seed + repeat,
+                     "evaluations": n,
+                     "wall": report["wall"],
+                     "overhead": overhead,
+                     "overhead_per_iteration": overhead / n if n > 0 else None,
+                     "throughput": n / overhead if overhead > 0 else None,
+                     "best_loss": float(np.min(losses)) if losses else None,
+                     "time_to_target": time_to_target,
+                     "iterations_to_target": iterations_to_target,
+                     "phases": {name: p["total"] for name, p in report["phases"].items()}})
+    result = {"solver": solver_name,
+              "function": function if isinstance(function, str) else "custom",
+              "max_iterations": max_iterations,
+              "repeats": repeats,
+              "target": target,
+              "reached": sum(run["time_to_target"] is not None for run in runs) / float(repeats)}
+    for key in ["evaluations", "wall", "overhead_per_iteration", "throughput", "best_loss", "time_to_target",
+                "iterations_to_target"]:
+        result[key] = _median([run[key] for run in runs])
+    result["memory_peak"] = _run_once(solver_name, vfunc, max_iterations, seed, memory=True) if memory else None
+    result["runs"] = runs
+    return result
+
+
+def _metadata():
+    import hyppopy
+    return {"hyppopy": hyppopy.__version__,
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "processor": platform.processor(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S")}
+
+
+def run_benchmarks(solvers=None, functions=None, max_iterations=100, repeats=3, seed=0, target_gap=0.25, memory=True):
+    """
+    Benchmarks several solvers on several functions, failing solvers are reported with an error entry.
+
+    :param solvers: [list] SolverPool names, default=None all registered solvers
+    :param functions: [list] names of default virtual parameter spaces, default=None DEFAULT_FUNCTIONS
+    :param max_iterations: [int] evaluation budget per run, default=100
+    :param repeats: [int] number of timed runs per solver and function, default=3
+    :param seed: [int] seed of the first repeat, default=0
+    :param target_gap: [float] target loss as fraction of the value range above the global minimum, default=0.25
+    :param memory: [bool] measure the memory peak, default=True
+
+    :return: [dict] {'meta': environment and settings, 'results': list of benchmark_solver results}
+    """
+    from hyppopy.SolverPool import SolverPool
+    solvers = SolverPool.get_solver_names() if solvers is None else solvers
+    functions = DEFAULT_FUNCTIONS if functions is None else functions
+    meta = _metadata()
+    meta["settings"] = {"solvers": list(solvers), "functions": list(functions), "max_iterations": max_iterations,
+                        "repeats": repeats, "seed": seed, "target_gap": target_gap}
+    results = []
+    for function in functions:
+        vfunc = _load_function(function)
+        for solver_name in solvers:
+            LOG.info("benchmarking %s on %s", solver_name, function)
+            try:
+                result = benchmark_solver(solver_name, vfunc, max_iterations, repeats, seed, target_gap, memory)
+                result["function"] = function
+            except Exception as e:
+                LOG.warning("benchmark of %s on %s failed: %s", solver_name, function, e)
+                result = {"solver": solver_name, "function": function, "error": "{}: {}".format(type(e).__name__, e)}
+            results.append(result)
+    return {"meta": meta, "results": results}
+
+
+def compare_results(baseline, current, tolerance=0.25):
+    """
+    Compares two run_benchmarks results and returns the metrics that got worse by more than tolerance.
+
+    :param baseline: [dict] reference result
+    :param current: [dict] new result
+    :param tolerance: [float] allowed relative change, default=0.25
+
+    :return: [list] dicts with solver, function, metric, baseline, current and relative change
+    """
+    reference = {(r["solver"], r["function"]): r for r in baseline["results"] if "error" not in r}
+    regressions = []
+    for result in current["results"]:
+        key = (result["solver"], result["function"])
+        if key not in reference:
+            continue
+        if "error" in result:
+            regressions.append({"solver": key[0], "function": key[1], "metric": "error", "baseline": None,
+                                "current": result["error"], "change": None})
+            continue
+        for metric, higher_is_better in METRICS.items():
+            old, new = reference[key].get(metric), result.get(metric)
+            if old is None or new is None or old <= 0:
+                continue
+            change = (new - old) / old
+            if (-change if higher_is_better else change) > tolerance:
+                regressions.append({"solver": key[0], "function": key[1], "metric": metric, "baseline": old,
+                                    "current": new, "change": change})
+    return regressions
+
+
+def _print_results(result):
+    print(" {:<22}{:>6}{:>10}{:>16}{:>14}{:>12}{:>12}".format("solver", "func", "evals", "overhead [ms]",
+                                                              "evals/s", "mem [MB]", "target [s]"))
+    for r in result["results"]:
+        if "error" in r:
+            print(" {:<22}{:>6}  {}".format(r["solver"], r["function"], r["error"]))
+            continue
+        fmt = lambda value, scale, spec: ("{:" + spec + "}").format(value * scale) if value is not None else "-"
+        print(" {:<22}{:>6}{:>10}{:>16}{:>14}{:>12}{:>12}".format(r["solver"], r["function"],
+                                                                  fmt(r["evaluations"], 1, ".0f"),
+                                                                  fmt(r["overhead_per_iteration"], 1e3, ".3f"),
+                                                                  fmt(r["throughput"], 1, ".0f"),
+                                                                  fmt(r["memory_peak"], 1e-6, ".2f"),
+                                                                  fmt(r["time_to_target"], 1, ".3f")))
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Benchmarks the hyppopy solvers on the FunctionSimulator.")
+    parser.add_argument("--solvers", nargs="+", default=None, help="solver names, default: all registered solvers")
+    parser.add_argument("--functions", nargs="+", default=DEFAULT_FUNCTIONS,
+                        help="virtual parameter spaces, default: %(default)s")
+    parser.add_argument("--iterations", type=int, default=100, help="evaluations per run, default: %(default)s")
+    parser.add_argument("--repeats", type=int, default=3, help="timed runs per solver, default: %(default)s")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first repeat, default: %(default)s")
+    parser.add_argument("--target-gap", type=float, default=0.25,
+                        help="target loss above the minimum as fraction of the value range, default: %(default)s")
+    parser.add_argument("--no-memory", action="store_true", help="skip the memory measurement")
+    parser.add_argument("--output", default=None, help="json file the result is written to")
+    parser.add_argument("--input", default=None, help="json file of a previous run, compared instead of benchmarking")
+    parser.add_argument("--baseline", default=None, help="json file of a previous run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed relative change before a metric counts as regression, default: %(default)s")
+    args = parser.parse_args(args)
+
+    if args.input is not None:
+        with open(args.input) as f:
+            result = json.load(f)
+    else:
+        result = run_benchmarks(args.solvers, args.functions, args.iterations, args.repeats, args.seed,
+                                args.target_gap, not args.no_memory)
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+    _print_results(result)
+
+    regressions = []
+    if args.baseline is not None:
+        with open(args.baseline) as f:
+            regressions = compare_results(json.load(f), result, args.tolerance)
+        print("regressions compared to {}: {}".format(args.baseline, len(regressions) or "none"))
+        for r in regressions:
+            print("  {} on {}: {} {} -> {}".format(r["solver"], r["function"], r["metric"], r["baseline"],
+                                                  r["current"]))
+    return result, regressions
+
+
+if __name__ == "__main__":
+    sys.exit(1 if main()[1] else 0)
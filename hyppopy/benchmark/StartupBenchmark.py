@@ -0,0 +1,129 @@
+# Hyppopy - A Hyper-Parameter Optimization Toolbox
+#
+# Copyright (c) German Cancer Research Center,
+# Division of Medical Image Computing.
+# All rights reserved.
+#
+# This software is distributed WITHOUT ANY WARRANTY; without
+# even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE.
+#
+# See LICENSE
+
+########################################################################################################################
+# USAGE
+#
+# Every MPI rank and every pool process pays the import time of hyppopy. The startup benchmark measures it by starting
+# fresh interpreters importing a module, by default hyppopy.solvers.RandomsearchSolver, and subtracting the time of an
+# empty interpreter start:
+#
+#    $ python -m hyppopy.benchmark.StartupBenchmark --repeats 10 --output startup.json
+#
+# or from python:
+#
+#    from hyppopy.benchmark.StartupBenchmark import measure_import_time
+#    result = measure_import_time("hyppopy.solvers.RandomsearchSolver", repeats=10)
+#
+# The result reports the import times, the slowest imports according to python -X importtime and the heavy optional
+# dependencies (matplotlib, visdom, pandas, ...) loaded by the import. A solver import loads hyperopt, whose Trials
+# hold the results of every solver, and scipy imported by hyperopt. matplotlib, visdom and pandas are not loaded.
+########################################################################################################################
+
+__all__ = ['HEAVY_MODULES', 'measure_import_time', 'main']
+
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+import numpy as np
+from hyppopy.globals import ROOT
+
+DEFAULT_MODULE = "hyppopy.solvers.RandomsearchSolver"
+HEAVY_MODULES = ["matplotlib", "visdom", "pandas", "optuna", "optunity", "sklearn", "scipy", "hyperopt"]
+
+
+def _environment():
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join([ROOT] + [p for p in [env.get("PYTHONPATH")] if p])
+    return env
+
+
+def _run(code, python, env, *options):
+    start = time.perf_counter()
+    out = subprocess.run([python] + list(options) + ["-c", code], env=env, stdout=subprocess.PIPE,
+                         stderr=subprocess.PIPE, universal_newlines=True, check=True)
+    return time.perf_counter() - start, out
+
+
+def _slowest_imports(stderr, count):
+    # python -X importtime lines: "import time: self [us] | cumulative | imported package"
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        try:
+            imports.append((fields[2].strip(), int(fields[1])))
+        except (IndexError, ValueError):
+            continue
+    imports.sort(key=lambda x: -x[1])
+    return [{"module": name, "cumulative_ms": us / 1000.0} for name, us in imports[:count]]
+
+
+def measure_import_time(module=DEFAULT_MODULE, repeats=5, python=None, top=10):
+    """
+    Measures the time a fresh interpreter needs to import a module.
+
+    :param module: [str] module to import, default=hyppopy.solvers.RandomsearchSolver
+    :param repeats: [int] number of interpreter starts, default=5
+    :param python: [str] python executable, default=None the running interpreter
+    :param top: [int] number of slowest imports reported, default=10
+
+    :return: [dict] times in seconds, import_time is the median wall time minus the median of an empty interpreter
+    """
+    assert repeats > 0, "precondition violation, repeats must be positive!"
+    python = sys.executable if python is None else python
+    env = _environment()
+    baseline = [_run("pass", python, env)[0] for _ in range(repeats)]
+    times = [_run("import {}".format(module), python, env)[0] for _ in range(repeats)]
+
+    code = "import sys, {}; print(','.join(m for m in {} if m in sys.modules))".format(module, HEAVY_MODULES)
+    _, out = _run(code, python, env, "-X", "importtime")
+    loaded = [m for m in out.stdout.strip().split(",") if m]
+    return {"module": module,
+            "repeats": repeats,
+            "python": python,
+            "times": times,
+            "baseline_times": baseline,
+            "min": float(np.min(times)),
+            "median": float(np.median(times)),
+            "baseline_median": float(np.median(baseline)),
+            "import_time": float(np.median(times) - np.median(baseline)),
+            "heavy_modules": loaded,
+            "slowest_imports": _slowest_imports(out.stderr, top)}
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Measures the interpreter startup and import time of hyppopy.")
+    parser.add_argument("--module", default=DEFAULT_MODULE, help="module to import, default: %(default)s")
+    parser.add_argument("--repeats", type=int, default=5, help="number of interpreter starts, default: %(default)s")
+    parser.add_argument("--output", default=None, help="json file the result is written to")
+    args = parser.parse_args(args)
+
+    result = measure_import_time(args.module, args.repeats)
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+    print("import {}: {:.3f}s (median {:.3f}s, interpreter {:.3f}s)".format(result["module"], result["import_time"],
+                                                                           result["median"],
+                                                                           result["baseline_median"]))
+    print("heavy modules loaded: {}".format(", ".join(result["heavy_modules"]) or "none"))
+    for entry in result["slowest_imports"]:
+        print("  {:>10.1f}ms  {}".format(entry["cumulative_ms"], entry["module"]))
+    return result
+
+
+if __name__ == "__main__":
+    main()
@@ -24,6 +24,9 @@ TESTDATA_DIR = os.path.join(ROOT, *(LIBNAME, "tests", "data"))
 HYPERPARAMETERPATH = "hyperparameter"
 SETTINGSPATH = "settings"
 FUNCTIONSIMULATOR_DATAPATH = os.path.join(os.path.join(ROOT, LIBNAME), "virtualparameterspace")
+# compiled FunctionSimulator data is cached in the cache dir, or next to the images if the cache dir is not writable
+FUNCTIONSIMULATOR_CACHEFILE = ".functionsimulator.npz"
+FUNCTIONSIMULATOR_CACHEDIR = os.environ.get("HYPPOPY_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", LIBNAME))
 
 SUPPORTED_DOMAINS = ["uniform", "normal", "loguniform", "categorical"]
 SUPPORTED_DTYPES = ["int", "float", "str"]
@@ -31,10 +34,62 @@ SUPPORTED_DTYPES = ["int", "float", "str"]
 DEFAULTGRIDFREQUENCY = 10
 
 LOGFILENAME = os.path.join(ROOT, '{}_log.log'.format(LIBNAME))
-DEBUGLEVEL = logging.DEBUG
-logging.basicConfig(filename=LOGFILENAME, filemode='w', format='%(levelname)s: %(name)s - %(message)s')
+LOGLEVEL_ENV = "HYPPOPY_LOGLEVEL"
+
+
+def _parse_log_level(level):
+    if isinstance(level, str):
+        level = logging.getLevelName(level.strip().upper())
+    if not isinstance(level, int):
+        raise ValueError("unknown log level {}, use DEBUG, INFO, WARNING, ERROR or CRITICAL".format(level))
+    return level
+
+
+try:
+    # the level of all hyppopy loggers, messages below it are discarded before they are formatted
+    DEBUGLEVEL = _parse_log_level(os.environ.get(LOGLEVEL_ENV, "WARNING"))
+except ValueError as e:
+    DEBUGLEVEL = logging.WARNING
+    logging.getLogger(__name__).warning("{}={} ignored: {}".format(LOGLEVEL_ENV, os.environ[LOGLEVEL_ENV], e))
+if len(logging.root.handlers) == 0:
+    # same as logging.basicConfig(filename=LOGFILENAME, filemode='w'), but the file is opened on the first record
+    # instead of at import time
+    _log_handler = logging.FileHandler(LOGFILENAME, mode='w', delay=True)
+    _log_handler.setFormatter(logging.Formatter('%(levelname)s: %(name)s - %(message)s'))
+    logging.root.addHandler(_log_handler)
+
+
+def set_log_level(level):
+    """
+    Sets the level of all hyppopy loggers at runtime, the default is read from the environment variable
+    HYPPOPY_LOGLEVEL and is WARNING if it is not set.
+
+    :param level: [int, str] logging level e.g. logging.DEBUG or 'debug'
+    """
+    global DEBUGLEVEL
+    DEBUGLEVEL = _parse_log_level(level)
+    for name, module in list(sys.modules.items()):
+        if name.split(".")[0] == LIBNAME and isinstance(getattr(module, "LOG", None), logging.Logger):
+            module.LOG.setLevel(DEBUGLEVEL)
+
+
+class LazyFormat(object):
+    """
+    Defers an expensive message part until a log record is emitted, e.g.
+    LOG.debug("searchspace %s", LazyFormat(pformat, searchspace)) calls pformat only if debug messages are enabled.
+    """
+    __slots__ = ['_func', '_args']
+
+    def __init__(self, func, *args):
+        self._func = func
+        self._args = args
+
+    def __str__(self):
+        return str(self._func(*self._args))
 
 
 class MPI_TAGS(Enum):
      MPI_SEND_CANDIDATE = 55
+     MPI_SEND_CANDIDATE_BLOCK = 56
      MPI_SEND_RESULTS = 99
+     MPI_SEND_RESULTS_BLOCK = 100
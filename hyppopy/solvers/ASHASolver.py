@@ -0,0 +1,186 @@
+# Hyppopy - A Hyper-Parameter Optimization Toolbox
+#
+# Copyright (c) German Cancer Research Center,
+# Division of Medical Image Computing.
+# All rights reserved.
+#
+# This software is distributed WITHOUT ANY WARRANTY; without
+# even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE.
+#
+# See LICENSE
+
+__all__ = ['ASHASolver']
+
+import os
+import logging
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import numpy as np
+from hyppopy.globals import DEBUGLEVEL
+from hyppopy.solvers.HyperbandSolver import HyperbandSolver, hyperband_schedule
+from hyppopy.solvers.RandomsearchSolver import draw_sample
+from hyppopy.CandidateDescriptor import CandidateDescriptor
+
+LOG = logging.getLogger(os.path.basename(__file__))
+LOG.setLevel(DEBUGLEVEL)
+
+
+class ASHASolver(HyperbandSolver):
+    """
+    The ASHASolver class implements asynchronous successive halving (Li et al. 2020). In contrast to the
+    HyperbandSolver there are no synchronous rungs, whenever a worker becomes idle it gets a new job: a candidate
+    ranking in the top 1/eta of all completed results of its rung is promoted to the next rung, if there is none, a
+    new random candidate is started with min_budget. Thus no worker waits for stragglers.
+
+    If the solver runs inside an MPISolverWrapper or an MPIWorkerPool (flat topology), candidates are submitted to the
+    workers one by one via MPIBlackboxFunction.submit and receive. Otherwise max_parallel (default 1) candidates are
+    evaluated concurrently in a local thread pool, which pays off for blackboxes releasing the GIL, e.g. numpy or
+    pytorch training, or waiting for external processes. With max_parallel=1 the candidates are evaluated one after
+    another. The settings are the ones of the HyperbandSolver without brackets, plus max_iterations, the total number
+    of blackbox evaluations.
+    """
+    def __init__(self, project=None):
+        """
+        The constructor accepts a HyppopyProject.
+
+        :param project: [HyppopyProject] project instance, default=None
+        """
+        HyperbandSolver.__init__(self, project)
+        self._searchspace = None
+        self._budgets = None
+        self._configs = None        # parameter sets of all candidates started so far
+        self._rungs = None          # per rung list of (loss, config index) of completed evaluations
+        self._promoted = None       # per rung set of config indices promoted to the next rung
+
+    def define_interface(self):
+        """
+        This function is called when HyppopySolver.__init__ function finished. Child classes need to define their
+        individual parameter here by calling the _add_member function for each class member variable need to be defined.
+        Using _add_hyperparameter_signature the structure of a hyperparameter the solver expects must be defined.
+        Both, members and hyperparameter signatures are later get checked, before executing the solver, ensuring
+        settings passed fullfill solver needs.
+        """
+        self._add_member("max_iterations", int)
+        self._add_member("max_budget", (int, float))
+        self._add_member("min_budget", (int, float), default=1)
+        self._add_member("eta", int, default=3)
+        self._add_member("budget_name", str, default="budget")
+        self._add_member("max_parallel", int, default=1)
+        self._add_hyperparameter_signature(name="domain", dtype=str,
+                                          options=["uniform", "normal", "loguniform", "categorical"])
+        self._add_hyperparameter_signature(name="data", dtype=list)
+        self._add_hyperparameter_signature(name="type", dtype=type)
+
+    def next_job(self):
+        """
+        Returns the next candidate to evaluate. Rungs are checked from the top, the first completed candidate ranking in
+        the top 1/eta of its rung and not promoted yet is promoted, else a new candidate is drawn.
+
+        :return: [int], [int], [CandidateDescriptor] config index, rung and candidate
+        """
+        index, rung = None, 0
+        for k in reversed(range(len(self._budgets) - 1)):
+            completed = sorted(self._rungs[k], key=lambda x: x[0])
+            for loss, i in completed[:len(completed) // self.eta]:
+                if i not in self._promoted[k]:
+                    self._promoted[k].add(i)
+                    index, rung = i, k + 1
+                    break
+            if index is not None:
+                break
+        if index is None:
+            self._configs.append({name: draw_sample(p) for name, p in self._searchspace.items()})
+            index = len(self._configs) - 1
+        params = dict(self._configs[index])
+        params[self.budget_name] = self._budgets[rung]
+        return index, rung, CandidateDescriptor(**params)
+
+    def _record(self, index, rung, loss):
+        if loss is None or np.isnan(loss):
+            loss = np.inf
+        self._rungs[rung].append((loss, index))
+
+    def _execute_mpi(self):
+        jobs = {}
+        submitted = 0
+        while submitted < self.max_iterations and self.blackbox.num_idle_workers() > 0:
+            with self._phase("candidate_generation"):
+                index, rung, candidate = self.next_job()
+            jobs[candidate.ID] = (index, rung, candidate)
+            with self._phase("dispatch"):
+                self.blackbox.submit(candidate)
+            submitted += 1
+        while self.blackbox.num_pending() > 0:
+            with self._phase("dispatch"):
+                cand_id, result = self.blackbox.receive()
+            index, rung, candidate = jobs.pop(cand_id)
+            self._add_trial(candidate, result)
+            with self._phase("model_update"):
+                self._record(index, rung, result['loss'])
+            if submitted < self.max_iterations:
+                with self._phase("candidate_generation"):
+                    index, rung, candidate = self.next_job()
+                jobs[candidate.ID] = (index, rung, candidate)
+                with self._phase("dispatch"):
+                    self.blackbox.submit(candidate)
+                submitted += 1
+
+    def _execute_threads(self):
+        # the bookkeeping is done in the calling thread only, the pool threads just evaluate the candidates
+        with ThreadPoolExecutor(max_workers=self.max_parallel) as executor:
+            jobs = {}
+            submitted = 0
+            while submitted < self.max_iterations and len(jobs) < self.max_parallel:
+                with self._phase("candidate_generation"):
+                    index, rung, candidate = self.next_job()
+                jobs[executor.submit(self.evaluate_candidate, candidate)] = (index, rung, candidate)
+                submitted += 1
+            while len(jobs) > 0:
+                done, _ = wait(jobs, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index, rung, candidate = jobs.pop(future)
+                    result = future.result()
+                    self._add_trial(candidate, result)
+                    with self._phase("model_update"):
+                        self._record(index, rung, result['loss'])
+                    if submitted < self.max_iterations:
+                        with self._phase("candidate_generation"):
+                            index, rung, candidate = self.next_job()
+                        jobs[executor.submit(self.evaluate_candidate, candidate)] = (index, rung, candidate)
+                        submitted += 1
+
+    def execute_solver(self, searchspace):
+        """
+        This function is called immediately after convert_searchspace and get the output of the latter as input. It's
+        purpose is to call the solver libs main optimization function.
+
+        :param searchspace: converted hyperparameter space
+        """
+        self._searchspace = searchspace
+        self._budgets = [self._budget(r) for n, r in hyperband_schedule(self.max_budget, self.min_budget, self.eta)[0]]
+        self._configs = []
+        self._rungs = [[] for _ in self._budgets]
+        self._promoted = [set() for _ in self._budgets]
+
+        try:
+            if hasattr(self.blackbox, 'submit') and self.blackbox.supports_async():
+                self._execute_mpi()
+            elif self.max_parallel > 1:
+                self._execute_threads()
+            else:
+                for n in range(self.max_iterations):
+                    with self._phase("candidate_generation"):
+                        index, rung, candidate = self.next_job()
+                    results = self.loss_function_batch([candidate])
+                    with self._phase("model_update"):
+                        self._record(index, rung, results[candidate.ID]['loss'])
+        except Exception as e:
+            msg = "internal error in asha execute_solver occured. {}".format(e)
+            LOG.error(msg)
+            raise BrokenPipeError(msg)
+
+        for rung in reversed(self._rungs):
+            if len(rung) > 0:
+                loss, index = min(rung, key=lambda x: x[0])
+                self.best = self._configs[index]
+                break
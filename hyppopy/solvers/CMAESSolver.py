@@ -0,0 +1,229 @@
+# Hyppopy - A Hyper-Parameter Optimization Toolbox
+#
+# Copyright (c) German Cancer Research Center,
+# Division of Medical Image Computing.
+# All rights reserved.
+#
+# This software is distributed WITHOUT ANY WARRANTY; without
+# even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE.
+#
+# See LICENSE
+
+__all__ = ['CMAES', 'CMAESSolver']
+
+import os
+import logging
+import numpy as np
+from pprint import pformat
+from hyppopy.globals import DEBUGLEVEL, LazyFormat
+from hyppopy.solvers.HyppopySolver import HyppopySolver
+from hyppopy.CandidateDescriptor import CandidateDescriptor
+
+LOG = logging.getLogger(os.path.basename(__file__))
+LOG.setLevel(DEBUGLEVEL)
+
+
+class CMAES(object):
+    """
+    Covariance matrix adaptation evolution strategy (Hansen 2016, The CMA Evolution Strategy: A Tutorial) on the unit
+    cube, minimizing. The strategy is used via ask and tell, ask returns a whole population as (popsize, dims) array,
+    tell takes the losses of this population. Samples leaving the unit cube are mirrored back at the boundary.
+    """
+    def __init__(self, mean, sigma=0.3, popsize=None):
+        """
+        :param mean: [ndarray] initial mean (dims,)
+        :param sigma: [float] initial step size, default=0.3
+        :param popsize: [int] population size, if None 4 + 3 ln(dims), default=None
+        """
+        self.mean = np.array(mean, dtype=float)
+        self.sigma = float(sigma)
+        n = len(self.mean)
+        self.dims = n
+        self.popsize = int(popsize) if popsize else 4 + int(3 * np.log(n))
+        self.mu = self.popsize // 2
+        weights = np.log(self.mu + 0.5) - np.log(np.arange(1, self.mu + 1))
+        self.weights = weights / np.sum(weights)
+        self.mueff = 1.0 / np.sum(self.weights**2)
+
+        self.cc = (4 + self.mueff / n) / (n + 4 + 2 * self.mueff / n)
+        self.cs = (self.mueff + 2) / (n + self.mueff + 5)
+        self.c1 = 2 / ((n + 1.3)**2 + self.mueff)
+        self.cmu = min(1 - self.c1, 2 * (self.mueff - 2 + 1 / self.mueff) / ((n + 2)**2 + self.mueff))
+        self.damps = 1 + 2 * max(0.0, np.sqrt((self.mueff - 1) / (n + 1)) - 1) + self.cs
+        self.chiN = np.sqrt(n) * (1 - 1 / (4 * n) + 1 / (21 * n**2))
+
+        self.pc = np.zeros(n)
+        self.ps = np.zeros(n)
+        self.C = np.eye(n)
+        self.B = np.eye(n)
+        self.D = np.ones(n)
+        self.generation = 0
+        self._eigen_generation = 0
+        self._X = None
+
+    def ask(self):
+        """
+        Samples a population.
+
+        :return: [ndarray] population (popsize, dims) within the unit cube
+        """
+        Z = np.random.standard_normal((self.popsize, self.dims))
+        X = self.mean + self.sigma * (Z * self.D) @ self.B.T
+        # mirror at the boundaries, repeated for samples leaving the cube by more than its width
+        X = np.abs(X) % 2.0
+        X = np.where(X > 1.0, 2.0 - X, X)
+        self._X = X
+        return X
+
+    def tell(self, losses):
+        """
+        Updates the distribution with the losses of the population returned by the last ask.
+
+        :param losses: [ndarray] losses (popsize,), nan is ranked last
+        """
+        losses = np.asarray(losses, dtype=float)
+        losses = np.where(np.isnan(losses), np.inf, losses)
+        order = np.argsort(losses, kind='stable')[:self.mu]
+        Y = (self._X[order] - self.mean) / self.sigma
+        y_w = self.weights @ Y
+        self.mean = self.mean + self.sigma * y_w
+        self.generation += 1
+
+        C_inv_sqrt = (self.B / self.D) @ self.B.T
+        self.ps = (1 - self.cs) * self.ps + np.sqrt(self.cs * (2 - self.cs) * self.mueff) * C_inv_sqrt @ y_w
+        ps_norm = np.linalg.norm(self.ps)
+        hsig = ps_norm / np.sqrt(1 - (1 - self.cs)**(2 * self.generation)) / self.chiN < 1.4 + 2 / (self.dims + 1)
+        self.pc = (1 - self.cc) * self.pc + hsig * np.sqrt(self.cc * (2 - self.cc) * self.mueff) * y_w
+
+        rank_mu = (Y * self.weights[:, None]).T @ Y
+        self.C = (1 - self.c1 - self.cmu) * self.C \
+            + self.c1 * (np.outer(self.pc, self.pc) + (1 - hsig) * self.cc * (2 - self.cc) * self.C) \
+            + self.cmu * rank_mu
+        self.sigma *= np.exp((self.cs / self.damps) * (ps_norm / self.chiN - 1))
+
+        # the eigendecomposition is O(dims^3), it is updated lazily as proposed by Hansen, the condition of the
+        # tutorial counts evaluations, i.e. generations times popsize
+        if (self.generation - self._eigen_generation) * self.popsize > \
+                self.popsize / (self.c1 + self.cmu) / self.dims / 10:
+            self._eigen_generation = self.generation
+            self.C = np.triu(self.C) + np.triu(self.C, 1).T
+            D2, self.B = np.linalg.eigh(self.C)
+            self.D = np.sqrt(np.maximum(D2, 1e-20))
+
+    def converged(self, tol=1e-6):
+        """
+        Returns True if the step size in all directions is below tol or the covariance matrix became ill-conditioned.
+
+        :param tol: [float] tolerance in unit cube coordinates, default=1e-6
+
+        :return: [bool] convergence flag
+        """
+        return self.sigma * np.max(self.D) < tol or np.max(self.D) > 1e7 * np.min(self.D)
+
+
+class CMAESSolver(HyppopySolver):
+    """
+    The CMAESSolver class implements the covariance matrix adaptation evolution strategy for continuous search spaces,
+    parameters are mapped to the unit cube, loguniform ones logarithmically, int parameters are rounded when evaluated.
+    The population of each generation is evaluated as one batch via loss_function_batch, thus distributed if the
+    solver runs inside an MPISolverWrapper. If the distribution converged before max_iterations evaluations are spent,
+    the strategy restarts with a doubled population (IPOP-CMA-ES).
+
+    The solver settings are max_iterations (required), popsize (default 0, 4 + 3 ln(dims)) and sigma0 (default 0.3,
+    relative to the parameter ranges).
+    """
+    def __init__(self, project=None):
+        """
+        The constructor accepts a HyppopyProject.
+
+        :param project: [HyppopyProject] project instance, default=None
+        """
+        HyppopySolver.__init__(self, project)
+        self._axes = None
+
+    def define_interface(self):
+        """
+        This function is called when HyppopySolver.__init__ function finished. Child classes need to define their
+        individual parameter here by calling the _add_member function for each class member variable need to be defined.
+        Using _add_hyperparameter_signature the structure of a hyperparameter the solver expects must be defined.
+        Both, members and hyperparameter signatures are later get checked, before executing the solver, ensuring
+        settings passed fullfill solver needs.
+        """
+        self._add_member("max_iterations", int)
+        self._add_member("popsize", int, default=0)
+        self._add_member("sigma0", (int, float), default=0.3)
+        self._add_hyperparameter_signature(name="domain", dtype=str,
+                                          options=["uniform", "normal", "loguniform"])
+        self._add_hyperparameter_signature(name="data", dtype=list)
+        self._add_hyperparameter_signature(name="type", dtype=type)
+
+    def convert_searchspace(self, hyperparameter):
+        """
+        This function gets the unified hyppopy-like parameterspace description as input and, if necessary, should
+        convert it into a solver lib specific format. The function is invoked when run is called and what it returns
+        is passed as searchspace argument to the function execute_solver.
+
+        :param hyperparameter: [dict] nested parameter description dict e.g. {'name': {'domain':'uniform', 'data':[0,1], 'type':'float'}, ...}
+
+        :return: [object] converted hyperparameter space
+        """
+        LOG.debug("convert input parameter\n\n\t%s\n", LazyFormat(pformat, hyperparameter))
+        self._axes = []
+        for name, param in hyperparameter.items():
+            log = param["domain"] == "loguniform"
+            bounds = np.array(param["data"][:2], dtype=float)
+            self._axes.append({"name": name, "type": param["type"], "log": log, "data": bounds,
+                               "bounds": np.log(bounds) if log else bounds})
+        return hyperparameter
+
+    def decode(self, X):
+        """
+        Maps points of the unit cube to parameter sets.
+
+        :param X: [ndarray] points (n, dims)
+
+        :return: [list] parameter dicts
+        """
+        lo = np.array([axis["bounds"][0] for axis in self._axes])
+        hi = np.array([axis["bounds"][1] for axis in self._axes])
+        V = lo + X * (hi - lo)
+        for d, axis in enumerate(self._axes):
+            if axis["log"]:
+                V[:, d] = np.clip(np.exp(V[:, d]), axis["data"][0], axis["data"][1])
+        params = []
+        for v in V:
+            params.append({axis["name"]: int(np.round(x)) if axis["type"] is int else float(x)
+                           for axis, x in zip(self._axes, v)})
+        return params
+
+    def execute_solver(self, searchspace):
+        """
+        This function is called immediately after convert_searchspace and get the output of the latter as input. It's
+        purpose is to call the solver libs main optimization function.
+
+        :param searchspace: converted hyperparameter space
+        """
+        dims = len(self._axes)
+        popsize = self.popsize if self.popsize > 0 else None
+        evaluated = 0
+        try:
+            while evaluated < self.max_iterations:
+                strategy = CMAES(np.full(dims, 0.5), sigma=self.sigma0, popsize=popsize)
+                while evaluated < self.max_iterations and not strategy.converged():
+                    with self._phase("candidate_generation"):
+                        X = strategy.ask()
+                        X = X[:self.max_iterations - evaluated]
+                        candidates = [CandidateDescriptor(**params) for params in self.decode(X)]
+                    results = self.loss_function_batch(candidates)
+                    evaluated += len(candidates)
+                    if len(candidates) == strategy.popsize:
+                        with self._phase("model_update"):
+                            strategy.tell([results[c.ID]['loss'] for c in candidates])
+                LOG.debug("cma-es finished with popsize %d after %d generations", strategy.popsize, strategy.generation)
+                popsize = 2 * strategy.popsize
+        except Exception as e:
+            msg = "internal error in cmaes execute_solver occured. {}".format(e)
+            LOG.error(msg)
+            raise BrokenPipeError(msg)
+        self.best = self._trials.argmin
@@ -0,0 +1,295 @@
+# Hyppopy - A Hyper-Parameter Optimization Toolbox
+#
+# Copyright (c) German Cancer Research Center,
+# Division of Medical Image Computing.
+# All rights reserved.
+#
+# This software is distributed WITHOUT ANY WARRANTY; without
+# even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE.
+#
+# See LICENSE
+
+__all__ = ['latin_hypercube', 'maximin_latin_hypercube', 'orthogonal_array', 'orthogonal_array_latin_hypercube',
+           'DesignOfExperimentsSolver']
+
+import os
+import logging
+import numpy as np
+from pprint import pformat
+from scipy.stats import norm
+from scipy.spatial.distance import pdist
+from hyppopy.globals import DEBUGLEVEL, LazyFormat
+from hyppopy.solvers.HyppopySolver import HyppopySolver
+from hyppopy.CandidateDescriptor import CandidateDescriptor
+
+LOG = logging.getLogger(os.path.basename(__file__))
+LOG.setLevel(DEBUGLEVEL)
+
+
+def latin_hypercube(N, dims, designs=1):
+    """
+    Generates random Latin hypercube designs on the unit cube, each axis is divided into N strata each holding exactly
+    one point.
+
+    :param N: [int] number of points
+    :param dims: [int] number of dimensions
+    :param designs: [int] number of independent designs, default=1
+
+    :return: [ndarray] designs (designs, N, dims)
+    """
+    strata = np.argsort(np.random.uniform(size=(designs, dims, N)), axis=2)
+    return (np.swapaxes(strata, 1, 2) + np.random.uniform(size=(designs, N, dims))) / N
+
+
+def maximin_latin_hypercube(N, dims, designs=100, swaps=0, max_points=2000):
+    """
+    Returns the Latin hypercube design with the largest minimal pairwise point distance out of a number of random
+    designs, optionally improved by random swaps within a column that are accepted if the minimal distance grows.
+    Comparing the designs costs O(designs N^2 dims) time and the swaps keep the N x N distance matrix, thus for more
+    than max_points points a plain random Latin hypercube is returned.
+
+    :param N: [int] number of points
+    :param dims: [int] number of dimensions
+    :param designs: [int] number of random designs compared, default=100
+    :param swaps: [int] number of swap trials, default=0
+    :param max_points: [int] maximum number of points a maximin design is searched for, default=2000
+
+    :return: [ndarray] design (N, dims)
+    """
+    if N < 2 or N > max_points:
+        if N > max_points:
+            LOG.debug("%d points exceed max_points=%d, a plain latin hypercube is used", N, max_points)
+        return latin_hypercube(N, dims)[0]
+    candidates = latin_hypercube(N, dims, designs)
+    scores = [np.min(pdist(design)) for design in candidates]
+    design = candidates[int(np.argmax(scores))].copy()
+    if swaps > 0:
+        D = np.sum((design[:, None, :] - design[None, :, :])**2, axis=2)
+        np.fill_diagonal(D, np.inf)
+        # the row minima are updated incrementally, only rows whose minimum was a distance to a swapped point are
+        # searched again
+        row_min = np.min(D, axis=1)
+        current = np.min(row_min)
+        for _ in range(swaps):
+            i, j = np.random.choice(N, 2, replace=False)
+            k = np.random.randint(dims)
+            design[[i, j], k] = design[[j, i], k]
+            rows = np.sum((design[[i, j]][:, None, :] - design[None, :, :])**2, axis=2)
+            rows[[0, 1], [i, j]] = np.inf
+            old = D[[i, j], :]
+            D[[i, j], :] = rows
+            D[:, [i, j]] = rows.T
+            new_min = np.minimum(row_min, np.min(rows, axis=0))
+            affected = np.flatnonzero((old[0] <= row_min) | (old[1] <= row_min))
+            new_min[affected] = np.min(D[affected], axis=1)
+            new_min[[i, j]] = np.min(rows, axis=1)
+            if np.min(new_min) > current:
+                row_min = new_min
+                current = np.min(new_min)
+            else:
+                D[[i, j], :] = old
+                D[:, [i, j]] = old.T
+                design[[i, j], k] = design[[j, i], k]
+    return design
+
+
+def _is_prime(n):
+    return n >= 2 and all(n % i for i in range(2, int(n**0.5) + 1))
+
+
+def orthogonal_array(s, factors):
+    """
+    Bose construction of a strength 2 orthogonal array OA(s^2, factors, s, 2), each pair of columns contains each
+    pair of levels exactly once.
+
+    :param s: [int] number of levels, needs to be prime
+    :param factors: [int] number of columns, at most s+1
+
+    :return: [ndarray] int array (s^2, factors) of levels in [0, s)
+    """
+    assert _is_prime(s), "precondition violation, s needs to be prime!"
+    assert factors <= s + 1, "precondition violation, an orthogonal array with s levels has at most s+1 columns!"
+    i, j = np.divmod(np.arange(s * s), s)
+    columns = [i, j] + [(i + c * j) % s for c in range(1, s)]
+    return np.stack(columns[:factors], axis=1)
+
+
+def orthogonal_array_latin_hypercube(s, factors):
+    """
+    Orthogonal array based Latin hypercube (Tang 1993), the points of each level of a randomized orthogonal array are
+    spread over the level's strata, thus the design is a Latin hypercube with the 2d stratification of the array.
+
+    :param s: [int] number of levels, needs to be prime
+    :param factors: [int] number of dimensions, at most s+1
+
+    :return: [ndarray], [ndarray] design (s^2, factors) on the unit cube and the levels of the array
+    """
+    A = orthogonal_array(s, factors)
+    # random level relabeling per column keeps the array orthogonal
+    A = np.stack([np.random.permutation(s)[A[:, k]] for k in range(factors)], axis=1)
+    N = s * s
+    U = np.zeros((N, factors))
+    for k in range(factors):
+        order = np.lexsort((np.random.uniform(size=N), A[:, k]))
+        strata = np.empty(N, dtype=int)
+        strata[order] = np.arange(N)
+        U[:, k] = (strata + np.random.uniform(size=N)) / N
+    return U, A
+
+
+class DesignOfExperimentsSolver(HyppopySolver):
+    """
+    The DesignOfExperimentsSolver class implements space filling screening designs for a fixed budget, the whole
+    design is generated at once and evaluated as one batch via loss_function_batch.
+
+    design='lhs' (default) draws a maximin Latin hypercube with max_iterations points: lhs_designs random designs are
+    compared and the best one is improved by lhs_swaps column swaps. As the maximin search is quadratic in time and
+    memory, budgets above 2000 points get a plain random Latin hypercube. Categorical parameters are stratified as
+    well, each category occurs equally often. design='orthogonal' uses an orthogonal array based Latin hypercube with
+    s^2 points, s being the largest prime with s^2 <= max_iterations that supports all parameters (s >= #parameters - 1
+    and s >= the number of categories), the remaining budget is filled with further randomized arrays. Here each pair
+    of parameters is evenly covered, categories being assigned to blocks of levels.
+
+    Uniform parameters are sampled linearly, uniform int parameters with equally wide strata per value, loguniform ones
+    logarithmically and normal ones via the inverse normal distribution with the same mean and standard deviation as
+    in the RandomsearchSolver.
+    """
+    def __init__(self, project=None):
+        """
+        The constructor accepts a HyppopyProject.
+
+        :param project: [HyppopyProject] project instance, default=None
+        """
+        HyppopySolver.__init__(self, project)
+
+    def define_interface(self):
+        """
+        This function is called when HyppopySolver.__init__ function finished. Child classes need to define their
+        individual parameter here by calling the _add_member function for each class member variable need to be defined.
+        Using _add_hyperparameter_signature the structure of a hyperparameter the solver expects must be defined.
+        Both, members and hyperparameter signatures are later get checked, before executing the solver, ensuring
+        settings passed fullfill solver needs.
+        """
+        self._add_member("max_iterations", int)
+        self._add_member("design", str, default="lhs")
+        self._add_member("lhs_designs", int, default=100)
+        self._add_member("lhs_swaps", int, default=1000)
+        self._add_hyperparameter_signature(name="domain", dtype=str,
+                                          options=["uniform", "normal", "loguniform", "categorical"])
+        self._add_hyperparameter_signature(name="data", dtype=list)
+        self._add_hyperparameter_signature(name="type", dtype=type)
+
+    def _check_project(self):
+        HyppopySolver._check_project(self)
+        if self.design not in ["lhs", "orthogonal"]:
+            msg = "design {} not supported, use lhs or orthogonal!".format(self.design)
+            LOG.error(msg)
+            raise LookupError(msg)
+
+    def convert_searchspace(self, hyperparameter):
+        """
+        This function gets the unified hyppopy-like parameterspace description as input and, if necessary, should
+        convert it into a solver lib specific format. The function is invoked when run is called and what it returns
+        is passed as searchspace argument to the function execute_solver.
+
+        :param hyperparameter: [dict] nested parameter description dict e.g. {'name': {'domain':'uniform', 'data':[0,1], 'type':'float'}, ...}
+
+        :return: [object] converted hyperparameter space
+        """
+        LOG.debug("convert input parameter\n\n\t%s\n", LazyFormat(pformat, hyperparameter))
+        return hyperparameter
+
+    def decode(self, U, searchspace):
+        """
+        Maps a design on the unit cube to parameter sets, column k belongs to the k-th hyperparameter.
+
+        :param U: [ndarray] design (N, #parameters)
+        :param searchspace: [dict] hyperparameter description
+
+        :return: [list] parameter dicts
+        """
+        columns = {}
+        for k, (name, param) in enumerate(searchspace.items()):
+            u = U[:, k]
+            if param["domain"] == "categorical":
+                index = np.minimum((u * len(param["data"])).astype(int), len(param["data"]) - 1)
+                columns[name] = [param["data"][i] for i in index]
+                continue
+            lo, hi = float(param["data"][0]), float(param["data"][1])
+            if param["domain"] == "uniform" and param["type"] is int:
+                # each int value gets an equally wide stratum instead of half ones at the bounds
+                columns[name] = [int(v) for v in np.minimum(lo + np.floor(u * (hi - lo + 1)), hi)]
+                continue
+            if param["domain"] == "loguniform":
+                values = np.exp(np.log(lo) + u * (np.log(hi) - np.log(lo)))
+            elif param["domain"] == "normal":
+                mu = (hi - lo) / 2
+                values = norm.ppf(np.clip(u, 1e-12, 1 - 1e-12), loc=lo + mu, scale=mu / 3)
+            else:
+                values = lo + u * (hi - lo)
+            values = np.clip(values, lo, hi)
+            if param["type"] is int:
+                columns[name] = [int(np.round(v)) for v in values]
+            else:
+                columns[name] = [float(v) for v in values]
+        return [{name: columns[name][n] for name in searchspace.keys()} for n in range(len(U))]
+
+    def orthogonal_levels(self, searchspace):
+        """
+        Returns the number of levels of the orthogonal array, the largest prime s with s^2 <= max_iterations supporting
+        all parameters. If the budget is too small, the smallest prime supporting all parameters is returned.
+
+        :param searchspace: [dict] hyperparameter description
+
+        :return: [int] number of levels
+        """
+        minimum = max([len(searchspace) - 1, 2] + [len(p["data"]) for p in searchspace.values()
+                                                   if p["domain"] == "categorical"])
+        s = minimum
+        while not _is_prime(s):
+            s += 1
+        if s * s > self.max_iterations:
+            LOG.warning("max_iterations {} is too small for an orthogonal array with {} levels, the array is "
+                        "truncated!".format(self.max_iterations, s))
+            return s
+        while True:
+            t = s + 1
+            while not _is_prime(t):
+                t += 1
+            if t * t > self.max_iterations:
+                return s
+            s = t
+
+    def generate_design(self, searchspace):
+        """
+        Generates the design of max_iterations points on the unit cube.
+
+        :param searchspace: [dict] hyperparameter description
+
+        :return: [ndarray] design (max_iterations, #parameters)
+        """
+        N, dims = self.max_iterations, len(searchspace)
+        if self.design == "orthogonal":
+            s = self.orthogonal_levels(searchspace)
+            designs = [orthogonal_array_latin_hypercube(s, dims)[0] for _ in range(int(np.ceil(N / (s * s))))]
+            return np.concatenate(designs, axis=0)[:N]
+        return maximin_latin_hypercube(N, dims, designs=self.lhs_designs, swaps=self.lhs_swaps)
+
+    def execute_solver(self, searchspace):
+        """
+        This function is called immediately after convert_searchspace and get the output of the latter as input. It's
+        purpose is to call the solver libs main optimization function.
+
+        :param searchspace: converted hyperparameter space
+        """
+        try:
+            with self._phase("candidate_generation"):
+                U = self.generate_design(searchspace)
+                candidates = [CandidateDescriptor(**params) for params in self.decode(U, searchspace)]
+            self.loss_function_batch(candidates)
+        except Exception as e:
+            msg = "internal error in designofexperiments execute_solver occured. {}".format(e)
+            LOG.error(msg)
+            raise BrokenPipeError(msg)
+        self.best = self._trials.argmin
@@ -18,8 +18,8 @@ import logging
 import optunity
 from pprint import pformat
 
-from hyppopy.CandidateDescriptor import CandidateDescriptor, CandicateDescriptorWrapper
-from hyppopy.globals import DEBUGLEVEL
+from hyppopy.CandidateDescriptor import CandidateBatch
+from hyppopy.globals import DEBUGLEVEL, LazyFormat
 from hyperopt import Trials
 
 LOG = logging.getLogger(os.path.basename(__file__))
@@ -74,7 +74,7 @@ class DynamicPSOSolver(OptunitySolver):
         :return: [object] converted hyperparameter space
         :return: [dict] dict keeping domains for different hyperparameters.
         """
-        LOG.debug("convert input parameter\n\n\t{}\n".format(pformat(hyperparameter)))
+        LOG.debug("convert input parameter\n\n\t%s\n", LazyFormat(pformat, hyperparameter))
         # Split input in categorical and non-categorical data.
         cat, uni = self.split_categorical(hyperparameter)
         # Build up dict keeping all non-categorical data.
@@ -114,13 +114,7 @@ class DynamicPSOSolver(OptunitySolver):
         if len(seq) == 0:
             return []
 
-        candidates = []
-        for elem in seq:
-            can = CandidateDescriptor(**elem)
-            candidates.append(can)
-
-        cand_list = CandicateDescriptorWrapper(keys=seq[0].keys())
-        cand_list.set(candidates)
+        cand_list = CandidateBatch.from_dicts(seq)
 
         f_result = f(cand_list)
 
@@ -147,7 +141,7 @@ class DynamicPSOSolver(OptunitySolver):
 
         :param searchspace: converted hyperparameter space
         """
-        LOG.debug("execute_solver using solution space:\n\n\t{}\n".format(pformat(searchspace)))
+        LOG.debug("execute_solver using solution space:\n\n\t%s\n", LazyFormat(pformat, searchspace))
         tree = optunity.search_spaces.SearchTree(searchspace)   # Set up tree structure to model search space.
         box = tree.to_box()                                     # Create set of box constraints to define given search space.
         f = optunity.functions.logged(self.loss_function_batch)       # Call log here because function signature used later on is internal logic.
@@ -0,0 +1,412 @@
+# Hyppopy - A Hyper-Parameter Optimization Toolbox
+#
+# Copyright (c) German Cancer Research Center,
+# Division of Medical Image Computing.
+# All rights reserved.
+#
+# This software is distributed WITHOUT ANY WARRANTY; without
+# even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE.
+#
+# See LICENSE
+
+__all__ = ['GaussianProcess', 'expected_improvement', 'GaussianProcessSolver']
+
+import os
+import logging
+import numpy as np
+from pprint import pformat
+from scipy.stats import norm
+from scipy.special import erfc
+from scipy.linalg import solve_triangular, cho_solve
+from hyppopy.globals import DEBUGLEVEL, LazyFormat
+from hyppopy.solvers.HyppopySolver import HyppopySolver
+from hyppopy.solvers.RandomsearchSolver import draw_sample
+from hyppopy.CandidateDescriptor import CandidateDescriptor
+
+LOG = logging.getLogger(os.path.basename(__file__))
+LOG.setLevel(DEBUGLEVEL)
+
+
+class GaussianProcess(object):
+    """
+    Gaussian process regression with a squared exponential kernel on standardized targets. Observations are added
+    incrementally, the Cholesky factor of the kernel matrix is extended by the rows of the new points instead of being
+    recomputed, thus adding k points to n observations costs O(n^2 k) instead of O(n^3). If no length scale is given,
+    it is selected by maximizing the marginal likelihood each time the number of observations doubled, only then the
+    factor is recomputed.
+    """
+    def __init__(self, length_scale=None, noise=1e-6):
+        """
+        :param length_scale: [float] kernel length scale, if None it is fitted, default=None
+        :param noise: [float] observation noise variance added to the diagonal, default=1e-6
+        """
+        self._fit_length_scale = length_scale is None
+        self.length_scale = 0.2 if length_scale is None else length_scale
+        self.noise = noise
+        self._X = None
+        self._y = None
+        self._L = None
+        self._alpha = None
+        self._y_mean = 0.0
+        self._y_std = 1.0
+        self._n_factorized = 0
+
+    def kernel(self, A, B, length_scale=None):
+        """
+        Squared exponential kernel matrix between the rows of A and B.
+
+        :param A: [ndarray] points (n, d)
+        :param B: [ndarray] points (m, d)
+        :param length_scale: [float] length scale, default=self.length_scale
+
+        :return: [ndarray] kernel matrix (n, m)
+        """
+        length_scale = self.length_scale if length_scale is None else length_scale
+        d2 = np.sum(A**2, axis=1)[:, None] + np.sum(B**2, axis=1)[None, :] - 2.0 * A @ B.T
+        return np.exp(-0.5 * np.maximum(d2, 0.0) / length_scale**2)
+
+    def _cholesky(self, K):
+        jitter = 0.0
+        for _ in range(6):
+            try:
+                return np.linalg.cholesky(K + jitter * np.eye(K.shape[0]))
+            except np.linalg.LinAlgError:
+                jitter = 1e-10 if jitter == 0.0 else jitter * 100
+        raise np.linalg.LinAlgError("kernel matrix is not positive definite")
+
+    def _factorize(self):
+        self._L = self._cholesky(self.kernel(self._X, self._X) + self.noise * np.eye(len(self._X)))
+        self._n_factorized = len(self._X)
+
+    def _extend(self, n_old):
+        X_old, X_new = self._X[:n_old], self._X[n_old:]
+        B = solve_triangular(self._L, self.kernel(X_old, X_new), lower=True)
+        C = self.kernel(X_new, X_new) + self.noise * np.eye(len(X_new)) - B.T @ B
+        L = np.zeros((len(self._X), len(self._X)))
+        L[:n_old, :n_old] = self._L
+        L[n_old:, :n_old] = B.T
+        L[n_old:, n_old:] = self._cholesky(C)
+        self._L = L
+
+    def _select_length_scale(self):
+        y = self._standardized()
+        best = None
+        for length_scale in np.geomspace(0.05, 1.0, 7) * np.sqrt(self._X.shape[1]):
+            K = self.kernel(self._X, self._X, length_scale) + self.noise * np.eye(len(self._X))
+            try:
+                L = self._cholesky(K)
+            except np.linalg.LinAlgError:
+                continue
+            alpha = cho_solve((L, True), y)
+            log_likelihood = -0.5 * y @ alpha - np.sum(np.log(np.diag(L)))
+            if best is None or log_likelihood > best[0]:
+                best = (log_likelihood, length_scale)
+        if best is not None:
+            self.length_scale = best[1]
+
+    def _standardized(self):
+        self._y_mean = np.mean(self._y)
+        self._y_std = np.std(self._y)
+        if self._y_std <= 0:
+            self._y_std = 1.0
+        return (self._y - self._y_mean) / self._y_std
+
+    def add(self, X, y):
+        """
+        Adds observations and updates the model.
+
+        :param X: [ndarray] points (k, d)
+        :param y: [ndarray] targets (k,)
+        """
+        X = np.atleast_2d(np.asarray(X, dtype=float))
+        y = np.asarray(y, dtype=float).ravel()
+        n_old = 0 if self._X is None else len(self._X)
+        self._X = X if self._X is None else np.vstack([self._X, X])
+        self._y = y if self._y is None else np.concatenate([self._y, y])
+        if n_old == 0 or (self._fit_length_scale and len(self._X) >= 2 * self._n_factorized):
+            if self._fit_length_scale:
+                self._select_length_scale()
+            self._factorize()
+        else:
+            try:
+                self._extend(n_old)
+            except np.linalg.LinAlgError:
+                self._factorize()
+        self._alpha = cho_solve((self._L, True), self._standardized())
+
+    def predict(self, X):
+        """
+        Returns the posterior mean and standard deviation in standardized target units.
+
+        :param X: [ndarray] points (m, d)
+
+        :return: [ndarray], [ndarray] mean (m,) and standard deviation (m,)
+        """
+        Ks = self.kernel(self._X, X)
+        mu = Ks.T @ self._alpha
+        v = solve_triangular(self._L, Ks, lower=True)
+        var = np.maximum(1.0 - np.sum(v**2, axis=0), 1e-12)
+        return mu, np.sqrt(var)
+
+    def mean_gradient(self, X):
+        """
+        Returns the gradient of the posterior mean.
+
+        :param X: [ndarray] points (m, d)
+
+        :return: [ndarray] gradients (m, d)
+        """
+        Ka = self.kernel(self._X, X) * self._alpha[:, None]
+        return -(X * np.sum(Ka, axis=0)[:, None] - Ka.T @ self._X) / self.length_scale**2
+
+    @property
+    def X(self):
+        """
+        Observed points (n, d), None before the first add.
+        """
+        return self._X
+
+    @property
+    def y(self):
+        """
+        Observed targets (n,) in their original units, None before the first add.
+        """
+        return self._y
+
+    @property
+    def y_min(self):
+        return np.min((self._y - self._y_mean) / self._y_std)
+
+    def __len__(self):
+        return 0 if self._X is None else len(self._X)
+
+
+def expected_improvement(mu, sigma, y_min, xi=0.0):
+    """
+    Expected improvement of a minimization problem.
+
+    :param mu: [ndarray] posterior mean
+    :param sigma: [ndarray] posterior standard deviation
+    :param y_min: [float] best observed value
+    :param xi: [float] exploration offset, default=0.0
+
+    :return: [ndarray] expected improvement
+    """
+    improvement = y_min - mu - xi
+    z = improvement / sigma
+    return improvement * norm.cdf(z) + sigma * norm.pdf(z)
+
+
+class GaussianProcessSolver(HyppopySolver):
+    """
+    The GaussianProcessSolver class implements Bayesian optimization with a Gaussian process surrogate and the expected
+    improvement acquisition. Numerical parameters are mapped to the unit interval, loguniform ones logarithmically,
+    categorical parameters are one hot encoded. The acquisition is maximized over n_candidates random and locally
+    perturbed points.
+
+    Candidates are proposed in batches of batch_size and evaluated via loss_function_batch, thus distributed if the
+    solver runs inside an MPISolverWrapper. The batch is selected by local penalization (Gonzalez et al. 2016), each
+    selected point penalizes the acquisition around itself by a ball whose radius depends on the Lipschitz constant of
+    the posterior mean. batch_size=0 (default) uses the number of MPI workers if available, else 1.
+
+    The solver settings are max_iterations (required), init_samples (default 5), batch_size (default 0),
+    n_candidates (default 2000), length_scale (default 0, fitted), noise (default 1e-6) and xi (default 0.01).
+    """
+    def __init__(self, project=None):
+        """
+        The constructor accepts a HyppopyProject.
+
+        :param project: [HyppopyProject] project instance, default=None
+        """
+        HyppopySolver.__init__(self, project)
+        self._axes = None
+        self._dims = 0
+        self._gp = None
+
+    def define_interface(self):
+        """
+        This function is called when HyppopySolver.__init__ function finished. Child classes need to define their
+        individual parameter here by calling the _add_member function for each class member variable need to be defined.
+        Using _add_hyperparameter_signature the structure of a hyperparameter the solver expects must be defined.
+        Both, members and hyperparameter signatures are later get checked, before executing the solver, ensuring
+        settings passed fullfill solver needs.
+        """
+        self._add_member("max_iterations", int)
+        self._add_member("init_samples", int, default=5)
+        self._add_member("batch_size", int, default=0)
+        self._add_member("n_candidates", int, default=2000)
+        self._add_member("length_scale", (int, float), default=0)
+        self._add_member("noise", (int, float), default=1e-6)
+        self._add_member("xi", (int, float), default=0.01)
+        self._add_hyperparameter_signature(name="domain", dtype=str,
+                                          options=["uniform", "normal", "loguniform", "categorical"])
+        self._add_hyperparameter_signature(name="data", dtype=list)
+        self._add_hyperparameter_signature(name="type", dtype=type)
+
+    def convert_searchspace(self, hyperparameter):
+        """
+        This function gets the unified hyppopy-like parameterspace description as input and, if necessary, should
+        convert it into a solver lib specific format. The function is invoked when run is called and what it returns
+        is passed as searchspace argument to the function execute_solver.
+
+        :param hyperparameter: [dict] nested parameter description dict e.g. {'name': {'domain':'uniform', 'data':[0,1], 'type':'float'}, ...}
+
+        :return: [object] converted hyperparameter space
+        """
+        LOG.debug("convert input parameter\n\n\t%s\n", LazyFormat(pformat, hyperparameter))
+        self._axes = []
+        column = 0
+        for name, param in hyperparameter.items():
+            axis = {"name": name, "param": param, "column": column}
+            if param["domain"] == "categorical":
+                axis["width"] = len(param["data"])
+            else:
+                axis["width"] = 1
+                axis["log"] = param["domain"] == "loguniform"
+                bounds = np.array(param["data"][:2], dtype=float)
+                axis["bounds"] = np.log(bounds) if axis["log"] else bounds
+            column += axis["width"]
+            self._axes.append(axis)
+        self._dims = column
+        return hyperparameter
+
+    def encode(self, params):
+        """
+        Maps parameter sets into the unit cube.
+
+        :param params: [list] parameter dicts
+
+        :return: [ndarray] encoded points (n, dims)
+        """
+        U = np.zeros((len(params), self._dims))
+        for axis in self._axes:
+            values = [p[axis["name"]] for p in params]
+            if axis["param"]["domain"] == "categorical":
+                U[np.arange(len(params)), axis["column"] + np.array([axis["param"]["data"].index(v) for v in values],
+                                                                    dtype=int)] = 1.0
+            else:
+                values = np.array(values, dtype=float)
+                if axis["log"]:
+                    values = np.log(values)
+                lo, hi = axis["bounds"]
+                U[:, axis["column"]] = (values - lo) / (hi - lo)
+        return U
+
+    def decode(self, U):
+        """
+        Maps points of the unit cube to parameter sets.
+
+        :param U: [ndarray] encoded points (n, dims)
+
+        :return: [list] parameter dicts
+        """
+        params = [{} for _ in range(len(U))]
+        for axis in self._axes:
+            c = axis["column"]
+            if axis["param"]["domain"] == "categorical":
+                values = [axis["param"]["data"][i] for i in np.argmax(U[:, c:c + axis["width"]], axis=1)]
+            else:
+                lo, hi = axis["bounds"]
+                values = lo + np.clip(U[:, c], 0.0, 1.0) * (hi - lo)
+                if axis["log"]:
+                    values = np.exp(values)
+                values = np.clip(values, axis["param"]["data"][0], axis["param"]["data"][1])
+                if axis["param"]["type"] is int:
+                    values = [int(np.round(v)) for v in values]
+                else:
+                    values = [float(v) for v in values]
+            for p, v in zip(params, values):
+                p[axis["name"]] = v
+        return params
+
+    def _random_points(self, n):
+        U = np.random.uniform(size=(n, self._dims))
+        for axis in self._axes:
+            if axis["param"]["domain"] == "categorical":
+                c = axis["column"]
+                U[:, c:c + axis["width"]] = 0.0
+                U[np.arange(n), c + np.random.randint(axis["width"], size=n)] = 1.0
+        return U
+
+    def _acquisition_candidates(self):
+        n_local = self.n_candidates // 2
+        U = self._random_points(self.n_candidates - n_local)
+        order = np.argsort(self._gp.y, kind='stable')[:5]
+        centers = self._gp.X[order[np.random.randint(len(order), size=n_local)]]
+        local = centers + np.random.normal(scale=0.05, size=centers.shape)
+        redraw = self._random_points(n_local)
+        for axis in self._axes:
+            c = axis["column"]
+            if axis["param"]["domain"] == "categorical":
+                mask = np.random.uniform(size=n_local) < 0.2
+                local[:, c:c + axis["width"]] = np.where(mask[:, None], redraw[:, c:c + axis["width"]],
+                                                         centers[:, c:c + axis["width"]])
+        U = np.vstack([U, np.clip(local, 0.0, 1.0)])
+        # snap onto the parameter grid, e.g. int parameter, thus the model sees what gets evaluated
+        return self.encode(self.decode(U))
+
+    def propose(self, q):
+        """
+        Selects q points maximizing the expected improvement penalized around the points already selected.
+
+        :param q: [int] batch size
+
+        :return: [list] parameter dicts
+        """
+        U = self._acquisition_candidates()
+        mu, sigma = self._gp.predict(U)
+        y_min = self._gp.y_min
+        acquisition = expected_improvement(mu, sigma, y_min, self.xi)
+        acquisition = np.maximum(acquisition, 1e-300)
+        lipschitz = max(np.max(np.linalg.norm(self._gp.mean_gradient(U), axis=1)), 1e-7)
+        penalty = np.ones(len(U))
+        selected = []
+        for _ in range(min(q, len(U))):
+            i = int(np.argmax(acquisition * penalty))
+            selected.append(i)
+            r = np.linalg.norm(U - U[i], axis=1)
+            z = (lipschitz * r - (mu[i] - y_min)) / (np.sqrt(2.0) * sigma[i])
+            penalty *= 0.5 * erfc(-z)
+            penalty[i] = 0.0
+        return self.decode(U[selected])
+
+    def _observe(self, candidates, results):
+        with self._phase("model_update"):
+            losses = np.array([results[c.ID]['loss'] for c in candidates], dtype=float)
+            finite = np.isfinite(losses)
+            if not np.all(finite):
+                known = np.concatenate([losses[finite], [] if self._gp.y is None else self._gp.y])
+                losses[~finite] = np.max(known) if len(known) > 0 else 0.0
+            self._gp.add(self.encode([c.get_values() for c in candidates]), losses)
+
+    def execute_solver(self, searchspace):
+        """
+        This function is called immediately after convert_searchspace and get the output of the latter as input. It's
+        purpose is to call the solver libs main optimization function.
+
+        :param searchspace: converted hyperparameter space
+        """
+        batch_size = self.batch_size
+        if batch_size <= 0:
+            batch_size = self.blackbox.num_workers() if hasattr(self.blackbox, 'num_workers') else 1
+        self._gp = GaussianProcess(length_scale=self.length_scale if self.length_scale > 0 else None,
+                                   noise=self.noise)
+        try:
+            n_init = max(min(self.init_samples, self.max_iterations), 1)
+            with self._phase("candidate_generation"):
+                candidates = [CandidateDescriptor(**{name: draw_sample(p) for name, p in searchspace.items()})
+                              for _ in range(n_init)]
+            self._observe(candidates, self.loss_function_batch(candidates))
+            evaluated = n_init
+            while evaluated < self.max_iterations:
+                q = min(batch_size, self.max_iterations - evaluated)
+                with self._phase("candidate_generation"):
+                    candidates = [CandidateDescriptor(**params) for params in self.propose(q)]
+                self._observe(candidates, self.loss_function_batch(candidates))
+                evaluated += len(candidates)
+        except Exception as e:
+            msg = "internal error in gaussianprocess execute_solver occured. {}".format(e)
+            LOG.error(msg)
+            raise BrokenPipeError(msg)
+        self.best = self._trials.argmin
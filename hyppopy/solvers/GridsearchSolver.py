@@ -18,7 +18,7 @@ from pprint import pformat
 
 from scipy.stats import norm
 from itertools import product
-from hyppopy.globals import DEBUGLEVEL, DEFAULTGRIDFREQUENCY
+from hyppopy.globals import DEBUGLEVEL, DEFAULTGRIDFREQUENCY, LazyFormat
 from hyppopy.solvers.HyppopySolver import HyppopySolver
 from hyppopy.CandidateDescriptor import CandidateDescriptor
 
@@ -183,7 +183,8 @@ class GridsearchSolver(HyppopySolver):
 
         :param searchspace: converted hyperparameter space
         """
-        candidates = self.get_candidates(searchspace)
+        with self._phase("candidate_generation"):
+            candidates = self.get_candidates(searchspace)
 
         try:
             self.loss_function_batch(candidates)
@@ -203,7 +204,7 @@ class GridsearchSolver(HyppopySolver):
 
         :return: [list] name and range for each parameter space axis
         """
-        LOG.debug("convert input parameter\n\n\t{}\n".format(pformat(hyperparameter)))
+        LOG.debug("convert input parameter\n\n\t%s\n", LazyFormat(pformat, hyperparameter))
         searchspace = [[], []]
         for name, param in hyperparameter.items():
             if param["domain"] != "categorical" and "frequency" not in param.keys():
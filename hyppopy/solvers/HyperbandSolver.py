@@ -0,0 +1,160 @@
+# Hyppopy - A Hyper-Parameter Optimization Toolbox
+#
+# Copyright (c) German Cancer Research Center,
+# Division of Medical Image Computing.
+# All rights reserved.
+#
+# This software is distributed WITHOUT ANY WARRANTY; without
+# even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE.
+#
+# See LICENSE
+
+__all__ = ['HyperbandSolver', 'hyperband_schedule']
+
+import os
+import math
+import logging
+import numpy as np
+from pprint import pformat
+from hyppopy.globals import DEBUGLEVEL, LazyFormat
+from hyppopy.solvers.HyppopySolver import HyppopySolver
+from hyppopy.solvers.RandomsearchSolver import draw_sample
+from hyppopy.CandidateDescriptor import CandidateDescriptor
+
+LOG = logging.getLogger(os.path.basename(__file__))
+LOG.setLevel(DEBUGLEVEL)
+
+
+def hyperband_schedule(max_budget, min_budget=1, eta=3, brackets=None):
+    """
+    Computes the Hyperband brackets. Each bracket is a successive halving run, a list of rungs (n_i, r_i) meaning n_i
+    candidates are evaluated with budget r_i, the best n_i/eta of them are promoted to the next rung. The first bracket
+    starts with many candidates at min_budget, the last one evaluates few candidates at max_budget only.
+
+    :param max_budget: [float] budget of the last rung of each bracket
+    :param min_budget: [float] smallest budget used, default=1
+    :param eta: [int] reduction factor between rungs, default=3
+    :param brackets: [int] number of brackets, starting with the one using min_budget, if None all possible brackets
+                     are used, brackets=1 is plain successive halving from min_budget to max_budget, default=None
+
+    :return: [list] brackets [[(n_0, r_0), (n_1, r_1), ...], ...]
+    """
+    assert eta >= 2, "precondition violation, eta needs to be >= 2!"
+    assert 0 < min_budget <= max_budget, "precondition violation, 0 < min_budget <= max_budget required!"
+    s_max = int(math.floor(math.log(max_budget / min_budget) / math.log(eta) + 1e-9))
+    s_min = 0
+    if brackets is not None:
+        assert brackets > 0, "precondition violation, brackets needs to be positive!"
+        s_min = max(s_max + 1 - brackets, 0)
+    schedule = []
+    for s in range(s_max, s_min - 1, -1):
+        n = int(math.ceil((s_max + 1) / (s + 1) * eta ** s))
+        r = max_budget * eta ** (-s)
+        schedule.append([(int(math.floor(n * eta ** (-i))), r * eta ** i) for i in range(s + 1)])
+    return schedule
+
+
+class HyperbandSolver(HyppopySolver):
+    """
+    The HyperbandSolver class implements the Hyperband multi-fidelity optimization (Li et al. 2018). Candidates are
+    drawn randomly like in the RandomsearchSolver, evaluated with a small budget first and only the best fraction 1/eta
+    is promoted to an eta times larger budget. The budget is passed to the blackbox as additional parameter named
+    budget_name, e.g. def my_loss_function(x, y, budget), and could be the number of epochs or a data subset size.
+    Each rung is evaluated via loss_function_batch, thus as one batch that is distributed if the solver runs inside an
+    MPISolverWrapper. The best parameter set is the best one evaluated with max_budget.
+
+    The solver settings are max_budget (required), min_budget (default 1), eta (default 3), brackets (default 0, all
+    brackets, 1 means plain successive halving) and budget_name (default 'budget'). If max_budget and min_budget are
+    ints the budgets passed are rounded ints.
+    """
+    def __init__(self, project=None):
+        """
+        The constructor accepts a HyppopyProject.
+
+        :param project: [HyppopyProject] project instance, default=None
+        """
+        HyppopySolver.__init__(self, project)
+
+    def define_interface(self):
+        """
+        This function is called when HyppopySolver.__init__ function finished. Child classes need to define their
+        individual parameter here by calling the _add_member function for each class member variable need to be defined.
+        Using _add_hyperparameter_signature the structure of a hyperparameter the solver expects must be defined.
+        Both, members and hyperparameter signatures are later get checked, before executing the solver, ensuring
+        settings passed fullfill solver needs.
+        """
+        self._add_member("max_budget", (int, float))
+        self._add_member("min_budget", (int, float), default=1)
+        self._add_member("eta", int, default=3)
+        self._add_member("brackets", int, default=0)
+        self._add_member("budget_name", str, default="budget")
+        self._add_hyperparameter_signature(name="domain", dtype=str,
+                                          options=["uniform", "normal", "loguniform", "categorical"])
+        self._add_hyperparameter_signature(name="data", dtype=list)
+        self._add_hyperparameter_signature(name="type", dtype=type)
+
+    def _check_project(self):
+        HyppopySolver._check_project(self)
+        if self.budget_name in self.project.hyperparameter:
+            msg = "budget_name {} collides with a hyperparameter name!".format(self.budget_name)
+            LOG.error(msg)
+            raise LookupError(msg)
+
+    def convert_searchspace(self, hyperparameter):
+        """
+        This function gets the unified hyppopy-like parameterspace description as input and, if necessary, should
+        convert it into a solver lib specific format. The function is invoked when run is called and what it returns
+        is passed as searchspace argument to the function execute_solver.
+
+        :param hyperparameter: [dict] nested parameter description dict e.g. {'name': {'domain':'uniform', 'data':[0,1], 'type':'float'}, ...}
+
+        :return: [object] converted hyperparameter space
+        """
+        LOG.debug("convert input parameter\n\n\t%s\n", LazyFormat(pformat, hyperparameter))
+        return hyperparameter
+
+    def _budget(self, r):
+        if isinstance(self.max_budget, int) and isinstance(self.min_budget, int):
+            return int(round(r))
+        return float(r)
+
+    def execute_solver(self, searchspace):
+        """
+        This function is called immediately after convert_searchspace and get the output of the latter as input. It's
+        purpose is to call the solver libs main optimization function.
+
+        :param searchspace: converted hyperparameter space
+        """
+        schedule = hyperband_schedule(self.max_budget, self.min_budget, self.eta,
+                                      self.brackets if self.brackets > 0 else None)
+        best_loss = np.inf
+        best = None
+        try:
+            for bracket in schedule:
+                configs = []
+                for _ in range(bracket[0][0]):
+                    configs.append({name: draw_sample(p) for name, p in searchspace.items()})
+                for rung, (n, r) in enumerate(bracket):
+                    candidates = []
+                    for params in configs:
+                        params = dict(params)
+                        params[self.budget_name] = self._budget(r)
+                        candidates.append(CandidateDescriptor(**params))
+                    results = self.loss_function_batch(candidates)
+                    losses = []
+                    for candidate in candidates:
+                        loss = results[candidate.ID]['loss']
+                        losses.append(np.inf if loss is None or np.isnan(loss) else loss)
+                    order = np.argsort(losses, kind='stable')
+                    if rung == len(bracket) - 1:
+                        if losses[order[0]] < best_loss:
+                            best_loss = losses[order[0]]
+                            best = configs[order[0]]
+                    else:
+                        configs = [configs[i] for i in order[:max(bracket[rung + 1][0], 1)]]
+        except Exception as e:
+            msg = "internal error in hyperband execute_solver occured. {}".format(e)
+            LOG.error(msg)
+            raise BrokenPipeError(msg)
+        self.best = best if best is not None else configs[0]
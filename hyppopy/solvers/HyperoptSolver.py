@@ -17,9 +17,10 @@ import numpy as np
 from pprint import pformat
 from hyperopt import fmin, tpe, hp, STATUS_OK, STATUS_FAIL, Trials
 
-from hyppopy.globals import DEBUGLEVEL
+from hyppopy.globals import DEBUGLEVEL, LazyFormat
 from hyppopy.solvers.HyppopySolver import HyppopySolver
 from hyppopy.BlackboxFunction import BlackboxFunction
+from hyppopy.Pruner import TrialPruned
 
 LOG = logging.getLogger(os.path.basename(__file__))
 LOG.setLevel(DEBUGLEVEL)
@@ -66,13 +67,18 @@ class HyperoptSolver(HyppopySolver):
                     params[name] = p["data"][1]
         status = STATUS_FAIL
         try:
-            loss = self.blackbox(**params)
+            with self._phase("blackbox"):
+                loss = self.call_blackbox(params, trial_id=self._trials.trials[-1]['tid'])
             if loss is not None:
                 status = STATUS_OK
             else:
                 loss = 1e9
+        except TrialPruned as e:
+            # hyperopt knows no pruned state, a failed trial is ignored by the TPE model
+            status = STATUS_FAIL
+            loss = e.value if e.value is not None else 1e9
         except Exception as e:
-            LOG.error("execution of self.blackbox(**params) failed due to:\n {}".format(e))
+            LOG.error("execution of the blackbox failed due to:\n {}".format(e))
             status = STATUS_FAIL
             loss = 1e9
         cbd = copy.deepcopy(params)
@@ -83,6 +89,8 @@ class HyperoptSolver(HyppopySolver):
         cbd['refresh_time'] = self._trials.trials[-1]['refresh_time']
         if isinstance(self.blackbox, BlackboxFunction) and self.blackbox.callback_func is not None:
             self.blackbox.callback_func(**cbd)
+        for hook in self._evaluation_hooks:
+            hook(cbd)
         if self._visdom_viewer is not None:
             self._visdom_viewer.update(cbd)
         return {'loss': loss, 'status': status}
@@ -128,7 +136,7 @@ class HyperoptSolver(HyppopySolver):
 
         :param searchspace: converted hyperparameter space
         """
-        LOG.debug("execute_solver using solution space:\n\n\t{}\n".format(pformat(searchspace)))
+        LOG.debug("execute_solver using solution space:\n\n\t%s\n", LazyFormat(pformat, searchspace))
         self.trials = Trials()
 
         try:
@@ -9,30 +9,49 @@
 # A PARTICULAR PURPOSE.
 #
 # See LICENSE
-from _pytest import deprecated
 
-from hyppopy import CandidateDescriptor
-
-__all__ = ['HyppopySolver']
+__all__ = ['HyppopySolver', 'HyppopyTrials']
 
 import abc
 import copy
 import types
+import time
 import datetime
+import contextlib
 import numpy as np
-import pandas as pd
 from hyperopt import Trials
 from hyppopy.globals import *
 from hyppopy.CandidateDescriptor import CandidateDescriptor
-from hyppopy.VisdomViewer import VisdomViewer
 from hyppopy.HyppopyProject import HyppopyProject
-from hyppopy.BlackboxFunction import BlackboxFunction
+from hyppopy.BlackboxFunction import BlackboxFunction, call_with_params
+from hyppopy.Pruner import TrialPruned, TrialReporter, MedianPruner, accepts_reporter
+from hyppopy.ParetoFront import ParetoFront, is_multi_objective, best_compromise
+from hyppopy.Profiler import PhaseProfiler
 from hyppopy.FunctionSimulator import FunctionSimulator
 from hyppopy.globals import DEBUGLEVEL
 
 LOG = logging.getLogger(os.path.basename(__file__))
 LOG.setLevel(DEBUGLEVEL)
 
+# returned by HyppopySolver._phase if no profiler is set
+_NO_PHASE = contextlib.nullcontext()
+
+
+class HyppopyTrials(Trials):
+    """
+    Trials class of hyperopt extended by multi-objective losses. For vector losses the best trial is the Pareto optimal
+    one with the smallest sum of normalized losses (see ParetoFront.best_compromise).
+    """
+    @property
+    def best_trial(self):
+        candidates = [t for t in self.trials if t['result']['status'] == 'ok']
+        if len(candidates) == 0 or not is_multi_objective(candidates[0]['result']['loss']):
+            return Trials.best_trial.fget(self)
+        best = best_compromise([t['result']['loss'] for t in candidates])
+        if best is None:
+            return Trials.best_trial.fget(self)
+        return candidates[best]
+
 
 class HyppopySolver(object):
     """
@@ -85,6 +104,12 @@ class HyppopySolver(object):
         self._time_per_iteration = None         # mean time per iterration
         self._accumulated_blackbox_time = None  # summed time the solver was in the blackbox function
         self._visdom_viewer = None              # visdom viewer instance
+        self._call_conventions = {}             # calling conventions of the blackbox resolved per parameter names
+        self._accepts_reporter = False          # True if the blackbox has a reporter parameter
+        self._pruner = None                     # pruner deciding on trials of blackboxes accepting a reporter
+        self._pareto_front = ParetoFront()      # non-dominated trials of multi-objective blackboxes
+        self._evaluation_hooks = []             # functions called with a record of each evaluation
+        self._profiler = None                   # PhaseProfiler measuring the phases of a run
 
         self._child_members = {}                # this dict keeps track of the settings the child solver defines
         self._hopt_signatures = {}              # this dict keeps track of the hyperparameter signatures the child solver defines
@@ -215,13 +240,16 @@ class HyppopySolver(object):
                             LOG.error(msg)
                             raise LookupError(msg)
 
-        # check child members
-        for name in self._child_members.keys():
-            if name not in self.project.__dict__.keys():
+        # check child members, members with a default value are optional
+        for name, member in self._child_members.items():
+            if name in self.project.__dict__.keys():
+                self.__dict__[name] = self.project.settings[name]
+            elif member["default"] is not None:
+                self.__dict__[name] = member["default"]
+            else:
                 msg = "missing settings field {}!".format(name)
                 LOG.error(msg)
                 raise LookupError(msg)
-            self.__dict__[name] = self.project.settings[name]
 
     def __compute_time_statistics(self):
         """
@@ -253,6 +281,51 @@ class HyppopySolver(object):
 
         return list(results.values())[0]['loss']  # Here 'results' will always contain a single dict. We extract the loss from it and return it.
 
+    def call_blackbox(self, params, trial_id=None):
+        """
+        Calls the blackbox once with a hyperparameter set. BlackboxFunction instances get the parameters as keyword
+        arguments, vectorized ones a batch of one candidate via call_vectorized, plain functions are called according
+        to their signature (see resolve_call_convention). If the blackbox has a reporter parameter, a reporter created via create_reporter is passed. A TrialPruned exception
+        raised by the blackbox is passed on with the last reported value attached, the reported values of a pruned or
+        failed trial are discarded.
+
+        :param params: [dict] hyperparameter set
+        :param trial_id: [object] trial identifier passed to the pruner, default=None
+
+        :return: [object] blackbox return value
+        """
+        if isinstance(self.blackbox, BlackboxFunction) and self.blackbox.vectorized:
+            results = self.blackbox.call_vectorized([CandidateDescriptor(**params)])
+            return list(results.values())[0]['loss']
+        if not self._accepts_reporter:
+            return call_with_params(self.blackbox, params, conventions=self._call_conventions)
+        reporter = self.create_reporter(trial_id)
+        try:
+            loss = call_with_params(self.blackbox, params, conventions=self._call_conventions,
+                                    extra={'reporter': reporter})
+        except TrialPruned as e:
+            e.value = reporter.last_value
+            reporter.discard()
+            raise
+        except BaseException:
+            reporter.discard()
+            raise
+        reporter.complete()
+        return loss
+
+    def create_reporter(self, trial_id):
+        """
+        Creates the reporter passed to a blackbox accepting one. Solvers with a native pruning mechanism overwrite this
+        function.
+
+        :param trial_id: [object] trial identifier
+
+        :return: [TrialReporter] reporter instance
+        """
+        if self._pruner is None:
+            self._pruner = MedianPruner()
+        return TrialReporter(self._pruner, trial_id)
+
     def loss_function_batch(self, candidates):
         """
         This function is called with a list of candidates. This list is driven by the solver lib itself.
@@ -260,90 +333,181 @@ class HyppopySolver(object):
         of the callback_func if available. As a developer you might want to overwrite this function (or the 'non-batch'-version completely (e.g.
         HyperoptSolver).
 
-        :param candidates: [list of CandidateDescriptors]
+        :param candidates: [list of CandidateDescriptors or CandidateBatch]
 
         :return: [dict] result e.g. {'loss': 0.5, 'book_time': ..., 'refresh_time': ...}
         """
 
-        results = dict()
-        try:
-            candidates = self.loss_func_cand_preprocess(candidates)
-            results = self.blackbox.call_batch(candidates)
-            if results is None:
-                results = np.nan
-            results = self.loss_func_postprocess(results)
-        except ZeroDivisionError as e:
-            # Fallback: If call_batch is not supported in BlackboxFunction, we iterate over the candidates in the batch.
-            message = "Script not started via MPI:\n {}".format(e)
-            LOG.error(message)
-        except Exception as e:
-            message = "call_batch not supported in BlackboxFunction:\n {}".format(e)
-            LOG.error(message)
-        finally:
-            for i, candidate in enumerate(candidates):
-                cand_id = candidate.ID
-                # params = candidate.get_values()
-
-                cand_results = dict()
-                cand_results['book_time'] = datetime.datetime.now()
-                try:
-                    preprocessed_candidate_list = self.loss_func_cand_preprocess([candidate])
-                    candidate = preprocessed_candidate_list[0]
-                    params = candidate.get_values()
-                    try:
-                        loss = self.blackbox(**params)
-                    except:
-                        loss = self.blackbox(params)
-                    if loss is None:
-                        loss = np.nan
-                    cand_results['loss'] = loss
-                except Exception as e:
-                    LOG.error("computing loss failed due to:\n {}".format(e))
-                    cand_results['loss'] = np.nan
-                cand_results['refresh_time'] = datetime.datetime.now()
-                results[cand_id] = cand_results
+        results = None
+        if hasattr(self.blackbox, 'call_batch'):
+            try:
+                with self._phase("dispatch"):
+                    candidates = self.loss_func_cand_preprocess(candidates)
+                    results = self.blackbox.call_batch(candidates)
+                    results = self.loss_func_postprocess(results)
+            except ZeroDivisionError as e:
+                message = "Script not started via MPI:\n {}".format(e)
+                LOG.error(message)
+                results = None
+            except Exception as e:
+                message = "call_batch not supported in BlackboxFunction:\n {}".format(e)
+                LOG.error(message)
+                results = None
+        elif isinstance(self.blackbox, BlackboxFunction) and self.blackbox.vectorized:
+            try:
+                with self._phase("blackbox"):
+                    candidates = self.loss_func_cand_preprocess(candidates)
+                    results = self.blackbox.call_vectorized(candidates)
+                    results = self.loss_func_postprocess(results)
+            except Exception as e:
+                # a vectorized blackbox_func can't be called per candidate, the batch is marked failed
+                message = "vectorized evaluation failed: {}".format(e)
+                LOG.error(message)
+                now = datetime.datetime.now()
+                results = {candidate.ID: {'loss': np.nan, 'status': 'failed', 'error': message, 'book_time': now,
+                                          'refresh_time': now} for candidate in candidates}
+
+        if not isinstance(results, dict):
+            # Fallback: If call_batch is not supported or failed, we iterate over the candidates in the batch.
+            results = dict()
+            for candidate in candidates:
+                results[candidate.ID] = self.evaluate_candidate(candidate)
             results = self.loss_func_postprocess(results)
 
         # initialize trials
-        for i, candidate in enumerate(candidates):
-            self._idx += 1
-            vals = {}
-            idx = {}
-            for key in candidate.keys():
-                vals[key] = [candidate[key]]
-                idx[key] = [self._idx]
-            trial = {'tid': self._idx,
-                     'result': {'loss': None, 'status': 'ok'},
-                     'misc': {
-                         'tid': self._idx,
-                         'idxs': idx,
-                         'vals': vals
-                     },
-                     'book_time': results[candidate.ID]['book_time'],
-                     'refresh_time': results[candidate.ID]['refresh_time']
-                     }
-            try:
-                loss = results[candidate.ID]['loss']
-                trial['result']['loss'] = loss
-                trial['result']['status'] = 'ok'
-                if loss is np.nan:
-                    trial['result']['status'] = 'failed'
-            except Exception as e:
-                LOG.error("computing loss failed due to:\n {}".format(e))
+        for candidate in candidates:
+            self._add_trial(candidate, results[candidate.ID])
+
+        return results
+
+    def evaluate_candidate(self, candidate):
+        """
+        Evaluates a single candidate without adding a trial. A failing blackbox results in a nan loss, a pruned one in
+        the status 'pruned'. Solvers evaluating candidates concurrently, e.g. in a thread pool, call this function and
+        pass the result to _add_trial.
+
+        :param candidate: [CandidateDescriptor] candidate to evaluate
+
+        :return: [dict] result e.g. {'loss': 0.5, 'book_time': ..., 'refresh_time': ...}
+        """
+        cand_id = candidate.ID
+        cand_results = dict()
+        cand_results['book_time'] = datetime.datetime.now()
+        try:
+            preprocessed_candidate_list = self.loss_func_cand_preprocess([candidate])
+            candidate = preprocessed_candidate_list[0]
+            params = candidate.get_values()
+            with self._phase("blackbox"):
+                loss = self.call_blackbox(params, trial_id=cand_id)
+            if loss is None:
                 loss = np.nan
-                trial['result']['loss'] = np.nan
+            cand_results['loss'] = loss
+        except TrialPruned as e:
+            cand_results['loss'] = e.value if e.value is not None else np.nan
+            cand_results['status'] = 'pruned'
+        except Exception as e:
+            LOG.error("computing loss failed due to:\n {}".format(e))
+            cand_results['loss'] = np.nan
+        cand_results['refresh_time'] = datetime.datetime.now()
+        return cand_results
+
+    def _add_trial(self, candidate, result):
+        """
+        Appends an evaluated candidate to the trials and calls the callback_func if available. Solvers receiving results
+        one by one, e.g. asynchronously from MPI workers, call this function directly instead of loss_function_batch.
+
+        :param candidate: [CandidateDescriptor] evaluated candidate
+        :param result: [dict] result e.g. {'loss': 0.5, 'book_time': ..., 'refresh_time': ...}
+
+        :return: [dict] the trial appended
+        """
+        if self._profiler is not None:
+            start = time.perf_counter()
+        self._idx += 1
+        vals = {}
+        idx = {}
+        for key in candidate.keys():
+            vals[key] = [candidate[key]]
+            idx[key] = [self._idx]
+        trial = {'tid': self._idx,
+                 'result': {'loss': None, 'status': 'ok'},
+                 'misc': {
+                     'tid': self._idx,
+                     'idxs': idx,
+                     'vals': vals
+                 },
+                 'book_time': result['book_time'],
+                 'refresh_time': result['refresh_time']
+                 }
+        try:
+            loss = result['loss']
+            if is_multi_objective(loss):
+                loss = [float(v) for v in loss]
+            trial['result']['loss'] = loss
+            trial['result']['status'] = result.get('status', 'ok')
+            if 'error' in result:
+                trial['result']['error'] = result['error']
+            if loss is np.nan or (isinstance(loss, list) and np.any(np.isnan(loss))):
                 trial['result']['status'] = 'failed'
-            self._trials.trials.append(trial)
-            cbd = copy.deepcopy(candidate.get_values())
-            cbd['iterations'] = self._idx
-            cbd['loss'] = loss
-            cbd['status'] = trial['result']['status']
-            cbd['book_time'] = trial['book_time']
-            cbd['refresh_time'] = trial['refresh_time']
-            if isinstance(self.blackbox, BlackboxFunction) and self.blackbox.callback_func is not None:
-                self.blackbox.callback_func(**cbd)
+            elif isinstance(loss, list) and trial['result']['status'] == 'ok':
+                self._pareto_front.add(self._idx, loss)
+        except Exception as e:
+            LOG.error("computing loss failed due to:\n {}".format(e))
+            loss = np.nan
+            trial['result']['loss'] = np.nan
+            trial['result']['status'] = 'failed'
+        self._trials.trials.append(trial)
+        if self._profiler is not None:
+            end = time.perf_counter()
+            self._profiler.record("bookkeeping", start, end)
+        callback = isinstance(self.blackbox, BlackboxFunction) and self.blackbox.callback_func is not None
+        if not callback and len(self._evaluation_hooks) == 0:
+            return trial
+        cbd = copy.deepcopy(candidate.get_values())
+        cbd['iterations'] = self._idx
+        cbd['loss'] = loss
+        cbd['status'] = trial['result']['status']
+        cbd['book_time'] = trial['book_time']
+        cbd['refresh_time'] = trial['refresh_time']
+        if callback:
+            self.blackbox.callback_func(**cbd)
+        for hook in self._evaluation_hooks:
+            hook(cbd)
+        if self._profiler is not None:
+            self._profiler.record("callbacks", end, time.perf_counter())
+        return trial
 
-        return results
+    def _phase(self, name):
+        """
+        Returns a context manager measuring the enclosed code as phase name if a profiler is set, see
+        hyppopy.Profiler for the phase names.
+
+        :param name: [str] phase name
+
+        :return: [object] context manager
+        """
+        if self._profiler is None:
+            return _NO_PHASE
+        return self._profiler.phase(name)
+
+    def add_evaluation_hook(self, hook):
+        """
+        Adds a function called after each evaluation with a dict holding the parameter set, iterations, loss, status,
+        book_time and refresh_time, e.g. for progress output or metrics instead of printing in the blackbox. The record
+        is only created if a hook or a callback_func is set.
+
+        :param hook: [callable] function accepting the record dict
+        """
+        assert callable(hook), "precondition violation, hook must be callable, got {} instead!".format(type(hook))
+        self._evaluation_hooks.append(hook)
+
+    def remove_evaluation_hook(self, hook):
+        """
+        Removes a function added via add_evaluation_hook.
+
+        :param hook: [callable] hook to remove
+        """
+        self._evaluation_hooks.remove(hook)
 
     def run(self, print_stats=True):
         """
@@ -352,21 +516,33 @@ class HyppopySolver(object):
         :param print_stats: [bool] en- or disable console output
         """
         self._idx = 0
-        self.trials = Trials()
+        self.trials = HyppopyTrials()
+        self._pareto_front = ParetoFront()
+        if self._pruner is not None:
+            self._pruner.reset()
+
+        if self._profiler is not None:
+            self._profiler.start_run()
 
         start_time = datetime.datetime.now()
         try:
-            search_space = self.convert_searchspace(self.project.hyperparameter)
+            with self._phase("convert_searchspace"):
+                search_space = self.convert_searchspace(self.project.hyperparameter)
         except Exception as e:
             msg = "Failed to convert searchspace, error: {}".format(e)
             LOG.error(msg)
             raise AssertionError(msg)
+        if self._profiler is not None:
+            self._profiler.start_execute()
         try:
             self.execute_solver(search_space)
         except Exception as e:
             msg = "Failed to execute solver, error: {}".format(e)
             LOG.error(msg)
             raise AssertionError(msg)
+        finally:
+            if self._profiler is not None:
+                self._profiler.stop_execute()
         end_time = datetime.datetime.now()
         dt = end_time - start_time
         days = divmod(dt.total_seconds(), 86400)
@@ -375,6 +551,8 @@ class HyppopySolver(object):
         seconds = divmod(minutes[1], 1)
         milliseconds = divmod(seconds[1], 0.001)
         self._total_duration = [int(days[0]), int(hours[0]), int(minutes[0]), int(seconds[0]), int(milliseconds[0])]
+        if self._profiler is not None:
+            self._profiler.stop_run()
         if print_stats:
             self.print_best()
             self.print_timestats()
@@ -385,6 +563,8 @@ class HyppopySolver(object):
 
         :return: [DataFrame], [dict] history and optimal parameter set
         """
+        import pandas as pd
+
         assert isinstance(self.trials, Trials), "precondition violation, wrong trials type! Maybe solver was not yet executed?"
         results = {'duration': [], 'losses': [], 'status': []}
         pset = self.trials.trials[0]['misc']['vals']
@@ -397,13 +577,35 @@ class HyppopySolver(object):
             results['duration'].append((t2 - t1).microseconds / 1000.0)
             results['losses'].append(trial['result']['loss'])
             results['status'].append(trial['result']['status'] == 'ok')
-            losses = np.array(results['losses'])
-            results['losses'] = list(losses)
             pset = trial['misc']['vals']
             for p in pset.items():
                 results[p[0]].append(p[1][0])
+        if len(self._pareto_front) > 0:
+            results['pareto'] = [trial['tid'] in self._pareto_front for trial in self.trials.trials]
+        else:
+            results['losses'] = list(np.array(results['losses']))
         return pd.DataFrame.from_dict(results), self.best
 
+    def get_pareto_front(self):
+        """
+        Returns the non-dominated trials of a multi-objective optimization, the blackbox returned a vector of losses.
+
+        :return: [DataFrame] parameter sets and losses loss_0, loss_1, ... sorted by loss_0
+        """
+        import pandas as pd
+
+        trials = {trial['tid']: trial for trial in self.trials.trials}
+        results = {}
+        for tid, losses in zip(self._pareto_front.ids, self._pareto_front.losses):
+            for name, value in trials[tid]['misc']['vals'].items():
+                results.setdefault(name, []).append(value[0])
+            for k, loss in enumerate(losses):
+                results.setdefault('loss_{}'.format(k), []).append(loss)
+        df = pd.DataFrame.from_dict(results)
+        if len(df) > 0:
+            df = df.sort_values('loss_0').reset_index(drop=True)
+        return df
+
     def print_best(self):
         """
         Optimization result console output printing.
@@ -448,6 +650,7 @@ class HyppopySolver(object):
         :param server:  [str] server name, default: http://localhost
         """
         try:
+            from hyppopy.VisdomViewer import VisdomViewer
             self._visdom_viewer = VisdomViewer(self._project, port, server)
         except Exception as e:
             import warnings
@@ -500,12 +703,61 @@ class HyppopySolver(object):
         """
         if isinstance(value, types.FunctionType) or isinstance(value, BlackboxFunction) or isinstance(value, FunctionSimulator) or isinstance(value, MPIBlackboxFunction):
             self._blackbox = value
+            self._call_conventions = {}
+            self._accepts_reporter = accepts_reporter(value)
         else:
             self._blackbox = None
             msg = "Input error, blackbox of type: {} not allowed!".format(type(value))
             LOG.error(msg)
             raise TypeError(msg)
 
+    @property
+    def pruner(self):
+        """
+        Get the pruner used for blackbox functions accepting a reporter.
+
+        :return: [Pruner] pruner instance
+        """
+        return self._pruner
+
+    @pruner.setter
+    def pruner(self, value):
+        """
+        Set the pruner used for blackbox functions accepting a reporter, if None a MedianPruner is used.
+
+        :param value: [Pruner] pruner instance
+        """
+        self._pruner = value
+
+    @property
+    def profiler(self):
+        """
+        Get the PhaseProfiler measuring the phases of a run.
+
+        :return: [PhaseProfiler] profiler instance or None
+        """
+        return self._profiler
+
+    @profiler.setter
+    def profiler(self, value):
+        """
+        Set a PhaseProfiler measuring the phases of the next runs, None disables profiling.
+
+        :param value: [PhaseProfiler] profiler instance
+        """
+        assert value is None or isinstance(value, PhaseProfiler), "precondition violation, PhaseProfiler expected, got {} instead!".format(type(value))
+        self._profiler = value
+
+    @property
+    def pareto_front(self):
+        """
+        Get the ParetoFront keeping the trial ids and losses of the non-dominated trials of a multi-objective
+        optimization.
+
+        :return: [ParetoFront] pareto front
+        """
+        return self._pareto_front
+
     @property
     def best(self):
         """
@@ -14,34 +14,105 @@ import os
 import logging
 
 import numpy as np
-from mpi4py import MPI
 from hyppopy.globals import DEBUGLEVEL, MPI_TAGS
-from hyppopy.MPIBlackboxFunction import MPIBlackboxFunction
+from hyppopy.BlackboxFunction import call_with_params
+from hyppopy.Pruner import TrialPruned, TrialReporter, accepts_reporter
+from hyppopy.MPIBlackboxFunction import MPIBlackboxFunction, dispatch_candidates
 
 LOG = logging.getLogger(os.path.basename(__file__))
 LOG.setLevel(DEBUGLEVEL)
 
 
+class WorkerCommand(object):
+    """
+    Control message a master sends on the candidate channel instead of a candidate, e.g. to tell persistent workers
+    which blackbox to use for the following candidates.
+    """
+    def __init__(self, name, value=None):
+        """
+        :param name: [str] command name
+        :param value: [object] command argument, default=None
+        """
+        self.name = name
+        self.value = value
+
+    def __repr__(self):
+        return 'WorkerCommand({}, {})'.format(self.name, self.value)
+
+
 class MPISolverWrapper:
     """
     TODO Class description
     The MPISolverWrapper class wraps the functionality of solvers in Hyppopy to extend them with MPI functionality.
     It builds upon the interface defined by the HyppopySolver class.
+
+    By default rank 0 is the master serving all other ranks directly. For large runs the master's receive loop becomes
+    the bottleneck, thus the wrapper optionally builds a two-level topology (hierarchical=True): the ranks > 0 are
+    grouped per node via comm.Split, the lowest rank of each group becomes a sub-master. The master sends candidate
+    blocks to the sub-masters only, which distribute them to the workers of their node and send back the aggregated
+    results of the whole block.
     """
-    def __init__(self, solver=None, mpi_comm=None):
+    def __init__(self, solver=None, mpi_comm=None, hierarchical=False, ranks_per_node=None):
         """
         The constructor accepts a HyppopySolver.
 
         :param solver: [HyppopySolver] solver instance, default=None
-        :param mpi_comm: [MPI communicator] MPI communicator instance. If None, we create a new MPI.COMM_WORLD, default=None
+        :param mpi_comm: [MPI communicator] MPI communicator instance or a LocalCommunicator. If None, we create a new
+                         MPI.COMM_WORLD, default=None
+        :param hierarchical: [bool] enables the master/sub-master/worker topology, requires an mpi4py communicator,
+                             default=False
+        :param ranks_per_node: [int] number of ranks grouped under one sub-master, if None the ranks are grouped by
+                               their processor name, default=None
         """
         self._solver = solver
         self._mpi_comm = None
+        self._node_comm = None          # communicator between a sub-master (rank 0) and the workers of its node
+        self._leader_comm = None        # communicator between the master (rank 0) and all sub-masters
+        self._block_weights = None      # number of workers behind each sub-master, only known by the master
+        self._call_conventions = {}     # calling conventions of the worker blackbox resolved per parameter names
+        self._command_error = None      # error of the last WorkerCommand, candidates are answered with failed results
         if mpi_comm is None:
-            print('MPISolverWrapper: No mpi_comm given: Using MPI.COMM_WORLD')
+            from mpi4py import MPI
+            LOG.info('MPISolverWrapper: No mpi_comm given: Using MPI.COMM_WORLD')
             self._mpi_comm = MPI.COMM_WORLD
         else:
             self._mpi_comm = mpi_comm
+        if hierarchical:
+            self._setup_hierarchy(ranks_per_node)
+
+    def _setup_hierarchy(self, ranks_per_node=None):
+        """
+        Splits the communicator into node communicators and a leader communicator. This is a collective operation, it
+        must be called on all ranks.
+
+        :param ranks_per_node: [int] number of ranks grouped under one sub-master, if None the ranks are grouped by
+                               their processor name, default=None
+        """
+        from mpi4py import MPI
+        rank = self._mpi_comm.Get_rank()
+        if ranks_per_node is None:
+            names = self._mpi_comm.allgather(MPI.Get_processor_name())
+            hosts = sorted(set(names[1:]))
+            node_id = hosts.index(names[rank]) if rank > 0 else None
+        else:
+            assert isinstance(ranks_per_node, int) and ranks_per_node > 0, "precondition violation, ranks_per_node needs to be a positive int!"
+            node_id = (rank - 1) // ranks_per_node if rank > 0 else None
+
+        # the master is not part of any node group, it only talks to the sub-masters
+        self._node_comm = self._mpi_comm.Split(MPI.UNDEFINED if node_id is None else node_id, rank)
+        is_leader = rank == 0 or self._node_comm.Get_rank() == 0
+        self._leader_comm = self._mpi_comm.Split(0 if is_leader else MPI.UNDEFINED, rank)
+        if rank == 0:
+            self._node_comm = None
+        if not is_leader:
+            self._leader_comm = None
+        else:
+            # a sub-master evaluates candidates itself if there is no worker on its node
+            capacity = 0 if rank == 0 else max(self._node_comm.Get_size() - 1, 1)
+            capacities = self._leader_comm.gather(capacity, root=0)
+            if rank == 0:
+                self._block_weights = capacities[1:]
+                LOG.debug("hierarchical topology with %d sub-masters serving %s workers", len(self._block_weights), capacities[1:])
 
     @property
     def blackbox(self):
@@ -63,6 +134,8 @@ class MPISolverWrapper:
         """
         if isinstance(value, MPIBlackboxFunction):
             self._solver.blackbox = value
+        elif self.is_hierarchical() and self.is_master():
+            self._solver.blackbox = MPIBlackboxFunction(blackbox_func=value, mpi_comm=self._leader_comm, block_weights=self._block_weights)
         else:
             self._solver.blackbox = MPIBlackboxFunction(blackbox_func=value, mpi_comm=self._mpi_comm)
 
@@ -77,70 +150,190 @@ class MPISolverWrapper:
             return self._solver.get_results()
         return None, None
 
+    @property
+    def profiler(self):
+        """
+        Get the PhaseProfiler of the member solver, only the master measures.
+
+        :return: [PhaseProfiler] profiler instance or None
+        """
+        return self._solver.profiler
+
+    @profiler.setter
+    def profiler(self, value):
+        """
+        Set the PhaseProfiler of the member solver.
+
+        :param value: [PhaseProfiler] profiler instance
+        """
+        self._solver.profiler = value
+
+    def add_evaluation_hook(self, hook):
+        """
+        Adds an evaluation hook to the member solver, see HyppopySolver.add_evaluation_hook. Hooks are only called on
+        the master.
+
+        :param hook: [callable] function accepting the record dict
+        """
+        self._solver.add_evaluation_hook(hook)
+
+    def remove_evaluation_hook(self, hook):
+        """
+        Removes an evaluation hook from the member solver.
+
+        :param hook: [callable] hook to remove
+        """
+        self._solver.remove_evaluation_hook(hook)
+
+    def worker_blackbox(self):
+        """
+        Returns the function a worker evaluates the received candidates with.
+
+        :return: [callable] loss function
+        """
+        return self._solver.blackbox.blackbox_func
+
+    def handle_command(self, command):
+        """
+        Executes a WorkerCommand received by a worker or sub-master. The plain wrapper does not know any command.
+
+        :param command: [WorkerCommand] command instance
+
+        :return: [str] None if the command was executed, otherwise an error message
+        """
+        msg = "Unknown worker command {} received on rank {}!".format(command, self._mpi_comm.Get_rank())
+        LOG.error(msg)
+        return msg
+
+    def _execute_command(self, command):
+        # a failing command must not end the receive loop, the master would wait for the results forever. Instead the
+        # following candidates are answered with failed results carrying the error until a command succeeds.
+        try:
+            self._command_error = self.handle_command(command)
+        except Exception as e:
+            self._command_error = "Worker command {} failed on rank {}: {}".format(command, self._mpi_comm.Get_rank(), e)
+            LOG.error(self._command_error)
+
+    def evaluate_candidate(self, candidate):
+        """
+        Evaluates a single candidate on the calling rank.
+
+        :param candidate: [CandidateDescriptor] candidate to evaluate
+
+        :return: [dict] result e.g. {'loss': 0.5, 'book_time': ..., 'refresh_time': ...}
+        """
+        cand_results = dict()
+        extra = None
+        cand_results['book_time'] = datetime.datetime.now()
+        if self._command_error is not None:
+            cand_results['loss'] = np.nan
+            cand_results['status'] = 'failed'
+            cand_results['error'] = self._command_error
+            cand_results['refresh_time'] = datetime.datetime.now()
+            return cand_results
+        try:
+            params = candidate.get_values()
+            func = self.worker_blackbox()
+            if accepts_reporter(func):
+                # workers have no access to the pruner history of the master, the reporter only collects the values
+                extra = {'reporter': TrialReporter(None, candidate.ID)}
+            loss = call_with_params(func, params, conventions=self._call_conventions, extra=extra)
+        except TrialPruned:
+            loss = extra['reporter'].last_value
+            cand_results['status'] = 'pruned'
+        except Exception as e:
+            msg = "Error in Worker(rank={}): {}".format(self._mpi_comm.Get_rank(), e)
+            LOG.error(msg)
+            loss = np.nan
+        cand_results['loss'] = loss
+        cand_results['refresh_time'] = datetime.datetime.now()
+        return cand_results
+
     def run_worker_mode(self):
         """
         This function is called if the wrapper should run as a worker for a specific MPI rank.
         It receives messages for the following tags:
-        tag==MPI_SEND_CANDIDATE: parameters for the loss calculation. It param==None, the worker finishes.
+        tag==MPI_SEND_CANDIDATE: parameters for the loss calculation. It param==None, the worker finishes. A WorkerCommand
+                                 is passed to handle_command, if it fails the following candidates are answered
+                                 with failed results carrying the error.
         It sends messages for the following tags:
         tag==MPI_SEND_RESULT: result of an evaluated candidate.
 
-        :return: the evaluated loss of the candidate
+        In hierarchical mode the worker is served by the sub-master of its node instead of the global master.
         """
         rank = self._mpi_comm.Get_rank()
-        print("Starting worker {}. Waiting for param...".format(rank))
-
-        cand_results = dict()
+        comm = self._node_comm if self._node_comm is not None else self._mpi_comm
+        LOG.debug("Starting worker %d. Waiting for param...", rank)
 
         while True:
-            try:
-                candidate = self._mpi_comm.recv(source=0, tag=MPI_TAGS.MPI_SEND_CANDIDATE.value)  # Wait here till params are received
+            candidate = comm.recv(source=0, tag=MPI_TAGS.MPI_SEND_CANDIDATE.value)  # Wait here till params are received
 
-                if candidate is None:
-                    print("[RECEIVE] Process {} received finish signal.".format(rank))
-                    return
+            if candidate is None:
+                LOG.debug("[RECEIVE] Process %d received finish signal.", rank)
+                return
 
-                # if candidate.ID == 9999:
-                #     comm.gather(losses, root=0)
-                #     continue
+            if isinstance(candidate, WorkerCommand):
+                self._execute_command(candidate)
+                continue
 
-                # print("[WORKING] Process {} is actually doing things.".format(rank))
-                cand_id = candidate.ID
-                params = candidate.get_values()
+            cand_results = self.evaluate_candidate(candidate)
+            comm.send((candidate.ID, cand_results), dest=0, tag=MPI_TAGS.MPI_SEND_RESULTS.value)
+
+    def run_submaster_mode(self):
+        """
+        This function is called if the wrapper should run as a sub-master in hierarchical mode. It receives candidate
+        blocks from the master (tag==MPI_SEND_CANDIDATE_BLOCK), distributes them to the workers of its node and sends
+        the aggregated results back (tag==MPI_SEND_RESULTS_BLOCK). A block==None is forwarded to the node workers as
+        finish signal.
+        """
+        rank = self._mpi_comm.Get_rank()
+        LOG.debug("Starting sub-master %d serving %d workers. Waiting for blocks...", rank, self._node_comm.Get_size() - 1)
 
-                try:
-                    loss = self._solver.blackbox.blackbox_func(params)
-                except:
-                    loss = self._solver.blackbox.blackbox_func(**params)
+        while True:
+            block = self._leader_comm.recv(source=0, tag=MPI_TAGS.MPI_SEND_CANDIDATE_BLOCK.value)
 
-            except Exception as e:
-                msg = "Error in Worker(rank={}): {}".format(rank, e)
-                LOG.error(msg)
-                print(msg)
+            if block is None:
+                LOG.debug("[RECEIVE] Sub-master %d received finish signal.", rank)
+                for i in range(self._node_comm.Get_size() - 1):
+                    self._node_comm.send(None, dest=i + 1, tag=MPI_TAGS.MPI_SEND_CANDIDATE.value)
+                return
 
-                loss = np.nan
-            finally:
-                cand_results['book_time'] = datetime.datetime.now()
-                cand_results['loss'] = loss  # Write loss to dictionary. This dictionary will be send back to the master via gather
-                cand_results['refresh_time'] = datetime.datetime.now()
+            if isinstance(block, WorkerCommand):
+                for i in range(self._node_comm.Get_size() - 1):
+                    self._node_comm.send(block, dest=i + 1, tag=MPI_TAGS.MPI_SEND_CANDIDATE.value)
+                self._execute_command(block)
+                continue
 
-                cand_results['book_time'] = datetime.datetime.now()
+            if self._node_comm.Get_size() > 1:
+                results = dispatch_candidates(self._node_comm, block)
+            else:
+                results = {candidate.ID: self.evaluate_candidate(candidate) for candidate in block}
+            self._leader_comm.send(results, dest=0, tag=MPI_TAGS.MPI_SEND_RESULTS_BLOCK.value)
 
-                cand_results['loss'] = loss  # Write loss to dictionary. This dictionary will be send back to the master via gather
-                cand_results['refresh_time'] = datetime.datetime.now()
+    def send_to_workers(self, message):
+        """
+        Sends a message on the candidate channel from the master to all workers, in hierarchical mode to all sub-masters
+        which forward it to their workers.
 
-                self._mpi_comm.send((cand_id, cand_results), dest=0, tag=MPI_TAGS.MPI_SEND_RESULTS.value)
+        :param message: [object] None or a WorkerCommand
+        """
+        if self.is_hierarchical():
+            for i in range(self._leader_comm.Get_size() - 1):
+                self._leader_comm.send(message, dest=i + 1, tag=MPI_TAGS.MPI_SEND_CANDIDATE_BLOCK.value)
+            return
+        size = self._mpi_comm.Get_size()
+        for i in range(size - 1):
+            self._mpi_comm.send(message, dest=i + 1, tag=MPI_TAGS.MPI_SEND_CANDIDATE.value)
 
     def signal_worker_finished(self):
         """
         This function sends data==None to all workers from the master. This is the signal that tells the workers to finish.
+        In hierarchical mode the signal is sent to the sub-masters, which forward it to their workers.
 
         :return:
         """
-        print('[SEND] signal_worker_finished')
-        size = self._mpi_comm.Get_size()
-        for i in range(size - 1):
-            self._mpi_comm.send(None, dest=i + 1, tag=MPI_TAGS.MPI_SEND_CANDIDATE.value)
+        LOG.debug('[SEND] signal_worker_finished')
+        self.send_to_workers(None)
 
     def run(self, *args, **kwargs):
         """
@@ -152,10 +345,17 @@ class MPISolverWrapper:
             # This is the master process. From here we run the solver and start all the other processes.
             self._solver.run(*args, **kwargs)
             self.signal_worker_finished()  # Tell the workers to finish.
+        elif self.is_submaster():
+            self.run_submaster_mode()
         else:
             # this script execution should be in worker mode as it is an mpi worker.
             self.run_worker_mode()
 
+    def is_hierarchical(self):
+        if self._mpi_comm.Get_rank() == 0:
+            return self._block_weights is not None
+        return self._node_comm is not None
+
     def is_master(self):
         mpi_rank = self._mpi_comm.Get_rank()
         if mpi_rank == 0:
@@ -163,6 +363,11 @@ class MPISolverWrapper:
         else:
             return False
 
+    def is_submaster(self):
+        if self._mpi_comm.Get_rank() == 0 or self._node_comm is None:
+            return False
+        return self._node_comm.Get_rank() == 0
+
     def is_worker(self):
         mpi_rank = self._mpi_comm.Get_rank()
         if mpi_rank != 0:
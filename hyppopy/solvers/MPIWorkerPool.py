@@ -0,0 +1,160 @@
+# Hyppopy - A Hyper-Parameter Optimization Toolbox
+#
+# Copyright (c) German Cancer Research Center,
+# Division of Medical Image Computing.
+# All rights reserved.
+#
+# This software is distributed WITHOUT ANY WARRANTY; without
+# even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE.
+#
+# See LICENSE
+
+__all__ = ['MPIWorkerPool']
+
+import os
+import logging
+from hyppopy.globals import DEBUGLEVEL
+from hyppopy.BlackboxFunction import BlackboxFunction
+from hyppopy.MPIBlackboxFunction import MPIBlackboxFunction
+from hyppopy.solvers.MPISolverWrapper import MPISolverWrapper, WorkerCommand
+
+LOG = logging.getLogger(os.path.basename(__file__))
+LOG.setLevel(DEBUGLEVEL)
+
+
+class MPIWorkerPool(MPISolverWrapper):
+    """
+    The MPIWorkerPool keeps the MPI workers resident over several solver runs. While MPISolverWrapper.run finishes
+    the workers after a single solver run, the pool workers serve successive solvers and projects until shutdown is
+    called on the master, so data loaded by a blackbox on the workers is loaded only once per job.
+
+    All blackboxes used during the lifetime of the pool are registered by name on every rank before start is called,
+    the master selects the blackbox per run. Usage:
+
+    pool = MPIWorkerPool()
+    pool.register_blackbox("svc", BlackboxFunction(blackbox_func=..., dataloader_func=...))
+    pool.start()                                    # workers block here until shutdown
+    if pool.is_master():
+        for name in ["randomsearch", "optunity"]:
+            solver = pool.run(SolverPool.get(name, project), blackbox="svc", print_stats=False)
+            df, best = solver.get_results()
+        pool.shutdown()
+    """
+    def __init__(self, mpi_comm=None, hierarchical=False, ranks_per_node=None):
+        """
+        The constructor accepts the same topology options as MPISolverWrapper.
+
+        :param mpi_comm: [MPI communicator] MPI communicator instance or a LocalCommunicator. If None, we create a new
+                         MPI.COMM_WORLD, default=None
+        :param hierarchical: [bool] enables the master/sub-master/worker topology, requires an mpi4py communicator,
+                             default=False
+        :param ranks_per_node: [int] number of ranks grouped under one sub-master, if None the ranks are grouped by
+                               their processor name, default=None
+        """
+        MPISolverWrapper.__init__(self, solver=None, mpi_comm=mpi_comm, hierarchical=hierarchical, ranks_per_node=ranks_per_node)
+        self._blackboxes = {}               # registered blackboxes by name
+        self._active_blackbox = None        # name of the blackbox the workers currently evaluate
+        self._running = False
+
+    def register_blackbox(self, name, blackbox):
+        """
+        Registers a blackbox under a name. Needs to be called on all ranks with the same names before start.
+
+        :param name: [str] blackbox name
+        :param blackbox: [object] BlackboxFunction instance or function
+        """
+        assert isinstance(name, str), "precondition violation, name needs to be of type str, got {}".format(type(name))
+        assert callable(blackbox), "precondition violation, blackbox needs to be callable!"
+        assert not self._running, "precondition violation, blackboxes need to be registered before start!"
+        self._blackboxes[name] = blackbox
+        if self._active_blackbox is None:
+            self._active_blackbox = name
+
+    def get_blackbox_names(self):
+        """
+        Returns the names of all registered blackboxes
+
+        :return: [list] blackbox names
+        """
+        return list(self._blackboxes.keys())
+
+    def start(self):
+        """
+        Starts the pool. On worker ranks this call blocks and serves candidates until the master calls shutdown, on the
+        master it returns immediately.
+        """
+        assert len(self._blackboxes) > 0, "precondition violation, no blackbox registered!"
+        self._running = True
+        if self.is_master():
+            return
+        if self.is_submaster():
+            self.run_submaster_mode()
+        else:
+            self.run_worker_mode()
+        self._running = False
+
+    def run(self, solver, blackbox=None, *args, **kwargs):
+        """
+        Runs a solver on the resident workers. Only valid on the master.
+
+        :param solver: [HyppopySolver] solver instance
+        :param blackbox: [str] name of the registered blackbox, if None the active one is used, default=None
+        :param args: passed to solver.run
+        :param kwargs: passed to solver.run
+
+        :return: [HyppopySolver] the solver after its run
+        """
+        assert self.is_master(), "precondition violation, MPIWorkerPool.run can only be called on the master!"
+        assert self._running, "precondition violation, pool not started!"
+        if blackbox is None:
+            blackbox = self._active_blackbox
+        if blackbox not in self._blackboxes:
+            msg = "No blackbox named {} registered!".format(blackbox)
+            LOG.error(msg)
+            raise LookupError(msg)
+        if blackbox != self._active_blackbox:
+            self.send_to_workers(WorkerCommand('select_blackbox', blackbox))
+            self._active_blackbox = blackbox
+
+        callback_func = None
+        if isinstance(self._blackboxes[blackbox], BlackboxFunction):
+            callback_func = self._blackboxes[blackbox].callback_func
+        solver.blackbox = MPIBlackboxFunction(blackbox_func=self._blackboxes[blackbox],
+                                              callback_func=callback_func,
+                                              mpi_comm=self._leader_comm if self.is_hierarchical() else self._mpi_comm,
+                                              block_weights=self._block_weights)
+        self._solver = solver
+        solver.run(*args, **kwargs)
+        return solver
+
+    def shutdown(self):
+        """
+        Sends the finish signal to all workers. Only valid on the master, the workers return from start afterwards.
+        """
+        assert self.is_master(), "precondition violation, MPIWorkerPool.shutdown can only be called on the master!"
+        if self._running:
+            self.signal_worker_finished()
+            self._running = False
+
+    def worker_blackbox(self):
+        """
+        Returns the currently selected blackbox.
+
+        :return: [callable] loss function
+        """
+        return self._blackboxes[self._active_blackbox]
+
+    def handle_command(self, command):
+        """
+        Executes a WorkerCommand received by a worker or sub-master.
+
+        :param command: [WorkerCommand] command instance
+
+        :return: [str] None if the command was executed, otherwise an error message
+        """
+        if command.name == 'select_blackbox' and command.value in self._blackboxes:
+            self._active_blackbox = command.value
+            self._call_conventions = {}
+            return None
+        return MPISolverWrapper.handle_command(self, command)
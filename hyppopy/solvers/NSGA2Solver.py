@@ -0,0 +1,232 @@
+# Hyppopy - A Hyper-Parameter Optimization Toolbox
+#
+# Copyright (c) German Cancer Research Center,
+# Division of Medical Image Computing.
+# All rights reserved.
+#
+# This software is distributed WITHOUT ANY WARRANTY; without
+# even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE.
+#
+# See LICENSE
+
+__all__ = ['NSGA2Solver']
+
+import os
+import logging
+import numpy as np
+from pprint import pformat
+from hyppopy.globals import DEBUGLEVEL, LazyFormat
+from hyppopy.solvers.HyppopySolver import HyppopySolver
+from hyppopy.CandidateDescriptor import CandidateDescriptor
+from hyppopy.ParetoFront import non_dominated_sort, crowding_distance
+
+LOG = logging.getLogger(os.path.basename(__file__))
+LOG.setLevel(DEBUGLEVEL)
+
+# objective value assigned to failed evaluations, finite to keep the crowding distance defined
+FAILED_LOSS = 1e300
+
+
+class NSGA2Solver(HyppopySolver):
+    """
+    The NSGA2Solver class implements the multi-objective genetic algorithm NSGA-II (Deb et al. 2002). The blackbox
+    returns a vector of losses, all of them are minimized. Parents are selected by binary tournaments on the
+    non-domination rank and the crowding distance, offspring are created by simulated binary crossover and polynomial
+    mutation on the unit cube, categorical parameters by uniform crossover and random reset. The offspring of each
+    generation are evaluated as one batch via loss_function_batch, thus distributed if the solver runs inside an
+    MPISolverWrapper. The non-dominated trials are available via get_pareto_front.
+
+    The solver settings are max_iterations (required), population_size (default 20), crossover_prob (default 0.9),
+    mutation_prob (default 0, 1/#parameters), eta_crossover (default 15) and eta_mutation (default 20).
+    """
+    def __init__(self, project=None):
+        """
+        The constructor accepts a HyppopyProject.
+
+        :param project: [HyppopyProject] project instance, default=None
+        """
+        HyppopySolver.__init__(self, project)
+        self._axes = None
+
+    def define_interface(self):
+        """
+        This function is called when HyppopySolver.__init__ function finished. Child classes need to define their
+        individual parameter here by calling the _add_member function for each class member variable need to be defined.
+        Using _add_hyperparameter_signature the structure of a hyperparameter the solver expects must be defined.
+        Both, members and hyperparameter signatures are later get checked, before executing the solver, ensuring
+        settings passed fullfill solver needs.
+        """
+        self._add_member("max_iterations", int)
+        self._add_member("population_size", int, default=20)
+        self._add_member("crossover_prob", (int, float), default=0.9)
+        self._add_member("mutation_prob", (int, float), default=0)
+        self._add_member("eta_crossover", (int, float), default=15)
+        self._add_member("eta_mutation", (int, float), default=20)
+        self._add_hyperparameter_signature(name="domain", dtype=str,
+                                          options=["uniform", "normal", "loguniform", "categorical"])
+        self._add_hyperparameter_signature(name="data", dtype=list)
+        self._add_hyperparameter_signature(name="type", dtype=type)
+
+    def convert_searchspace(self, hyperparameter):
+        """
+        This function gets the unified hyppopy-like parameterspace description as input and, if necessary, should
+        convert it into a solver lib specific format. The function is invoked when run is called and what it returns
+        is passed as searchspace argument to the function execute_solver.
+
+        :param hyperparameter: [dict] nested parameter description dict e.g. {'name': {'domain':'uniform', 'data':[0,1], 'type':'float'}, ...}
+
+        :return: [object] converted hyperparameter space
+        """
+        LOG.debug("convert input parameter\n\n\t%s\n", LazyFormat(pformat, hyperparameter))
+        self._axes = []
+        for name, param in hyperparameter.items():
+            axis = {"name": name, "param": param, "categorical": param["domain"] == "categorical"}
+            if not axis["categorical"]:
+                axis["log"] = param["domain"] == "loguniform"
+                bounds = np.array(param["data"][:2], dtype=float)
+                axis["bounds"] = np.log(bounds) if axis["log"] else bounds
+            self._axes.append(axis)
+        return hyperparameter
+
+    def decode(self, X):
+        """
+        Maps points of the unit cube to parameter sets.
+
+        :param X: [ndarray] points (n, #parameters)
+
+        :return: [list] parameter dicts
+        """
+        columns = []
+        for k, axis in enumerate(self._axes):
+            param = axis["param"]
+            if axis["categorical"]:
+                index = np.minimum((X[:, k] * len(param["data"])).astype(int), len(param["data"]) - 1)
+                columns.append([param["data"][i] for i in index])
+                continue
+            lo, hi = axis["bounds"]
+            values = lo + X[:, k] * (hi - lo)
+            if axis["log"]:
+                values = np.exp(values)
+            values = np.clip(values, param["data"][0], param["data"][1])
+            if param["type"] is int:
+                columns.append([int(np.round(v)) for v in values])
+            else:
+                columns.append([float(v) for v in values])
+        return [{axis["name"]: column[n] for axis, column in zip(self._axes, columns)} for n in range(len(X))]
+
+    def evaluate(self, X):
+        """
+        Evaluates a population as one batch.
+
+        :param X: [ndarray] population (n, #parameters) on the unit cube
+
+        :return: [ndarray] losses (n, #objectives)
+        """
+        candidates = [CandidateDescriptor(**params) for params in self.decode(X)]
+        results = self.loss_function_batch(candidates)
+        losses = [np.atleast_1d(np.asarray(results[c.ID]['loss'], dtype=float)) for c in candidates]
+        m = max(len(f) for f in losses)
+        F = np.full((len(losses), m), FAILED_LOSS)
+        for n, f in enumerate(losses):
+            if len(f) == m and not np.any(np.isnan(f)):
+                F[n] = f
+        return F
+
+    def select_survivors(self, X, F, size):
+        """
+        Selects size individuals front by front, the last front that fits only partially is truncated by crowding
+        distance.
+
+        :param X: [ndarray] individuals (n, #parameters)
+        :param F: [ndarray] losses (n, #objectives)
+        :param size: [int] number of survivors
+
+        :return: [ndarray], [ndarray], [ndarray], [ndarray] individuals, losses, ranks and crowding distances
+        """
+        selected, ranks, crowding = [], [], []
+        for rank, front in enumerate(non_dominated_sort(F)):
+            distance = crowding_distance(F[front])
+            if len(selected) + len(front) > size:
+                keep = np.argsort(-distance, kind='stable')[:size - len(selected)]
+                front, distance = front[keep], distance[keep]
+            selected.extend(front)
+            ranks.extend([rank] * len(front))
+            crowding.extend(distance)
+            if len(selected) >= size:
+                break
+        selected = np.array(selected, dtype=int)
+        return X[selected], F[selected], np.array(ranks), np.array(crowding)
+
+    def make_offspring(self, X, ranks, crowding, n):
+        """
+        Creates n offspring via binary tournament selection, simulated binary crossover and polynomial mutation.
+
+        :param X: [ndarray] population (N, #parameters)
+        :param ranks: [ndarray] non-domination ranks (N,)
+        :param crowding: [ndarray] crowding distances (N,)
+        :param n: [int] number of offspring
+
+        :return: [ndarray] offspring (n, #parameters)
+        """
+        N, dims = X.shape
+        pairs = (n + 1) // 2
+        a, b = np.random.randint(N, size=(2, 2 * pairs))
+        better = (ranks[a] < ranks[b]) | ((ranks[a] == ranks[b]) & (crowding[a] > crowding[b]))
+        parents = X[np.where(better, a, b)]
+        P1, P2 = parents[:pairs], parents[pairs:]
+
+        u = np.random.uniform(size=(pairs, dims))
+        beta = np.where(u <= 0.5, (2 * u)**(1 / (self.eta_crossover + 1)),
+                        (1 / (2 * (1 - u)))**(1 / (self.eta_crossover + 1)))
+        cross = (np.random.uniform(size=(pairs, 1)) < self.crossover_prob) & \
+                (np.random.uniform(size=(pairs, dims)) < 0.5)
+        beta = np.where(cross, beta, 1.0)
+        C1 = 0.5 * ((1 + beta) * P1 + (1 - beta) * P2)
+        C2 = 0.5 * ((1 - beta) * P1 + (1 + beta) * P2)
+        categorical = np.array([axis["categorical"] for axis in self._axes])
+        C1[:, categorical] = np.where(cross, P2, P1)[:, categorical]
+        C2[:, categorical] = np.where(cross, P1, P2)[:, categorical]
+        C = np.vstack([C1, C2])[:n]
+
+        mutation_prob = self.mutation_prob if self.mutation_prob > 0 else 1.0 / dims
+        mutate = np.random.uniform(size=C.shape) < mutation_prob
+        u = np.random.uniform(size=C.shape)
+        delta = np.where(u < 0.5, (2 * u)**(1 / (self.eta_mutation + 1)) - 1,
+                         1 - (2 * (1 - u))**(1 / (self.eta_mutation + 1)))
+        C = np.where(mutate & ~categorical, C + delta, C)
+        C = np.where(mutate & categorical, np.random.uniform(size=C.shape), C)
+        return np.clip(C, 0.0, 1.0 - 1e-12)
+
+    def execute_solver(self, searchspace):
+        """
+        This function is called immediately after convert_searchspace and get the output of the latter as input. It's
+        purpose is to call the solver libs main optimization function.
+
+        :param searchspace: converted hyperparameter space
+        """
+        dims = len(self._axes)
+        # tournament selection and crossover need two parents, a budget below two is spent on random candidates
+        size = min(max(self.population_size, 2), self.max_iterations)
+        try:
+            X = np.random.uniform(size=(size, dims))
+            F = self.evaluate(X)
+            evaluated = size
+            with self._phase("model_update"):
+                X, F, ranks, crowding = self.select_survivors(X, F, size)
+            while evaluated < self.max_iterations:
+                with self._phase("candidate_generation"):
+                    Q = self.make_offspring(X, ranks, crowding, min(size, self.max_iterations - evaluated))
+                F_Q = self.evaluate(Q)
+                evaluated += len(Q)
+                if F_Q.shape[1] != F.shape[1]:
+                    m = max(F_Q.shape[1], F.shape[1])
+                    F = np.hstack([F, np.full((len(F), m - F.shape[1]), FAILED_LOSS)])
+                    F_Q = np.hstack([F_Q, np.full((len(F_Q), m - F_Q.shape[1]), FAILED_LOSS)])
+                with self._phase("model_update"):
+                    X, F, ranks, crowding = self.select_survivors(np.vstack([X, Q]), np.vstack([F, F_Q]), size)
+        except Exception as e:
+            msg = "internal error in nsga2 execute_solver occured. {}".format(e)
+            LOG.error(msg)
+            raise BrokenPipeError(msg)
+        self.best = self._trials.argmin
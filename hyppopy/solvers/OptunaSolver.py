@@ -17,8 +17,9 @@ import warnings
 import numpy as np
 from pprint import pformat
 
-from hyppopy.globals import DEBUGLEVEL
+from hyppopy.globals import DEBUGLEVEL, LazyFormat
 from hyppopy.solvers.HyppopySolver import HyppopySolver
+from hyppopy.Pruner import Pruner, PercentilePruner, MedianPruner
 
 from hyppopy.CandidateDescriptor import CandidateDescriptor
 
@@ -26,6 +27,41 @@ LOG = logging.getLogger(os.path.basename(__file__))
 LOG.setLevel(DEBUGLEVEL)
 
 
+class OptunaTrialReporter(object):
+    """
+    TrialReporter counterpart forwarding the intermediate values to an optuna trial, thus the pruner of the optuna
+    study decides.
+    """
+    def __init__(self, trial):
+        self._trial = trial
+        self._values = {}
+        self._last_step = None
+
+    def report(self, step, value):
+        self._values[step] = value
+        self._last_step = step
+        self._trial.report(value, step)
+
+    def should_prune(self):
+        return self._trial.should_prune()
+
+    def complete(self):
+        pass
+
+    def discard(self):
+        pass
+
+    @property
+    def values(self):
+        return self._values
+
+    @property
+    def last_value(self):
+        if self._last_step is None:
+            return None
+        return self._values[self._last_step]
+
+
 class OptunaSolver(HyppopySolver):
 
     def __init__(self, project=None):
@@ -36,6 +72,7 @@ class OptunaSolver(HyppopySolver):
         """
         HyppopySolver.__init__(self, project)
         self._searchspace = None
+        self._optuna_trial = None
         self.candidates_list = list()
 
     def define_interface(self):
@@ -62,7 +99,7 @@ class OptunaSolver(HyppopySolver):
         candidates_list = list()
         N = self.max_iterations
         for n in range(N):
-            print(n)
+            LOG.debug("creating candidate %d", n)
             # Todo: Ugly hack that does not even work...
             from optuna import trial as trial_module
             # temp_study = optuna.create_study()
@@ -111,7 +148,42 @@ class OptunaSolver(HyppopySolver):
             else:
                 params[name] = trial.suggest_uniform(name, param["data"][0], param["data"][1])
 
-        return self.loss_function(**params)
+        self._optuna_trial = trial
+        try:
+            loss = self.loss_function(**params)
+        finally:
+            self._optuna_trial = None
+        if self._trials.trials[-1]['result']['status'] == 'pruned':
+            raise optuna.TrialPruned()
+        return loss
+
+    def optuna_pruner(self):
+        """
+        Converts the solver pruner into the equivalent optuna pruner. If no pruner is set, optunas MedianPruner is
+        used, a custom Pruner is not converted but decides via the default reporter.
+
+        :return: [BasePruner] optuna pruner
+        """
+        pruner = self.pruner
+        if pruner is None:
+            return optuna.pruners.MedianPruner()
+        if isinstance(pruner, PercentilePruner):
+            return optuna.pruners.PercentilePruner(pruner.percentile, n_startup_trials=pruner.n_startup_trials,
+                                                   n_warmup_steps=pruner.n_warmup_steps)
+        return optuna.pruners.NopPruner()
+
+    def create_reporter(self, trial_id):
+        """
+        Creates the reporter passed to a blackbox accepting one, intermediate values are reported to the optuna trial
+        and the optuna pruner decides, unless a custom Pruner is set.
+
+        :param trial_id: [object] trial identifier
+
+        :return: [OptunaTrialReporter] reporter instance
+        """
+        if self._optuna_trial is None or (self.pruner is not None and not isinstance(self.pruner, PercentilePruner)):
+            return HyppopySolver.create_reporter(self, trial_id)
+        return OptunaTrialReporter(self._optuna_trial)
 
     def execute_solver(self, searchspace):
         """
@@ -120,11 +192,11 @@ class OptunaSolver(HyppopySolver):
 
         :param searchspace: converted hyperparameter space
         """
-        LOG.debug("execute_solver using solution space:\n\n\t{}\n".format(pformat(searchspace)))
+        LOG.debug("execute_solver using solution space:\n\n\t%s\n", LazyFormat(pformat, searchspace))
         self._searchspace = searchspace
 
         try:
-            study = optuna.create_study()
+            study = optuna.create_study(pruner=self.optuna_pruner())
             study.optimize(self.trial_cache, n_trials=self.max_iterations)
             self.best = study.best_trial.params
         except Exception as e:
@@ -141,7 +213,7 @@ class OptunaSolver(HyppopySolver):
 
         :return: [object] converted hyperparameter space
         """
-        LOG.debug("convert input parameter\n\n\t{}\n".format(pformat(hyperparameter)))
+        LOG.debug("convert input parameter\n\n\t%s\n", LazyFormat(pformat, hyperparameter))
         for name, param in hyperparameter.items():
             if param["domain"] != "categorical" and param["domain"] != "uniform":
                 msg = "Warning: Optuna cannot handle {} domain. Only uniform and categorical domains are supported!".format(param["domain"])
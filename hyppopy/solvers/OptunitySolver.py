@@ -16,7 +16,7 @@ import optunity
 from pprint import pformat
 
 from hyppopy.CandidateDescriptor import CandidateDescriptor, CandicateDescriptorWrapper
-from hyppopy.globals import DEBUGLEVEL
+from hyppopy.globals import DEBUGLEVEL, LazyFormat
 
 LOG = logging.getLogger(os.path.basename(__file__))
 LOG.setLevel(DEBUGLEVEL)
@@ -55,7 +55,7 @@ class OptunitySolver(HyppopySolver):
 
         :param searchspace: converted hyperparameter space
         """
-        LOG.debug("execute_solver using solution space:\n\n\t{}\n".format(pformat(searchspace)))
+        LOG.debug("execute_solver using solution space:\n\n\t%s\n", LazyFormat(pformat, searchspace))
         try:
             self.best, _, _ = optunity.minimize_structured(f=self.loss_function,
                                          num_evals=self.max_iterations,
@@ -92,7 +92,7 @@ class OptunitySolver(HyppopySolver):
 
         :return: [object] converted hyperparameter space
         """
-        LOG.debug("convert input parameter\n\n\t{}\n".format(pformat(hyperparameter)))
+        LOG.debug("convert input parameter\n\n\t%s\n", LazyFormat(pformat, hyperparameter))
         # split input in categorical and non-categorical data
         cat, uni = self.split_categorical(hyperparameter)
         # build up dictionary keeping all non-categorical data
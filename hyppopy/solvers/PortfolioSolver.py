@@ -0,0 +1,308 @@
+# Hyppopy - A Hyper-Parameter Optimization Toolbox
+#
+# Copyright (c) German Cancer Research Center,
+# Division of Medical Image Computing.
+# All rights reserved.
+#
+# This software is distributed WITHOUT ANY WARRANTY; without
+# even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE.
+#
+# See LICENSE
+
+__all__ = ['PortfolioBudgetExhausted', 'PortfolioSolver']
+
+import os
+import bisect
+import logging
+import datetime
+import threading
+import numpy as np
+from collections import deque
+from pprint import pformat
+from hyppopy.globals import DEBUGLEVEL, LazyFormat
+from hyppopy.HyppopyProject import HyppopyProject
+from hyppopy.solvers.HyppopySolver import HyppopySolver
+from hyppopy.CandidateDescriptor import CandidateDescriptor
+from hyppopy.ParetoFront import is_multi_objective
+
+LOG = logging.getLogger(os.path.basename(__file__))
+LOG.setLevel(DEBUGLEVEL)
+
+
+class PortfolioBudgetExhausted(BaseException):
+    """
+    Raised inside the blackbox of a portfolio member when the shared budget is spent. It derives from BaseException,
+    thus solvers catching Exception around the blackbox call don't swallow it.
+    """
+    pass
+
+
+def _cache_key(params):
+    key = []
+    for name in sorted(params.keys()):
+        value = params[name]
+        try:
+            hash(value)
+        except TypeError:
+            value = repr(value)
+        key.append((name, value))
+    return tuple(key)
+
+
+class _PortfolioMember(object):
+
+    def __init__(self, name, solver, window):
+        self.name = name
+        self.solver = solver
+        self.state = 'busy'     # busy (suggesting), waiting (for a slot), pending (for a result), running or finished
+        self.evaluations = 0
+        self.cache_hits = 0
+        self.best = np.inf
+        self.rewards = deque(maxlen=window)
+        self.thread = None
+
+
+class PortfolioSolver(HyppopySolver):
+    """
+    The PortfolioSolver class races several solvers of the SolverPool against one blackbox and a shared evaluation
+    budget of max_iterations. Each member solver runs in its own thread, its blackbox is a wrapper asking the portfolio
+    for an evaluation slot. The slots are assigned like a bandit (sliding window UCB): each member first gets warmup
+    evaluations, afterwards the member whose recent losses ranked best among all losses so far is preferred, thus the
+    remaining budget flows to the solvers improving fastest. All members share one evaluation cache, a
+    parameter set evaluated by any member is not evaluated again and does not consume budget. When the budget is spent,
+    the members are stopped by a PortfolioBudgetExhausted exception.
+
+    The solver settings are max_iterations (required), solvers (default ['randomsearch', 'hyperopt', 'optuna']),
+    max_parallel (default 1, number of concurrent evaluations), warmup (default 5), window (default 20) and exploration
+    (default 0.5, UCB exploration weight). All other project settings are passed to the members.
+    """
+    def __init__(self, project=None):
+        """
+        The constructor accepts a HyppopyProject.
+
+        :param project: [HyppopyProject] project instance, default=None
+        """
+        HyppopySolver.__init__(self, project)
+        self._members = None
+        self._cond = threading.Condition()
+        self._cache = {}
+        self._pending = set()
+        self._remaining = 0
+        self._running = 0
+        self._granted = None
+        self._losses = []
+        self._trial_solvers = []
+
+    def define_interface(self):
+        """
+        This function is called when HyppopySolver.__init__ function finished. Child classes need to define their
+        individual parameter here by calling the _add_member function for each class member variable need to be defined.
+        Using _add_hyperparameter_signature the structure of a hyperparameter the solver expects must be defined.
+        Both, members and hyperparameter signatures are later get checked, before executing the solver, ensuring
+        settings passed fullfill solver needs.
+        """
+        self._add_member("max_iterations", int)
+        self._add_member("solvers", list, default=["randomsearch", "hyperopt", "optuna"])
+        self._add_member("max_parallel", int, default=1)
+        self._add_member("warmup", int, default=5)
+        self._add_member("window", int, default=20)
+        self._add_member("exploration", (int, float), default=0.5)
+        self._add_hyperparameter_signature(name="domain", dtype=str,
+                                          options=["uniform", "normal", "loguniform", "categorical"])
+        self._add_hyperparameter_signature(name="data", dtype=list)
+        self._add_hyperparameter_signature(name="type", dtype=type)
+
+    def convert_searchspace(self, hyperparameter):
+        """
+        This function gets the unified hyppopy-like parameterspace description as input and, if necessary, should
+        convert it into a solver lib specific format. The function is invoked when run is called and what it returns
+        is passed as searchspace argument to the function execute_solver.
+
+        :param hyperparameter: [dict] nested parameter description dict e.g. {'name': {'domain':'uniform', 'data':[0,1], 'type':'float'}, ...}
+
+        :return: [object] converted hyperparameter space
+        """
+        LOG.debug("convert input parameter\n\n\t%s\n", LazyFormat(pformat, hyperparameter))
+        return hyperparameter
+
+    def _member_project(self, hyperparameter):
+        config = {name: value for name, value in self.project.settings.items()
+                  if name not in ["solver", "solvers", "max_parallel", "warmup", "window", "exploration"]}
+        config["hyperparameter"] = hyperparameter
+        # each member may use the whole budget, the portfolio stops it when the shared budget is spent
+        config["max_iterations"] = self.max_iterations
+        return HyppopyProject(config)
+
+    def _ucb(self, member, total):
+        if len(member.rewards) == 0:
+            return np.inf
+        return np.mean(member.rewards) + self.exploration * np.sqrt(2 * np.log(max(total, 1)) / member.evaluations)
+
+    def _schedule(self):
+        # called with the lock held, grants a slot once every member is waiting, running or finished
+        if self._granted is not None or self._running >= self.max_parallel:
+            return
+        if any(m.state == 'busy' for m in self._members):
+            return
+        waiting = [m for m in self._members if m.state == 'waiting']
+        if len(waiting) == 0:
+            return
+        warmup = [m for m in waiting if m.evaluations < self.warmup]
+        if len(warmup) > 0:
+            self._granted = min(warmup, key=lambda m: m.evaluations)
+        else:
+            total = sum(m.evaluations for m in self._members)
+            scores = [self._ucb(m, total) for m in waiting]
+            self._granted = waiting[int(np.argmax(scores))]
+        self._cond.notify_all()
+
+    def _acquire(self, member):
+        # called with the lock held
+        member.state = 'waiting'
+        while True:
+            if self._remaining <= 0:
+                member.state = 'busy'
+                raise PortfolioBudgetExhausted()
+            if self._granted is member:
+                self._granted = None
+                member.state = 'running'
+                self._remaining -= 1
+                self._running += 1
+                self._schedule()
+                return
+            self._schedule()
+            if self._granted is not member:
+                self._cond.wait()
+
+    def _evaluate(self, member, params):
+        key = _cache_key(params)
+        with self._cond:
+            if key in self._pending:
+                # another member is evaluating the same parameter set right now
+                member.state = 'pending'
+                self._schedule()
+                while key in self._pending:
+                    self._cond.wait()
+                member.state = 'busy'
+            if key in self._cache:
+                member.cache_hits += 1
+                return self._cache[key]
+            self._pending.add(key)
+            try:
+                self._acquire(member)
+            except PortfolioBudgetExhausted:
+                self._pending.discard(key)
+                self._cond.notify_all()
+                raise
+        result = {'book_time': datetime.datetime.now()}
+        try:
+            loss = self.call_blackbox(params)
+            if loss is None:
+                loss = np.nan
+        except Exception as e:
+            LOG.error("computing loss failed due to:\n {}".format(e))
+            loss = np.nan
+        result['refresh_time'] = datetime.datetime.now()
+        result['loss'] = loss
+        with self._cond:
+            self._cache[key] = loss
+            self._pending.discard(key)
+            trial = self._add_trial(CandidateDescriptor(**params), result)
+            self._trial_solvers.append(member.name)
+            reward = 0.0
+            if trial['result']['status'] == 'ok':
+                if is_multi_objective(trial['result']['loss']):
+                    # a vector loss is rewarded if it entered the Pareto front
+                    reward = 1.0 if trial['tid'] in self._pareto_front else 0.0
+                else:
+                    # the reward is the fraction of the previous losses beaten, 1 for a new best
+                    n = len(self._losses)
+                    reward = (n - bisect.bisect_left(self._losses, loss)) / n if n > 0 else 1.0
+                    bisect.insort(self._losses, loss)
+                    member.best = min(member.best, loss)
+            member.evaluations += 1
+            member.rewards.append(reward)
+            member.state = 'busy'
+            self._running -= 1
+            self._cond.notify_all()
+        return loss
+
+    def _run_member(self, member):
+        try:
+            member.solver.run(print_stats=False)
+        except PortfolioBudgetExhausted:
+            pass
+        except Exception as e:
+            LOG.error("portfolio member {} failed: {}".format(member.name, e))
+        finally:
+            with self._cond:
+                member.state = 'finished'
+                self._schedule()
+                self._cond.notify_all()
+
+    def execute_solver(self, searchspace):
+        """
+        This function is called immediately after convert_searchspace and get the output of the latter as input. It's
+        purpose is to call the solver libs main optimization function.
+
+        :param searchspace: converted hyperparameter space
+        """
+        # imported here as the SolverPool imports this module
+        from hyppopy.SolverPool import SolverPool
+
+        self._cache = {}
+        self._pending = set()
+        self._remaining = self.max_iterations
+        self._running = 0
+        self._granted = None
+        self._losses = []
+        self._trial_solvers = []
+        self._members = []
+        for n, name in enumerate(self.solvers):
+            solver = SolverPool.get(name, self._member_project(searchspace))
+            if name in self.solvers[:n]:
+                name = "{}_{}".format(name, self.solvers[:n].count(name))
+            member = _PortfolioMember(name, solver, self.window)
+            member.solver.blackbox = self._member_blackbox(member)
+            self._members.append(member)
+
+        for member in self._members:
+            member.thread = threading.Thread(target=self._run_member, args=(member,), daemon=True)
+            member.thread.start()
+        for member in self._members:
+            member.thread.join()
+        LOG.debug("portfolio finished: %s", LazyFormat(lambda: self.portfolio_stats))
+        if len(self._trials.trials) == 0:
+            msg = "internal error in portfolio execute_solver occured. No member evaluated the blackbox!"
+            LOG.error(msg)
+            raise BrokenPipeError(msg)
+        self.best = self._trials.argmin
+
+    def _member_blackbox(self, member):
+        def portfolio_blackbox(**params):
+            return self._evaluate(member, params)
+        return portfolio_blackbox
+
+    def get_results(self):
+        """
+        This function returns a complete optimization history as pandas DataFrame and a dict with the optimal parameter
+        set. The column solver holds the name of the member that proposed each evaluation.
+
+        :return: [DataFrame], [dict] history and optimal parameter set
+        """
+        df, best = HyppopySolver.get_results(self)
+        df['solver'] = self._trial_solvers
+        return df, best
+
+    @property
+    def portfolio_stats(self):
+        """
+        Per member statistics of the last run.
+
+        :return: [dict] {name: {'evaluations': ..., 'cache_hits': ..., 'best': ...}, ...}
+        """
+        if self._members is None:
+            return {}
+        return {m.name: {'evaluations': m.evaluations, 'cache_hits': m.cache_hits, 'best': m.best}
+                for m in self._members}
@@ -17,7 +17,7 @@ import logging
 import warnings
 import numpy as np
 from pprint import pformat
-from hyppopy.globals import DEBUGLEVEL
+from hyppopy.globals import DEBUGLEVEL, LazyFormat
 from hyppopy.solvers.HyppopySolver import HyppopySolver
 
 LOG = logging.getLogger(os.path.basename(__file__))
@@ -198,7 +198,8 @@ class QuasiRandomsearchSolver(HyppopySolver):
             self._sampler.set_axis(name, axis["data"], axis["domain"], axis["type"])
         try:
             for n in range(N):
-                params = self._sampler.next()
+                with self._phase("candidate_generation"):
+                    params = self._sampler.next()
                 if params is None:
                     break
                 self.loss_function(**params)
@@ -218,5 +219,5 @@ class QuasiRandomsearchSolver(HyppopySolver):
 
         :return: [object] converted hyperparameter space
         """
-        LOG.debug("convert input parameter\n\n\t{}\n".format(pformat(hyperparameter)))
+        LOG.debug("convert input parameter\n\n\t%s\n", LazyFormat(pformat, hyperparameter))
         return hyperparameter
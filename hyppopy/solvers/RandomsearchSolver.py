@@ -24,7 +24,7 @@ import random
 import logging
 import numpy as np
 from pprint import pformat
-from hyppopy.globals import DEBUGLEVEL
+from hyppopy.globals import DEBUGLEVEL, LazyFormat
 from hyppopy.solvers.HyppopySolver import HyppopySolver
 
 LOG = logging.getLogger(os.path.basename(__file__))
@@ -184,7 +184,8 @@ class RandomsearchSolver(HyppopySolver):
         :param searchspace: converted hyperparameter space
         """
 
-        candidates = self.get_candidates(searchspace)
+        with self._phase("candidate_generation"):
+            candidates = self.get_candidates(searchspace)
         try:
             self.loss_function_batch(candidates)
         except Exception as e:
@@ -203,5 +204,5 @@ class RandomsearchSolver(HyppopySolver):
 
         :return: [object] converted hyperparameter space
         """
-        LOG.debug("convert input parameter\n\n\t{}\n".format(pformat(hyperparameter)))
+        LOG.debug("convert input parameter\n\n\t%s\n", LazyFormat(pformat, hyperparameter))
         return hyperparameter
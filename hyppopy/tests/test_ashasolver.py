@@ -0,0 +1,131 @@
+# Hyppopy - A Hyper-Parameter Optimization Toolbox
+#
+# Copyright (c) German Cancer Research Center,
+# Division of Medical Image Computing.
+# All rights reserved.
+#
+# This software is distributed WITHOUT ANY WARRANTY; without
+# even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE.
+#
+# See LICENSE
+
+import os
+import time
+import unittest
+
+from hyppopy.SolverPool import SolverPool
+from hyppopy.HyppopyProject import HyppopyProject
+from hyppopy.LocalCommunicator import run_local
+from hyppopy.MPIBlackboxFunction import MPIBlackboxFunction
+from hyppopy.solvers.ASHASolver import ASHASolver
+from hyppopy.solvers.MPISolverWrapper import MPISolverWrapper
+
+
+CONFIG = {
+    "hyperparameter": {
+        "x": {
+            "domain": "uniform",
+            "data": [-10.0, 10.0],
+            "type": float
+        },
+        "y": {
+            "domain": "uniform",
+            "data": [-10.0, 10.0],
+            "type": float
+        }
+    },
+    "max_iterations": 60,
+    "max_budget": 9
+}
+
+
+def budget_loss(x, y, budget):
+    return x**2 + y**2 + 10.0 / budget
+
+
+def sleepy_loss(x, y, budget):
+    time.sleep(0.001 * budget)
+    return budget_loss(x, y, budget)
+
+
+def run_asha(comm):
+    solver = MPISolverWrapper(solver=SolverPool.get("asha", HyppopyProject(CONFIG)), mpi_comm=comm)
+    solver.blackbox = sleepy_loss
+    solver.run(print_stats=False)
+    return solver.get_results()
+
+
+def ping(comm):
+    if comm.Get_rank() == 0:
+        bb = MPIBlackboxFunction(blackbox_func=budget_loss, mpi_comm=comm)
+        return bb.num_workers(), bb.supports_async()
+
+
+class ASHATestSuite(unittest.TestCase):
+
+    def setUp(self):
+        pass
+
+    def check_results(self, df, best):
+        self.assertEqual(len(df), CONFIG["max_iterations"])
+        self.assertTrue(all(df['status']))
+        counts = df.groupby('budget').size()
+        self.assertEqual(list(counts.index), [1, 3, 9])
+        self.assertTrue(counts[1] > counts[3] > counts[9] > 0)
+        self.assertEqual(sorted(best.keys()), ['x', 'y'])
+        top = df[df['budget'] == 9]
+        self.assertAlmostEqual(top['losses'].min(), budget_loss(best['x'], best['y'], 9))
+
+    def test_solver(self):
+        solver = SolverPool.get("asha", HyppopyProject(CONFIG))
+        self.assertTrue(isinstance(solver, ASHASolver))
+        solver.blackbox = budget_loss
+        solver.run(print_stats=False)
+        self.check_results(*solver.get_results())
+
+    def test_first_promotion(self):
+        budgets = []
+        solver = SolverPool.get("asha", HyppopyProject(CONFIG))
+        solver.blackbox = lambda x, y, budget: budgets.append(budget) or budget_loss(x, y, budget)
+        solver.run(print_stats=False)
+        # the first promotion requires eta completed results at the lowest rung
+        self.assertEqual(budgets[:4], [1, 1, 1, 3])
+
+    def test_thread_pool(self):
+        calls = []
+
+        def straggler_loss(x, y, budget):
+            calls.append(budget)
+            if len(calls) == 1:
+                # the first candidate blocks its thread, the other threads need to go on without it
+                time.sleep(0.5)
+            return budget_loss(x, y, budget)
+
+        config = dict(CONFIG, max_parallel=3)
+        solver = SolverPool.get("asha", HyppopyProject(config))
+        solver.blackbox = straggler_loss
+        solver.run(print_stats=False)
+        df, best = solver.get_results()
+        self.check_results(df, best)
+        # the straggler finishes last, candidates were promoted meanwhile
+        self.assertEqual(df['budget'].iloc[-1], 1)
+        self.assertTrue(3 in list(df['budget'].iloc[:-1]))
+        # a candidate is promoted only after its evaluation on the lower rung completed
+        for budget, lower in [(3, 1), (9, 3)]:
+            for n in df.index[df['budget'] == budget]:
+                previous = df.loc[:n - 1]
+                previous = previous[previous['budget'] == lower]
+                row = df.loc[n]
+                self.assertTrue(((previous['x'] == row['x']) & (previous['y'] == row['y'])).any())
+
+    def test_async_workers(self):
+        df, best = run_local(run_asha, 4)
+        self.check_results(df, best)
+
+    def test_async_api(self):
+        self.assertEqual(run_local(ping, 3), (2, True))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,202 @@
+# Hyppopy - A Hyper-Parameter Optimization Toolbox
+#
+# Copyright (c) German Cancer Research Center,
+# Division of Medical Image Computing.
+# All rights reserved.
+#
+# This software is distributed WITHOUT ANY WARRANTY; without
+# even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE.
+#
+# See LICENSE
+
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from hyperopt import Trials
+
+from hyppopy.SolverPool import SolverPool
+from hyppopy.HyppopyProject import HyppopyProject
+from hyppopy.BlackboxFunction import *
+from hyppopy.CandidateDescriptor import CandidateDescriptor, CandidateBatch
+
+
+CONFIG = {
+    "hyperparameter": {
+        "x": {
+            "domain": "uniform",
+            "data": [-10.0, 10.0],
+            "type": float
+        },
+        "y": {
+            "domain": "uniform",
+            "data": [-10.0, 10.0],
+            "type": float
+        }
+    },
+    "max_iterations": 50
+}
+
+
+class BlackboxFunctionTestSuite(unittest.TestCase):
+
+    def setUp(self):
+        self.calls = 0
+
+    def test_vectorized_dict(self):
+        def loss(batch):
+            self.calls += 1
+            self.assertTrue(isinstance(batch['x'], np.ndarray))
+            return batch['x']**2 + batch['y']**2
+
+        bb = BlackboxFunction(blackbox_func=loss, vectorized=True)
+        self.assertTrue(bb.vectorized)
+        self.assertEqual(bb.batch_format, 'dict')
+        candidates = [CandidateDescriptor(x=float(i), y=1.0) for i in range(5)]
+        results = bb.call_vectorized(candidates)
+        self.assertEqual(self.calls, 1)
+        self.assertEqual([results[c.ID]['loss'] for c in candidates], [1.0, 2.0, 5.0, 10.0, 17.0])
+        for c in candidates:
+            self.assertTrue(results[c.ID]['book_time'] <= results[c.ID]['refresh_time'])
+
+    def test_vectorized_array(self):
+        def loss(data, batch):
+            self.assertEqual(batch.shape, (3, 2))
+            return batch @ data
+
+        bb = BlackboxFunction(blackbox_func=loss, data=np.array([1.0, 10.0]), vectorized=True, batch_format='array')
+        batch = CandidateBatch({'y': [1, 2, 3], 'x': [4, 5, 6]})
+        results = bb.call_vectorized(batch)
+        self.assertEqual([results[i]['loss'] for i in batch.IDs.tolist()], [14.0, 25.0, 36.0])
+
+    def test_vectorized_errors(self):
+        self.assertRaises(AssertionError, BlackboxFunction, blackbox_func=lambda b: b, batch_format='list')
+        bb = BlackboxFunction(blackbox_func=lambda batch: [1.0], vectorized=True)
+        self.assertRaises(ValueError, bb.call_vectorized, [CandidateDescriptor(x=1), CandidateDescriptor(x=2)])
+        bb = BlackboxFunction(blackbox_func=lambda batch: batch['x'] * np.nan, vectorized=True)
+        results = bb.call_vectorized([CandidateDescriptor(x=1.0)])
+        self.assertTrue(list(results.values())[0]['loss'] is np.nan)
+
+    def test_vectorized_solver(self):
+        def loss(batch):
+            self.calls += 1
+            return batch['x']**2 + batch['y']**2
+
+        solver = SolverPool.get("randomsearch", HyppopyProject(CONFIG))
+        solver.blackbox = BlackboxFunction(blackbox_func=loss, vectorized=True)
+        solver.run(print_stats=False)
+        df, best = solver.get_results()
+        self.assertEqual(len(df), CONFIG["max_iterations"])
+        self.assertTrue(all(df['status']))
+        self.assertTrue(np.allclose(df['losses'], df['x']**2 + df['y']**2))
+        self.assertTrue(self.calls < CONFIG["max_iterations"])
+
+    def test_vectorized_single_candidate_solvers(self):
+        # hyperopt and optuna evaluate one candidate at a time, they get batches of one
+        for name in ["hyperopt", "optuna"]:
+            solver = SolverPool.get(name, HyppopyProject(dict(CONFIG, max_iterations=20)))
+            solver.blackbox = BlackboxFunction(blackbox_func=lambda X: (X**2).sum(1), vectorized=True,
+                                               batch_format='array')
+            solver.run(print_stats=False)
+            df, best = solver.get_results()
+            self.assertEqual(len(df), 20)
+            self.assertTrue(all(df['status']))
+            self.assertTrue(np.allclose(df['losses'], df['x']**2 + df['y']**2))
+
+    def test_vectorized_failure(self):
+        def loss(batch):
+            raise RuntimeError("out of memory")
+        solver = SolverPool.get("randomsearch", HyppopyProject(dict(CONFIG, max_iterations=5)))
+        solver.blackbox = BlackboxFunction(blackbox_func=loss, vectorized=True)
+        solver.trials = Trials()
+        solver._idx = 0
+        results = solver.loss_function_batch([CandidateDescriptor(x=1.0, y=2.0), CandidateDescriptor(x=0.0, y=1.0)])
+        self.assertEqual(len(results), 2)
+        for trial in solver.trials.trials:
+            self.assertEqual(trial['result']['status'], 'failed')
+            self.assertTrue("out of memory" in trial['result']['error'])
+
+    def test_resolve_call_convention(self):
+        names = ('x', 'y')
+        self.assertEqual(resolve_call_convention(lambda x, y: 0, names), 'kwargs')
+        self.assertEqual(resolve_call_convention(lambda params: 0, names), 'params')
+        self.assertEqual(resolve_call_convention(lambda x: 0, ('x',)), 'kwargs')
+        self.assertEqual(resolve_call_convention(lambda **kwargs: 0, names), 'kwargs')
+        self.assertEqual(resolve_call_convention(lambda data, params: 0, names), 'data_params')
+        self.assertEqual(resolve_call_convention(lambda data, x, y: 0, names), 'data_kwargs')
+        self.assertEqual(resolve_call_convention(lambda data, **kwargs: 0, names), 'data_kwargs')
+        self.assertEqual(resolve_call_convention(lambda d, params: 0, names), 'kwargs')
+        self.assertEqual(resolve_call_convention(lambda d, params: 0, names, data_available=True), 'data_params')
+        self.assertEqual(resolve_call_convention(lambda x, y: 0, names, data_available=True), 'kwargs')
+        self.assertEqual(resolve_call_convention(BlackboxFunction(blackbox_func=lambda x: 0), names), 'kwargs')
+
+    def test_call_conventions(self):
+        params = {'x': 1.0, 'y': 2.0}
+        bb = BlackboxFunction(blackbox_func=lambda data, params: data + params['x'] * params['y'], data=10.0)
+        self.assertEqual(bb(**params), 12.0)
+        bb = BlackboxFunction(blackbox_func=lambda data, x, y: data + x + y, data=10.0)
+        self.assertEqual(bb(**params), 13.0)
+        bb = BlackboxFunction(blackbox_func=lambda x, y: x - y)
+        self.assertEqual(bb(**params), -1.0)
+        bb = BlackboxFunction(blackbox_func=lambda params: params['y'])
+        self.assertEqual(bb(**params), 2.0)
+        conventions = {}
+        self.assertEqual(call_with_params(lambda p: p['x'], params, conventions=conventions), 1.0)
+        self.assertEqual(conventions, {(('x', 'y'), ()): 'params'})
+
+    def test_no_retry_on_error(self):
+        def loss(data, params):
+            self.calls += 1
+            raise TypeError("genuine error inside the loss")
+
+        bb = BlackboxFunction(blackbox_func=loss, data=[])
+        self.assertRaises(TypeError, bb, x=1.0, y=2.0)
+        self.assertEqual(self.calls, 1)
+
+    def test_lazy_loading(self):
+        def dataloader(**kwargs):
+            self.calls += 1
+            return np.arange(kwargs['params']['size'])
+
+        bb = BlackboxFunction(blackbox_func=lambda data, params: float(data.sum()), dataloader_func=dataloader,
+                              preprocess_func=lambda data, params: data * 2, size=5, lazy=True)
+        self.assertFalse(bb.loaded)
+        self.assertEqual(self.calls, 0)
+        self.assertEqual(bb(x=1.0), 20.0)
+        self.assertTrue(bb.loaded)
+        self.assertEqual(bb(x=2.0), 20.0)
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(bb.raw_data.tolist(), [0, 1, 2, 3, 4])
+
+    def test_drop_raw_data(self):
+        bb = BlackboxFunction(blackbox_func=lambda data, params: 0, data=np.ones(3),
+                              preprocess_func=lambda data, params: data + 1, keep_raw_data=False)
+        self.assertTrue(bb.raw_data is None)
+        self.assertEqual(bb.data.tolist(), [2, 2, 2])
+        # a preprocess_func returning None keeps the raw data as data
+        bb = BlackboxFunction(blackbox_func=lambda data, params: 0, data=np.ones(3),
+                              preprocess_func=lambda data, params: None, keep_raw_data=False)
+        self.assertTrue(bb.raw_data is bb.data)
+
+    def test_memmap(self):
+        root = tempfile.mkdtemp()
+        try:
+            fname = os.path.join(root, "data.npy")
+            np.save(fname, np.arange(10.0))
+            bb = BlackboxFunction(blackbox_func=lambda data, params: float(data[params['i']]), data=fname)
+            self.assertTrue(isinstance(bb.data, np.memmap))
+            self.assertEqual(bb(i=3), 3.0)
+            bb = BlackboxFunction(blackbox_func=lambda data, params: 0, dataloader_func=lambda params: fname,
+                                  mmap_mode=None)
+            self.assertFalse(isinstance(bb.data, np.memmap))
+            self.assertEqual(bb.data.tolist(), list(range(10)))
+            self.assertEqual(load_array("not_a_file.npy"), "not_a_file.npy")
+            del bb
+        finally:
+            shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
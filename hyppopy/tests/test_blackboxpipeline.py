@@ -0,0 +1,180 @@
+# Hyppopy - A Hyper-Parameter Optimization Toolbox
+#
+# Copyright (c) German Cancer Research Center,
+# Division of Medical Image Computing.
+# All rights reserved.
+#
+# This software is distributed WITHOUT ANY WARRANTY; without
+# even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE.
+#
+# See LICENSE
+
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from unittest import mock
+from concurrent.futures import ThreadPoolExecutor
+
+from hyppopy.SolverPool import SolverPool
+from hyppopy.HyppopyProject import HyppopyProject
+from hyppopy.BlackboxFunction import BlackboxFunction
+import hyppopy.BlackboxPipeline as module
+from hyppopy.BlackboxPipeline import PipelineStage, BlackboxPipeline, _fingerprint
+
+
+def count(data, params):
+    return len(data)
+
+
+class BlackboxPipelineTestSuite(unittest.TestCase):
+
+    def setUp(self):
+        self.calls = {'scale': 0, 'shift': 0, 'model': 0}
+
+    def scale(self, data, params):
+        self.calls['scale'] += 1
+        self.assertEqual(sorted(params.keys()), ['a'])
+        return [x * params['a'] for x in data]
+
+    def shift(self, data, params):
+        self.calls['shift'] += 1
+        return [x + params['b'] for x in data]
+
+    def model(self, data, params):
+        self.calls['model'] += 1
+        return sum(data) * params['c']
+
+    def pipeline(self, **kwargs):
+        return BlackboxPipeline([PipelineStage(self.scale, depends_on=['a']),
+                                 PipelineStage(self.shift, depends_on=['b']),
+                                 PipelineStage(self.model, cache=False)], **kwargs)
+
+    def test_reuse(self):
+        pipeline = self.pipeline()
+        self.assertEqual(pipeline([1, 2], {'a': 2, 'b': 1, 'c': 1}), 8)
+        self.assertEqual(pipeline([1, 2], {'a': 2, 'b': 1, 'c': 2}), 16)
+        self.assertEqual(pipeline([1, 2], {'a': 2, 'b': 0, 'c': 1}), 6)
+        self.assertEqual(pipeline([1, 2], {'a': 3, 'b': 0, 'c': 1}), 9)
+        self.assertEqual(self.calls, {'scale': 2, 'shift': 3, 'model': 4})
+        info = pipeline.cache_info()
+        # a hit of the shift stage skips the scale stage lookup
+        self.assertEqual(info['hits'], 2)
+        self.assertEqual(info['misses'], 5)
+
+    def test_lru_eviction(self):
+        pipeline = BlackboxPipeline([PipelineStage(self.scale, depends_on=['a']),
+                                     PipelineStage(self.model, cache=False)], cache_size=2)
+        for a in [1, 2, 1, 3, 1, 2]:
+            pipeline([1], {'a': a, 'c': 1})
+        # a=2 is evicted by a=3 as a=1 was used more recently, a=2 needs to be recomputed
+        self.assertEqual(self.calls['scale'], 4)
+        self.assertEqual(pipeline.cache_info()['size'], 2)
+        pipeline.clear_cache()
+        self.assertEqual(pipeline.cache_info()['size'], 0)
+
+    def test_disk_cache(self):
+        root = tempfile.mkdtemp()
+        try:
+            self.assertEqual(self.pipeline(cache_dir=root)([1, 2], {'a': 2, 'b': 1, 'c': 1}), 8)
+            pipeline = self.pipeline(cache_dir=root)
+            self.assertEqual(pipeline([1, 2], {'a': 2, 'b': 1, 'c': 3}), 24)
+            self.assertEqual(self.calls, {'scale': 1, 'shift': 1, 'model': 2})
+            # only the last cached stage needs to be read from disk
+            self.assertEqual(pipeline.cache_info()['disk_hits'], 1)
+        finally:
+            shutil.rmtree(root, ignore_errors=True)
+
+    def test_data_and_stage_changes(self):
+        root = tempfile.mkdtemp()
+        try:
+            self.assertEqual(self.pipeline(cache_dir=root)([1, 2], {'a': 2, 'b': 1, 'c': 1}), 8)
+            # other data misses in memory and on disk
+            pipeline = self.pipeline(cache_dir=root)
+            self.assertEqual(pipeline([1, 3], {'a': 2, 'b': 1, 'c': 1}), 10)
+            self.assertEqual(pipeline.cache_info()['disk_hits'], 0)
+            self.assertEqual(self.calls, {'scale': 2, 'shift': 2, 'model': 2})
+
+            # a changed stage function with the same name misses, the downstream stages too
+            def scale(data, params):
+                return [x * params['a'] * 10 for x in data]
+            pipeline = BlackboxPipeline([PipelineStage(scale, depends_on=['a'], name='scale'),
+                                         PipelineStage(self.shift, depends_on=['b']),
+                                         PipelineStage(self.model, cache=False)], cache_dir=root)
+            self.assertEqual(pipeline([1, 2], {'a': 2, 'b': 1, 'c': 1}), 62)
+            self.assertEqual(pipeline.cache_info()['disk_hits'], 0)
+
+            # an explicit version and data key
+            pipeline = self.pipeline(cache_dir=root, data_key="dataset")
+            pipeline([1, 2], {'a': 2, 'b': 1, 'c': 1})
+            pipeline([4, 5], {'a': 2, 'b': 1, 'c': 1})
+            self.assertEqual(pipeline.cache_info()['hits'], 1)
+            self.assertNotEqual(PipelineStage(self.scale, version=1).version, PipelineStage(self.scale).version)
+            self.assertEqual(PipelineStage(self.scale).version, PipelineStage(self.scale).version)
+        finally:
+            shutil.rmtree(root, ignore_errors=True)
+
+    def test_array_fingerprint(self):
+        root = tempfile.mkdtemp()
+        try:
+            fname = os.path.join(root, "data.npy")
+            np.save(fname, np.arange(1000.0).reshape(100, 10))
+            mapped = np.load(fname, mmap_mode='r')
+            key = _fingerprint(mapped)
+            self.assertEqual(key, _fingerprint(np.load(fname, mmap_mode='r')))
+            self.assertNotEqual(key, _fingerprint(mapped[10:]))
+            self.assertEqual(_fingerprint(mapped[10:]), _fingerprint(np.load(fname, mmap_mode='r')[10:]))
+            # the mapped pages are not read, an array with the same content has another key
+            with mock.patch.object(pickle, "dumps") as dumps:
+                _fingerprint(mapped)
+            self.assertEqual(dumps.call_count, 0)
+            os.utime(fname, ns=(0, 0))
+            self.assertNotEqual(key, _fingerprint(mapped))
+
+            # in memory arrays are hashed in chunks, independent of the chunk size and memory layout
+            data = np.random.uniform(size=(100, 10))
+            key = _fingerprint(data)
+            with mock.patch.object(module, "_CHUNK_BYTES", 100):
+                self.assertEqual(_fingerprint(data), key)
+                self.assertEqual(_fingerprint(np.asfortranarray(data)), key)
+            self.assertNotEqual(_fingerprint(data.T), key)
+            self.assertNotEqual(_fingerprint(data[:50]), key)
+        finally:
+            shutil.rmtree(root, ignore_errors=True)
+
+    def test_threads(self):
+        pipeline = BlackboxPipeline([PipelineStage(lambda data, params: [x * params['a'] for x in data],
+                                                   depends_on=['a'], name='scale'),
+                                     PipelineStage(lambda data, params: sum(data) + params['b'], depends_on=['b'],
+                                                   name='shift')], cache_size=2)
+        params = [{'a': n % 5, 'b': n % 3} for n in range(2000)]
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(lambda p: pipeline([1, 2], p), params))
+        self.assertEqual(results, [3 * p['a'] + p['b'] for p in params])
+        info = pipeline.cache_info()
+        self.assertEqual(info['size'], 2)
+        self.assertTrue(info['misses'] >= 15)
+        # the lock is not pickled but recreated
+        self.assertEqual(pickle.loads(pickle.dumps(BlackboxPipeline([count])))([1, 2], {}), 2)
+
+    def test_solver(self):
+        config = {"hyperparameter": {"a": {"domain": "categorical", "data": [1, 2], "type": int},
+                                     "b": {"domain": "categorical", "data": [0, 1], "type": int},
+                                     "c": {"domain": "uniform", "data": [0, 1], "type": float}},
+                  "max_iterations": 40}
+        solver = SolverPool.get("randomsearch", HyppopyProject(config))
+        solver.blackbox = BlackboxFunction(blackbox_func=self.pipeline(), data=[1, 2, 3])
+        solver.run(print_stats=False)
+        df, best = solver.get_results()
+        self.assertEqual(len(df), 40)
+        self.assertTrue(all(df['status']))
+        self.assertTrue(self.calls['scale'] <= 2)
+        self.assertTrue(self.calls['shift'] <= 4)
+        self.assertEqual(self.calls['model'], 40)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,146 @@
+# Hyppopy - A Hyper-Parameter Optimization Toolbox
+#
+# Copyright (c) German Cancer Research Center,
+# Division of Medical Image Computing.
+# All rights reserved.
+#
+# This software is distributed WITHOUT ANY WARRANTY; without
+# even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE.
+#
+# See LICENSE
+
+import copy
+import pickle
+import unittest
+import numpy as np
+from hyperopt import Trials
+
+from hyppopy.HyppopyProject import HyppopyProject
+from hyppopy.SolverPool import SolverPool
+from hyppopy.CandidateDescriptor import CandidateDescriptor, CandidateBatch
+
+
+class CandidateDescriptorTestSuite(unittest.TestCase):
+
+    def setUp(self):
+        pass
+
+    def test_ids(self):
+        candidates = [CandidateDescriptor(x=1, y=2) for _ in range(100)]
+        ids = [c.ID for c in candidates]
+        self.assertEqual(len(set(ids)), 100)
+        self.assertEqual(ids, sorted(ids))
+        self.assertTrue(all(isinstance(i, int) for i in ids))
+
+    def test_slots(self):
+        candidate = CandidateDescriptor(x=1)
+        self.assertFalse(hasattr(candidate, '__dict__'))
+        self.assertRaises(AttributeError, setattr, candidate, 'foo', 1)
+
+    def test_equality_and_hash(self):
+        a = CandidateDescriptor(x=1, y="linear")
+        b = CandidateDescriptor(y="linear", x=1.0)
+        c = CandidateDescriptor(x=2, y="linear")
+        self.assertEqual(a, b)
+        self.assertNotEqual(a, c)
+        self.assertNotEqual(a.ID, b.ID)
+        self.assertEqual(hash(a), hash(b))
+        self.assertEqual(len({a, b, c}), 2)
+        self.assertEqual(a.key(), (('x', 1), ('y', 'linear')))
+
+    def test_unhashable_values(self):
+        a = CandidateDescriptor(x=[1, 2])
+        self.assertEqual(a.key(), (('x', '[1, 2]'),))
+        self.assertEqual(hash(a), hash(CandidateDescriptor(x=[1, 2])))
+
+    def test_copy_and_pickle(self):
+        a = CandidateDescriptor(x=1, y=2)
+        for b in [pickle.loads(pickle.dumps(a)), copy.deepcopy(a)]:
+            self.assertEqual(a, b)
+            self.assertEqual(a.ID, b.ID)
+            self.assertEqual(b.get_values(), {'x': 1, 'y': 2})
+
+    def test_mapping_interface(self):
+        a = CandidateDescriptor(x=1, y=2)
+        self.assertEqual(len(a), 2)
+        self.assertTrue('x' in a)
+        self.assertEqual(sorted(a.keys()), ['x', 'y'])
+        self.assertEqual(a['y'], 2)
+        self.assertRaises(KeyError, a.__getitem__, 'z')
+        self.assertEqual(dict(**a), {'x': 1, 'y': 2})
+
+
+class CandidateBatchTestSuite(unittest.TestCase):
+
+    def setUp(self):
+        self.dicts = [{'x': float(i), 'kernel': k} for i, k in zip(range(6), ['rbf', 'linear'] * 3)]
+
+    def test_columns(self):
+        batch = CandidateBatch.from_dicts(self.dicts)
+        self.assertEqual(len(batch), 6)
+        self.assertEqual(sorted(batch.keys()), ['kernel', 'x'])
+        self.assertTrue(isinstance(batch.column('x'), np.ndarray))
+        self.assertEqual(batch['x'].get(), [0.0, 1.0, 2.0, 3.0, 4.0, 5.0])
+        self.assertTrue(batch['x'] < 6)
+        self.assertFalse(batch['x'] < 5)
+        self.assertTrue(batch['x'] > -1)
+        self.assertFalse(batch['x'] > 0)
+        self.assertTrue(batch['x'] >= 0)
+        self.assertRaises(KeyError, batch.__getitem__, 'y')
+
+    def test_rows(self):
+        batch = CandidateBatch.from_dicts(self.dicts)
+        rows = list(batch)
+        self.assertEqual(len(set(row.ID for row in rows)), 6)
+        self.assertEqual([row.ID for row in rows], batch.IDs.tolist())
+        for row, d in zip(rows, self.dicts):
+            self.assertEqual(row.get_values(), d)
+            self.assertTrue(type(row['x']) is float)
+            self.assertTrue(type(row['kernel']) is str)
+        self.assertEqual(batch[2].ID, rows[2].ID)
+
+    def test_slicing(self):
+        batch = CandidateBatch.from_dicts(self.dicts)
+        part = batch[2:4]
+        self.assertTrue(isinstance(part, CandidateBatch))
+        self.assertEqual(len(part), 2)
+        self.assertEqual(part.IDs.tolist(), batch.IDs[2:4].tolist())
+        self.assertEqual(part['x'].get(), [2.0, 3.0])
+
+    def test_from_candidates(self):
+        candidates = [CandidateDescriptor(**d) for d in self.dicts]
+        batch = CandidateBatch.from_candidates(candidates)
+        self.assertEqual([c.ID for c in candidates], [c.ID for c in batch])
+        self.assertEqual(candidates, list(batch))
+        self.assertEqual(len(CandidateBatch.from_candidates([])), 0)
+
+    def test_object_columns(self):
+        batch = CandidateBatch({'x': [[1, 2], [3, 4]]})
+        self.assertEqual(batch.column('x').dtype, object)
+        self.assertEqual(batch[1]['x'], [3, 4])
+
+    def test_mixed_columns(self):
+        batch = CandidateBatch({'x': ['a', 1, None, 2.5], 'y': [1, 2, 3, 4]})
+        self.assertEqual(batch.column('x').dtype, object)
+        self.assertEqual([c['x'] for c in batch], ['a', 1, None, 2.5])
+        self.assertEqual(type(batch[1]['x']), int)
+        self.assertEqual(batch.column('y').dtype.kind, 'i')
+
+    def test_loss_function_batch(self):
+        config = {"hyperparameter": {"x": {"domain": "uniform", "data": [0, 10], "type": float},
+                                     "kernel": {"domain": "categorical", "data": ["rbf", "linear"], "type": str}},
+                  "max_iterations": 6}
+        solver = SolverPool.get("randomsearch", HyppopyProject(config))
+        solver.blackbox = lambda x, kernel: x * 2 if kernel == 'rbf' else x
+        solver.trials = Trials()
+        solver._idx = 0
+        batch = CandidateBatch.from_dicts(self.dicts)
+        results = solver.loss_function_batch(batch)
+        self.assertEqual(sorted(results.keys()), sorted(batch.IDs.tolist()))
+        self.assertEqual([results[i]['loss'] for i in batch.IDs], [0.0, 1.0, 4.0, 3.0, 8.0, 5.0])
+        self.assertEqual(len(solver.trials.trials), 6)
+
+
+if __name__ == '__main__':
+    unittest.main()
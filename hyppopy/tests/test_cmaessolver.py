@@ -0,0 +1,119 @@
+# Hyppopy - A Hyper-Parameter Optimization Toolbox
+#
+# Copyright (c) German Cancer Research Center,
+# Division of Medical Image Computing.
+# All rights reserved.
+#
+# This software is distributed WITHOUT ANY WARRANTY; without
+# even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE.
+#
+# See LICENSE
+
+import unittest
+import numpy as np
+
+from hyppopy.SolverPool import SolverPool
+from hyppopy.HyppopyProject import HyppopyProject
+from hyppopy.LocalCommunicator import run_local
+from hyppopy.solvers.MPISolverWrapper import MPISolverWrapper
+from hyppopy.solvers.CMAESSolver import *
+
+
+def make_config(dims, max_iterations):
+    hyperparameter = {}
+    for d in range(dims):
+        hyperparameter["x{:02d}".format(d)] = {"domain": "uniform", "data": [-5.0, 5.0], "type": float}
+    return {"hyperparameter": hyperparameter, "max_iterations": max_iterations}
+
+
+def sphere(**params):
+    return float(sum((v - 1.0)**2 for v in params.values()))
+
+
+def run_mpi(comm):
+    solver = MPISolverWrapper(solver=SolverPool.get("cmaes", HyppopyProject(make_config(5, 100))), mpi_comm=comm)
+    solver.blackbox = sphere
+    solver.run(print_stats=False)
+    return solver.get_results()
+
+
+class CMAESTestSuite(unittest.TestCase):
+
+    def setUp(self):
+        np.random.seed(1)
+
+    def test_strategy(self):
+        strategy = CMAES(np.full(10, 0.5), sigma=0.3)
+        self.assertEqual(strategy.popsize, 10)
+        for _ in range(150):
+            X = strategy.ask()
+            self.assertEqual(X.shape, (10, 10))
+            self.assertTrue(np.all((X >= 0.0) & (X <= 1.0)))
+            strategy.tell(np.sum((X - 0.2)**2, axis=1))
+        self.assertTrue(np.allclose(strategy.mean, 0.2, atol=1e-3))
+
+    def test_eigen_cadence(self):
+        gaps = []
+        for dims, popsize in [(2, None), (400, None), (400, 400)]:
+            strategy = CMAES(np.full(dims, 0.5), sigma=0.3, popsize=popsize)
+            updates = []
+            for _ in range(40):
+                X = strategy.ask()
+                strategy.tell(np.sum((X - 0.2)**2, axis=1))
+                if strategy._eigen_generation == strategy.generation:
+                    updates.append(strategy.generation)
+            # Hansen: the decomposition is updated after 1 / (c1 + cmu) / dims / 10 generations, independent of popsize
+            gap = int(np.floor(1.0 / (strategy.c1 + strategy.cmu) / dims / 10)) + 1
+            self.assertEqual(updates, list(range(gap, 41, gap)))
+            gaps.append(gap)
+        # a large population learns faster, thus needs more frequent updates
+        self.assertEqual(gaps[0], 1)
+        self.assertTrue(gaps[1] > gaps[2] >= 1)
+
+    def test_solver(self):
+        solver = SolverPool.get("cmaes", HyppopyProject(make_config(20, 1500)))
+        self.assertTrue(isinstance(solver, CMAESSolver))
+        batches = []
+        loss_function_batch = solver.loss_function_batch
+
+        def record(candidates):
+            batches.append(len(candidates))
+            return loss_function_batch(candidates)
+        solver.loss_function_batch = record
+        solver.blackbox = sphere
+        solver.run(print_stats=False)
+        df, best = solver.get_results()
+        self.assertEqual(len(df), 1500)
+        # one batch per generation, popsize 4 + 3 ln(20) = 12
+        self.assertTrue(all(n == 12 for n in batches[:-1]))
+        self.assertEqual(sum(batches), 1500)
+        self.assertTrue(sphere(**best) < 0.5)
+
+    def test_small_budget(self):
+        solver = SolverPool.get("cmaes", HyppopyProject(make_config(5, 1)))
+        solver.blackbox = sphere
+        solver.run(print_stats=False)
+        self.assertEqual(len(solver.get_results()[0]), 1)
+
+    def test_int_and_loguniform(self):
+        config = {"hyperparameter": {"lr": {"domain": "loguniform", "data": [1e-5, 1.0], "type": float},
+                                     "n": {"domain": "uniform", "data": [1, 20], "type": int}},
+                  "max_iterations": 120, "popsize": 8}
+        solver = SolverPool.get("cmaes", HyppopyProject(config))
+        solver.blackbox = lambda lr, n: (np.log10(lr) + 3.0)**2 + (n - 12)**2
+        solver.run(print_stats=False)
+        df, best = solver.get_results()
+        self.assertEqual(len(df), 120)
+        self.assertTrue(all(isinstance(n, (int, np.integer)) and 1 <= n <= 20 for n in df['n']))
+        self.assertTrue(all(1e-5 <= lr <= 1.0 for lr in df['lr']))
+        self.assertEqual(best['n'], 12)
+
+    def test_mpi(self):
+        df, best = run_local(run_mpi, 4)
+        self.assertEqual(len(df), 100)
+        self.assertTrue(all(df['status']))
+
+
+if __name__ == '__main__':
+    unittest.main()
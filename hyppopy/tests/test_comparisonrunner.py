@@ -0,0 +1,72 @@
+# Hyppopy - A Hyper-Parameter Optimization Toolbox
+#
+# Copyright (c) German Cancer Research Center,
+# Division of Medical Image Computing.
+# All rights reserved.
+#
+# This software is distributed WITHOUT ANY WARRANTY; without
+# even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE.
+#
+# See LICENSE
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from hyppopy.benchmark import ComparisonRunner as module
+from hyppopy.benchmark.ComparisonRunner import ComparisonRunner, load_records, summarize
+
+
+class ComparisonRunnerTestSuite(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.output = os.path.join(self.root, "results", "comparison.jsonl")
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_parallel_run(self):
+        runner = ComparisonRunner(self.output, ["randomsearch", "foo"], ["5D"], [10, 20], repeats=3, processes=2)
+        records = runner.run()
+        self.assertEqual(len(records), 12)
+        self.assertEqual(len(load_records(self.output)), 12)
+        self.assertEqual(runner.pending(), [])
+        self.assertTrue(all("error" in r for r in records if r["solver"] == "foo"))
+
+        summary = summarize(records)
+        self.assertEqual(summary["randomsearch"]["5D"][20]["repeats"], 3)
+        self.assertEqual(summary["foo"]["5D"][20]["errors"], 3)
+        self.assertEqual(sorted(summary["randomsearch"]["5D"][10]["best"]),
+                         ["axis_00", "axis_01", "axis_02", "axis_03", "axis_04"])
+
+        # the records are reproducible via the per repeat seeds, independent of the worker process
+        serial = ComparisonRunner(os.path.join(self.root, "serial.jsonl"), ["randomsearch"], ["5D"], [10, 20],
+                                  repeats=3, processes=1).run()
+        parallel = dict((module._key(r), r["losses"]) for r in records if "error" not in r)
+        for record in serial:
+            self.assertEqual(record["losses"], parallel[module._key(record)])
+
+    def test_resume(self):
+        runner = ComparisonRunner(self.output, ["randomsearch"], ["5D"], [10], repeats=4, processes=1)
+        runner.run()
+        with open(self.output) as f:
+            lines = f.readlines()
+        # simulate an interruption during the third write
+        with open(self.output, "w") as f:
+            f.writelines(lines[:2])
+            f.write(lines[2][:20])
+        self.assertEqual([task["repeat"] for task in runner.pending()], [2, 3])
+
+        with mock.patch.object(module, "run_task", wraps=module.run_task) as run_task:
+            records = runner.run()
+        self.assertEqual(run_task.call_count, 2)
+        self.assertEqual(sorted(r["repeat"] for r in records), [0, 1, 2, 3])
+        self.assertEqual(len(load_records(self.output)), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
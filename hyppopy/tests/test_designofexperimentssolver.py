@@ -0,0 +1,122 @@
+# Hyppopy - A Hyper-Parameter Optimization Toolbox
+#
+# Copyright (c) German Cancer Research Center,
+# Division of Medical Image Computing.
+# All rights reserved.
+#
+# This software is distributed WITHOUT ANY WARRANTY; without
+# even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE.
+#
+# See LICENSE
+
+import itertools
+import unittest
+import numpy as np
+from scipy.spatial.distance import pdist
+
+from hyppopy.SolverPool import SolverPool
+from hyppopy.HyppopyProject import HyppopyProject
+from hyppopy.solvers.DesignOfExperimentsSolver import *
+
+
+CONFIG = {
+    "hyperparameter": {
+        "x": {"domain": "uniform", "data": [-10.0, 10.0], "type": float},
+        "lr": {"domain": "loguniform", "data": [1e-4, 1.0], "type": float},
+        "n": {"domain": "uniform", "data": [0, 9], "type": int},
+        "act": {"domain": "categorical", "data": ["relu", "tanh", "sigmoid"], "type": str}
+    },
+    "max_iterations": 60
+}
+
+
+def loss(x, lr, n, act):
+    return x**2 + (np.log10(lr) + 2)**2 + n + (0 if act == "tanh" else 1)
+
+
+class DesignOfExperimentsTestSuite(unittest.TestCase):
+
+    def setUp(self):
+        np.random.seed(3)
+
+    def test_latin_hypercube(self):
+        designs = latin_hypercube(50, 4, designs=3)
+        self.assertEqual(designs.shape, (3, 50, 4))
+        for design in designs:
+            for k in range(4):
+                self.assertEqual(sorted((design[:, k] * 50).astype(int)), list(range(50)))
+
+    def test_maximin(self):
+        random_design = latin_hypercube(40, 3)[0]
+        design = maximin_latin_hypercube(40, 3, designs=50, swaps=500)
+        for k in range(3):
+            self.assertEqual(sorted((design[:, k] * 40).astype(int)), list(range(40)))
+        self.assertTrue(np.min(pdist(design)) > np.min(pdist(random_design)))
+
+    def test_maximin_swaps(self):
+        # same seed, the swaps start from the selected design and only accept growing minimal distances
+        np.random.seed(5)
+        selected = maximin_latin_hypercube(60, 4, designs=10)
+        np.random.seed(5)
+        design = maximin_latin_hypercube(60, 4, designs=10, swaps=2000)
+        self.assertTrue(np.min(pdist(design)) > np.min(pdist(selected)))
+        for k in range(4):
+            self.assertEqual(sorted((design[:, k] * 60).astype(int)), list(range(60)))
+
+    def test_maximin_limit(self):
+        design = maximin_latin_hypercube(50, 2, designs=10, swaps=100, max_points=20)
+        self.assertEqual(design.shape, (50, 2))
+        for k in range(2):
+            self.assertEqual(sorted((design[:, k] * 50).astype(int)), list(range(50)))
+
+    def test_orthogonal_array(self):
+        A = orthogonal_array(5, 6)
+        self.assertEqual(A.shape, (25, 6))
+        for a, b in itertools.combinations(range(6), 2):
+            self.assertEqual(len(set(zip(A[:, a], A[:, b]))), 25)
+        U, A = orthogonal_array_latin_hypercube(5, 4)
+        self.assertTrue(np.all((U * 5).astype(int) == A))
+        for k in range(4):
+            self.assertEqual(sorted((U[:, k] * 25).astype(int)), list(range(25)))
+
+    def test_lhs_solver(self):
+        solver = SolverPool.get("designofexperiments", HyppopyProject(CONFIG))
+        self.assertTrue(isinstance(solver, DesignOfExperimentsSolver))
+        batches = []
+        loss_function_batch = solver.loss_function_batch
+        solver.loss_function_batch = lambda candidates: batches.append(len(candidates)) or \
+            loss_function_batch(candidates)
+        solver.blackbox = loss
+        solver.run(print_stats=False)
+        df, best = solver.get_results()
+        self.assertEqual(batches, [60])
+        self.assertEqual(len(df), 60)
+        self.assertEqual(sorted(df['act'].value_counts().tolist()), [20, 20, 20])
+        self.assertEqual(sorted(df['n'].value_counts().tolist()), [6] * 10)
+        self.assertTrue(all(1e-4 <= lr <= 1.0 for lr in df['lr']))
+        self.assertEqual(len(np.unique((np.log(df['lr']) - np.log(1e-4)) / -np.log(1e-4) * 60 // 1)), 60)
+
+    def test_orthogonal_solver(self):
+        config = dict(CONFIG)
+        config["design"] = "orthogonal"
+        config["max_iterations"] = 50
+        solver = SolverPool.get("designofexperiments", HyppopyProject(config))
+        self.assertEqual(solver.orthogonal_levels(config["hyperparameter"]), 7)
+        solver.blackbox = loss
+        solver.run(print_stats=False)
+        df, best = solver.get_results()
+        self.assertEqual(len(df), 50)
+        # each pair of act and x blocks occurs in the first 49 runs
+        first = df.iloc[:49]
+        blocks = ((first['x'] + 10.0) / 20.0 * 7).astype(int)
+        self.assertEqual(len(set(zip(first['act'], blocks))), 21)
+
+    def test_invalid_design(self):
+        config = dict(CONFIG)
+        config["design"] = "sobol"
+        self.assertRaises(LookupError, SolverPool.get, "designofexperiments", HyppopyProject(config))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,170 @@
+# Hyppopy - A Hyper-Parameter Optimization Toolbox
+#
+# Copyright (c) German Cancer Research Center,
+# Division of Medical Image Computing.
+# All rights reserved.
+#
+# This software is distributed WITHOUT ANY WARRANTY; without
+# even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE.
+#
+# See LICENSE
+
+import datetime
+import unittest
+import numpy as np
+
+from hyppopy.SolverPool import SolverPool
+from hyppopy.HyppopyProject import HyppopyProject
+from hyppopy.LocalCommunicator import LocalCommunicator, run_local
+from hyppopy.MPIBlackboxFunction import MPIBlackboxFunction
+from hyppopy.solvers.MPISolverWrapper import MPISolverWrapper
+from hyppopy.solvers.GaussianProcessSolver import *
+
+
+CONFIG = {
+    "hyperparameter": {
+        "x": {
+            "domain": "uniform",
+            "data": [-10.0, 10.0],
+            "type": float
+        },
+        "y": {
+            "domain": "uniform",
+            "data": [-10.0, 10.0],
+            "type": float
+        }
+    },
+    "max_iterations": 30
+}
+
+
+def quadratic(x, y):
+    return (x - 2.0)**2 + (y + 1.0)**2
+
+
+def run_batch(comm):
+    config = dict(CONFIG)
+    config["max_iterations"] = 20
+    solver = MPISolverWrapper(solver=SolverPool.get("gaussianprocess", HyppopyProject(config)), mpi_comm=comm)
+    solver.blackbox = quadratic
+    solver.run(print_stats=False)
+    return solver.get_results()
+
+
+class GaussianProcessTestSuite(unittest.TestCase):
+
+    def setUp(self):
+        np.random.seed(42)
+
+    def test_incremental_cholesky(self):
+        X = np.random.uniform(size=(30, 3))
+        y = np.sin(X @ np.array([3.0, -2.0, 1.0]))
+        gp = GaussianProcess(length_scale=0.3)
+        gp.add(X[:10], y[:10])
+        gp.add(X[10:11], y[10:11])
+        gp.add(X[11:], y[11:])
+        full = GaussianProcess(length_scale=0.3)
+        full.add(X, y)
+        self.assertTrue(np.allclose(gp._L, full._L))
+        Xs = np.random.uniform(size=(5, 3))
+        mu, sigma = gp.predict(Xs)
+        mu_full, sigma_full = full.predict(Xs)
+        self.assertTrue(np.allclose(mu, mu_full))
+        self.assertTrue(np.allclose(sigma, sigma_full))
+        # the model interpolates its observations
+        mu, sigma = gp.predict(X)
+        self.assertTrue(np.allclose(mu * gp._y_std + gp._y_mean, y, atol=1e-3))
+        self.assertTrue(np.all(sigma < 1e-2))
+        self.assertTrue(np.array_equal(gp.X, X))
+        self.assertTrue(np.array_equal(gp.y, y))
+        self.assertEqual(GaussianProcess().X, None)
+
+    def test_mean_gradient(self):
+        X = np.random.uniform(size=(15, 2))
+        gp = GaussianProcess()
+        gp.add(X, np.sum(X**2, axis=1))
+        Xs = np.random.uniform(size=(4, 2))
+        eps = 1e-6
+        numeric = np.stack([(gp.predict(Xs + eps * e)[0] - gp.predict(Xs - eps * e)[0]) / (2 * eps)
+                            for e in np.eye(2)], axis=1)
+        self.assertTrue(np.allclose(gp.mean_gradient(Xs), numeric, atol=1e-4))
+
+    def test_expected_improvement(self):
+        ei = expected_improvement(np.array([0.0, 1.0, 1.0]), np.array([1.0, 1.0, 0.1]), 0.5)
+        self.assertTrue(ei[0] > ei[1] > ei[2] > 0)
+
+    def test_solver(self):
+        solver = SolverPool.get("gaussianprocess", HyppopyProject(CONFIG))
+        self.assertTrue(isinstance(solver, GaussianProcessSolver))
+        solver.blackbox = quadratic
+        solver.run(print_stats=False)
+        df, best = solver.get_results()
+        self.assertEqual(len(df), 30)
+        self.assertTrue(all(df['status']))
+        self.assertTrue(quadratic(**best) < 1.0)
+
+    def test_mixed_space(self):
+        config = {
+            "hyperparameter": {
+                "lr": {"domain": "loguniform", "data": [1e-4, 1.0], "type": float},
+                "n": {"domain": "uniform", "data": [1, 10], "type": int},
+                "act": {"domain": "categorical", "data": ["relu", "tanh", "sigmoid"], "type": str}
+            },
+            "max_iterations": 20,
+            "batch_size": 4
+        }
+
+        def loss(lr, n, act):
+            return (np.log10(lr) + 2.0)**2 + (n - 7)**2 + (0.0 if act == "tanh" else 1.0)
+
+        solver = SolverPool.get("gaussianprocess", HyppopyProject(config))
+        solver.blackbox = loss
+        solver.run(print_stats=False)
+        df, best = solver.get_results()
+        self.assertEqual(len(df), 20)
+        self.assertTrue(all(isinstance(n, (int, np.integer)) for n in df['n']))
+        self.assertTrue(set(df['act']).issubset({"relu", "tanh", "sigmoid"}))
+        self.assertTrue(all(1e-4 <= lr <= 1.0 for lr in df['lr']))
+        params = [{'lr': 0.01, 'n': 7, 'act': 'tanh'}, {'lr': 1.0, 'n': 1, 'act': 'relu'}]
+        decoded = solver.decode(solver.encode(params))
+        self.assertEqual([(p['n'], p['act']) for p in decoded], [(7, 'tanh'), (1, 'relu')])
+        self.assertTrue(np.allclose([p['lr'] for p in decoded], [0.01, 1.0]))
+
+    def test_batch_proposals_differ(self):
+        solver = SolverPool.get("gaussianprocess", HyppopyProject(CONFIG))
+        solver.blackbox = quadratic
+        solver.convert_searchspace(solver.project.hyperparameter)
+        solver._gp = GaussianProcess()
+        X = np.random.uniform(size=(8, 2))
+        solver._gp.add(X, [quadratic(**p) for p in solver.decode(X)])
+        batch = solver.encode(solver.propose(4))
+        distances = np.linalg.norm(batch[:, None, :] - batch[None, :, :], axis=2)
+        self.assertTrue(np.all(distances[np.triu_indices(4, 1)] > 1e-3))
+
+    def test_hierarchical_batch_size(self):
+        # two sub-masters serving 3 and 2 workers, a batch needs to occupy all 5 workers
+        blackbox = MPIBlackboxFunction(blackbox_func=quadratic, mpi_comm=LocalCommunicator(0, [None] * 3),
+                                       block_weights=[3, 2])
+        self.assertEqual(blackbox.num_workers(), 5)
+        sizes = []
+
+        def call_batch(candidates):
+            sizes.append(len(candidates))
+            now = datetime.datetime.now()
+            return {c.ID: {'loss': quadratic(**c.get_values()), 'book_time': now, 'refresh_time': now}
+                    for c in candidates}
+        blackbox.call_batch = call_batch
+        solver = SolverPool.get("gaussianprocess", HyppopyProject(dict(CONFIG, max_iterations=20)))
+        solver.blackbox = blackbox
+        solver.run(print_stats=False)
+        self.assertEqual(sizes, [5, 5, 5, 5])
+
+    def test_mpi_batch(self):
+        df, best = run_local(run_batch, 4)
+        self.assertEqual(len(df), 20)
+        self.assertTrue(all(df['status']))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+# Hyppopy - A Hyper-Parameter Optimization Toolbox
+#
+# Copyright (c) German Cancer Research Center,
+# Division of Medical Image Computing.
+# All rights reserved.
+#
+# This software is distributed WITHOUT ANY WARRANTY; without
+# even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE.
+#
+# See LICENSE
+
+import unittest
+
+from hyppopy.SolverPool import SolverPool
+from hyppopy.HyppopyProject import HyppopyProject
+from hyppopy.solvers.HyperbandSolver import *
+
+
+def budget_loss(x, y, budget):
+    # low budgets give a noisy, biased estimate of the true loss x**2 + y**2
+    return x**2 + y**2 + 10.0 / budget
+
+
+class HyperbandTestSuite(unittest.TestCase):
+
+    def setUp(self):
+        self.config = {
+            "hyperparameter": {
+                "x": {
+                    "domain": "uniform",
+                    "data": [-10.0, 10.0],
+                    "type": float
+                },
+                "y": {
+                    "domain": "uniform",
+                    "data": [-10.0, 10.0],
+                    "type": float
+                }
+            },
+            "max_budget": 27
+        }
+
+    def test_schedule(self):
+        schedule = hyperband_schedule(81, 1, 3)
+        self.assertEqual(len(schedule), 5)
+        self.assertEqual([n for n, r in schedule[0]], [81, 27, 9, 3, 1])
+        self.assertEqual([r for n, r in schedule[0]], [1, 3, 9, 27, 81])
+        self.assertEqual(schedule[-1], [(5, 81)])
+        for bracket in schedule:
+            self.assertEqual(bracket[-1][1], 81)
+        self.assertEqual(hyperband_schedule(81, 1, 3, brackets=1), schedule[:1])
+        self.assertEqual(len(hyperband_schedule(8.0, 1.0, 2, brackets=10)), 4)
+
+    def test_solver(self):
+        budgets = []
+
+        def loss(x, y, budget):
+            budgets.append(budget)
+            return budget_loss(x, y, budget)
+
+        solver = SolverPool.get("hyperband", HyppopyProject(self.config))
+        self.assertTrue(isinstance(solver, HyperbandSolver))
+        solver.blackbox = loss
+        solver.run(print_stats=False)
+        df, best = solver.get_results()
+        schedule = hyperband_schedule(27, 1, 3)
+        self.assertEqual(len(df), sum(n for bracket in schedule for n, r in bracket))
+        self.assertEqual(sorted(set(budgets)), [1, 3, 9, 27])
+        self.assertTrue(all(isinstance(b, int) for b in budgets))
+        self.assertEqual(sorted(best.keys()), ['x', 'y'])
+        full = df[df['budget'] == 27]
+        self.assertAlmostEqual(full['losses'].min(), budget_loss(best['x'], best['y'], 27))
+        self.assertTrue(all(df['status']))
+
+    def test_successive_halving(self):
+        self.config["brackets"] = 1
+        self.config["eta"] = 2
+        self.config["max_budget"] = 8.0
+        self.config["budget_name"] = "epochs"
+        solver = SolverPool.get("hyperband", HyppopyProject(self.config))
+        solver.blackbox = lambda x, y, epochs: budget_loss(x, y, epochs)
+        solver.run(print_stats=False)
+        df, best = solver.get_results()
+        self.assertEqual(list(df.groupby('epochs').size()), [8, 4, 2, 1])
+        # promoted candidates keep their parameters
+        self.assertTrue(set(df[df['epochs'] == 8.0]['x']) <= set(df[df['epochs'] == 4.0]['x']))
+
+    def test_budget_name_collision(self):
+        self.config["budget_name"] = "x"
+        self.assertRaises(LookupError, SolverPool.get, "hyperband", HyppopyProject(self.config))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,181 @@
+# Hyppopy - A Hyper-Parameter Optimization Toolbox
+#
+# Copyright (c) German Cancer Research Center,
+# Division of Medical Image Computing.
+# All rights reserved.
+#
+# This software is distributed WITHOUT ANY WARRANTY; without
+# even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE.
+#
+# See LICENSE
+
+import os
+import unittest
+
+from hyppopy.HyppopyProject import HyppopyProject
+from hyppopy.SolverPool import SolverPool
+from hyppopy.LocalCommunicator import LocalCommunicator, LocalRankError, run_local
+from hyppopy.solvers.MPISolverWrapper import MPISolverWrapper, WorkerCommand
+from hyppopy.solvers.MPIWorkerPool import MPIWorkerPool
+
+
+CONFIG = {
+    "hyperparameter": {
+        "x": {
+            "domain": "uniform",
+            "data": [-10.0, 10.0],
+            "type": float
+        },
+        "y": {
+            "domain": "uniform",
+            "data": [-10.0, 10.0],
+            "type": float
+        }
+    },
+    "max_iterations": 40
+}
+
+
+def pid_loss(x, y):
+    # the master never evaluates, so the loss tells which process computed it
+    return float(os.getpid())
+
+
+def square_loss(x, y):
+    return x**2 + y**2
+
+
+def ping_pong(comm):
+    if comm.Get_rank() == 0:
+        for dest in range(1, comm.Get_size()):
+            comm.send(dest * 10, dest=dest, tag=1)
+        return sorted([comm.recv(source=source, tag=2) for source in range(1, comm.Get_size())])
+    value = comm.recv(source=0, tag=1)
+    comm.send(value + comm.Get_rank(), dest=0, tag=2)
+
+
+def crashing_ping_pong(comm):
+    if comm.Get_rank() == 2:
+        raise ValueError("worker crashed")
+    return ping_pong(comm)
+
+
+def crash_after_master(comm):
+    if comm.Get_rank() == 1:
+        comm.recv(source=0, tag=1)
+        raise ValueError("worker crashed")
+    comm.send(None, dest=1, tag=1)
+    return "done"
+
+
+def run_wrapper(comm):
+    solver = MPISolverWrapper(solver=SolverPool.get("randomsearch", HyppopyProject(CONFIG)), mpi_comm=comm)
+    solver.blackbox = pid_loss
+    solver.run(print_stats=False)
+    return solver.get_results()
+
+
+def run_unknown_command(comm):
+    pool = MPIWorkerPool(mpi_comm=comm)
+    pool.register_blackbox("square", square_loss)
+    pool.start()
+    if pool.is_master():
+        results = []
+        pool.send_to_workers(WorkerCommand('foo'))
+        solver = SolverPool.get("randomsearch", HyppopyProject(CONFIG))
+        try:
+            pool.run(solver, print_stats=False)
+        except AssertionError:
+            # all trials failed, the solver finds no best parameter set
+            pass
+        results.append(solver.trials.trials)
+        # a valid command brings the workers back
+        pool.send_to_workers(WorkerCommand('select_blackbox', "square"))
+        solver = pool.run(SolverPool.get("randomsearch", HyppopyProject(CONFIG)), print_stats=False)
+        results.append(solver.trials.trials)
+        pool.shutdown()
+        return results
+
+
+def run_pool(comm):
+    pool = MPIWorkerPool(mpi_comm=comm)
+    pool.register_blackbox("pid", pid_loss)
+    pool.register_blackbox("square", square_loss)
+    pool.start()
+    if pool.is_master():
+        results = []
+        for name in ["pid", "square", "pid"]:
+            solver = pool.run(SolverPool.get("randomsearch", HyppopyProject(CONFIG)), blackbox=name, print_stats=False)
+            results.append(solver.get_results()[0])
+        pool.shutdown()
+        return results
+
+
+class LocalCommunicatorTestSuite(unittest.TestCase):
+
+    def setUp(self):
+        pass
+
+    def test_send_recv(self):
+        self.assertEqual(run_local(ping_pong, 4), [11, 22, 33])
+
+    def test_message_order(self):
+        queues = [[], []]
+
+        class ListQueue(object):
+            def __init__(self, items):
+                self._items = items
+
+            def put(self, item):
+                self._items.append(item)
+
+            def get(self):
+                return self._items.pop(0)
+
+        comm0 = LocalCommunicator(0, [ListQueue(queues[0]), ListQueue(queues[1])])
+        comm1 = LocalCommunicator(1, [ListQueue(queues[0]), ListQueue(queues[1])])
+        comm1.send("a", dest=0, tag=1)
+        comm1.send("b", dest=0, tag=2)
+        comm1.send("c", dest=0, tag=1)
+        self.assertEqual(comm0.recv(source=1, tag=2), "b")
+        self.assertEqual(comm0.recv(source=1, tag=1), "a")
+        self.assertEqual(comm0.recv(), "c")
+        self.assertEqual(comm0.Get_size(), 2)
+        self.assertEqual(comm1.Get_rank(), 1)
+
+    def test_crashing_rank(self):
+        with self.assertRaises(LocalRankError) as cm:
+            run_local(crashing_ping_pong, 3)
+        self.assertTrue("Local rank 2 failed: ValueError: worker crashed" in str(cm.exception))
+        with self.assertRaises(LocalRankError):
+            run_local(crash_after_master, 2)
+
+    def test_solverwrapper(self):
+        df, best = run_local(run_wrapper, 3)
+        self.assertEqual(len(df), CONFIG["max_iterations"])
+        self.assertTrue(all(df['status']))
+        self.assertFalse(float(os.getpid()) in list(df['losses']))
+        self.assertEqual(len(set(df['losses'])), 2)
+
+    def test_workerpool(self):
+        results = run_local(run_pool, 3)
+        self.assertEqual(len(results), 3)
+        self.assertEqual(set(results[0]['losses']), set(results[2]['losses']))
+        for df in results:
+            self.assertEqual(len(df), CONFIG["max_iterations"])
+            self.assertTrue(all(df['status']))
+        self.assertTrue(all(results[1]['losses'] <= 200.0))
+
+    def test_unknown_command(self):
+        failed, recovered = run_local(run_unknown_command, 3)
+        self.assertEqual(len(failed), CONFIG["max_iterations"])
+        for trial in failed:
+            self.assertEqual(trial['result']['status'], 'failed')
+            self.assertTrue("Unknown worker command WorkerCommand(foo, None)" in trial['result']['error'])
+        self.assertEqual(len(recovered), CONFIG["max_iterations"])
+        self.assertTrue(all(trial['result']['status'] == 'ok' for trial in recovered))
+
+
+if __name__ == '__main__':
+    unittest.main()
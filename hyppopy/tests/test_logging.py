@@ -0,0 +1,95 @@
+# Hyppopy - A Hyper-Parameter Optimization Toolbox
+#
+# Copyright (c) German Cancer Research Center,
+# Division of Medical Image Computing.
+# All rights reserved.
+#
+# This software is distributed WITHOUT ANY WARRANTY; without
+# even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE.
+#
+# See LICENSE
+
+import os
+import sys
+import logging
+import unittest
+import subprocess
+
+import hyppopy.globals
+from hyppopy.globals import set_log_level, LazyFormat
+from hyppopy.SolverPool import SolverPool
+from hyppopy.HyppopyProject import HyppopyProject
+from hyppopy.BlackboxFunction import BlackboxFunction
+from hyppopy.solvers import RandomsearchSolver
+
+
+class LoggingTestSuite(unittest.TestCase):
+
+    def tearDown(self):
+        set_log_level(logging.WARNING)
+
+    def test_set_log_level(self):
+        set_log_level("debug")
+        self.assertEqual(hyppopy.globals.DEBUGLEVEL, logging.DEBUG)
+        self.assertEqual(RandomsearchSolver.LOG.level, logging.DEBUG)
+        set_log_level(logging.ERROR)
+        self.assertEqual(RandomsearchSolver.LOG.level, logging.ERROR)
+        self.assertRaises(ValueError, set_log_level, "foo")
+
+    def test_environment(self):
+        code = "import hyppopy.solvers.RandomsearchSolver as m; print(m.LOG.level)"
+        env = dict(os.environ)
+        env["HYPPOPY_LOGLEVEL"] = "info"
+        out = subprocess.check_output([sys.executable, "-c", code], env=env, universal_newlines=True)
+        self.assertEqual(int(out), logging.INFO)
+        env["HYPPOPY_LOGLEVEL"] = "foo"
+        out = subprocess.check_output([sys.executable, "-c", code], env=env, universal_newlines=True)
+        self.assertEqual(int(out), logging.WARNING)
+
+    def test_lazy_format(self):
+        calls = []
+
+        def expensive(x):
+            calls.append(x)
+            return "formatted {}".format(x)
+
+        set_log_level(logging.WARNING)
+        RandomsearchSolver.LOG.debug("message %s", LazyFormat(expensive, 1))
+        self.assertEqual(calls, [])
+        set_log_level(logging.DEBUG)
+        with self.assertLogs(RandomsearchSolver.LOG, logging.DEBUG) as cm:
+            RandomsearchSolver.LOG.debug("message %s", LazyFormat(expensive, 2))
+        self.assertEqual(calls, [2])
+        self.assertTrue(cm.output[0].endswith("message formatted 2"))
+
+    def test_evaluation_hooks(self):
+        config = {"hyperparameter": {"x": {"domain": "uniform", "data": [-1.0, 1.0], "type": float}},
+                  "max_iterations": 20}
+        records = []
+        callbacks = []
+        solver = SolverPool.get("randomsearch", HyppopyProject(config))
+        solver.add_evaluation_hook(records.append)
+        solver.blackbox = BlackboxFunction(blackbox_func=lambda x: x**2,
+                                           callback_func=lambda **kwargs: callbacks.append(kwargs))
+        solver.run(print_stats=False)
+        self.assertEqual(len(records), 20)
+        self.assertEqual(records, callbacks)
+        self.assertEqual([r['iterations'] for r in records], list(range(1, 21)))
+        self.assertTrue(all(r['loss'] == r['x']**2 and r['status'] == 'ok' for r in records))
+
+        solver.remove_evaluation_hook(records.append)
+        solver.run(print_stats=False)
+        self.assertEqual(len(records), 20)
+        self.assertRaises(AssertionError, solver.add_evaluation_hook, "foo")
+
+        # the HyperoptSolver evaluates via its own loss_function
+        solver = SolverPool.get("hyperopt", HyppopyProject(config))
+        solver.add_evaluation_hook(records.append)
+        solver.blackbox = lambda x: x**2
+        solver.run(print_stats=False)
+        self.assertEqual(len(records), 40)
+
+
+if __name__ == '__main__':
+    unittest.main()
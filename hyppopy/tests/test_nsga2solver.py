@@ -0,0 +1,109 @@
+# Hyppopy - A Hyper-Parameter Optimization Toolbox
+#
+# Copyright (c) German Cancer Research Center,
+# Division of Medical Image Computing.
+# All rights reserved.
+#
+# This software is distributed WITHOUT ANY WARRANTY; without
+# even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE.
+#
+# See LICENSE
+
+import unittest
+import numpy as np
+
+from hyppopy.SolverPool import SolverPool
+from hyppopy.HyppopyProject import HyppopyProject
+from hyppopy.LocalCommunicator import run_local
+from hyppopy.solvers.MPISolverWrapper import MPISolverWrapper
+from hyppopy.solvers.NSGA2Solver import NSGA2Solver
+
+
+def zdt1_config(dims, max_iterations):
+    hyperparameter = {"x{}".format(d): {"domain": "uniform", "data": [0.0, 1.0], "type": float} for d in range(dims)}
+    return {"hyperparameter": hyperparameter, "max_iterations": max_iterations}
+
+
+def zdt1(**params):
+    x = np.array([params["x{}".format(d)] for d in range(len(params))])
+    g = 1 + 9 * np.mean(x[1:])
+    return [x[0], g * (1 - np.sqrt(x[0] / g))]
+
+
+def run_mpi(comm):
+    solver = MPISolverWrapper(solver=SolverPool.get("nsga2", HyppopyProject(zdt1_config(4, 60))), mpi_comm=comm)
+    solver.blackbox = zdt1
+    solver.run(print_stats=False)
+    return solver.get_results()
+
+
+class NSGA2TestSuite(unittest.TestCase):
+
+    def setUp(self):
+        np.random.seed(11)
+
+    def test_solver(self):
+        config = zdt1_config(5, 2000)
+        config["population_size"] = 40
+        solver = SolverPool.get("nsga2", HyppopyProject(config))
+        self.assertTrue(isinstance(solver, NSGA2Solver))
+        batches = []
+        loss_function_batch = solver.loss_function_batch
+        solver.loss_function_batch = lambda candidates: batches.append(len(candidates)) or \
+            loss_function_batch(candidates)
+        solver.blackbox = zdt1
+        solver.run(print_stats=False)
+        df, best = solver.get_results()
+        self.assertEqual(len(df), 2000)
+        self.assertEqual(batches, [40] * 50)
+        # the optimal front of ZDT1 is f2 = 1 - sqrt(f1), its hypervolume w.r.t. (1, 1) is 2/3
+        self.assertTrue(solver.pareto_front.hypervolume([1.0, 1.0]) > 0.55)
+
+        random_solver = SolverPool.get("randomsearch", HyppopyProject(zdt1_config(5, 2000)))
+        random_solver.blackbox = zdt1
+        random_solver.run(print_stats=False)
+        self.assertTrue(solver.pareto_front.hypervolume([1.0, 1.0]) >
+                        random_solver.pareto_front.hypervolume([1.0, 1.0]))
+
+        front = solver.get_pareto_front()
+        self.assertEqual(len(front), len(solver.pareto_front))
+        self.assertTrue(df['pareto'].sum() == len(front))
+
+    def test_mixed_space(self):
+        config = {"hyperparameter": {"lr": {"domain": "loguniform", "data": [1e-4, 1.0], "type": float},
+                                     "n": {"domain": "uniform", "data": [1, 10], "type": int},
+                                     "act": {"domain": "categorical", "data": ["relu", "tanh"], "type": str}},
+                  "max_iterations": 100, "population_size": 10}
+        solver = SolverPool.get("nsga2", HyppopyProject(config))
+        solver.blackbox = lambda lr, n, act: [abs(np.log10(lr) + 2) + (act == "relu"), float(n)]
+        solver.run(print_stats=False)
+        df, best = solver.get_results()
+        self.assertEqual(len(df), 100)
+        self.assertTrue(all(isinstance(n, (int, np.integer)) and 1 <= n <= 10 for n in df['n']))
+        self.assertEqual(set(df['act']), {"relu", "tanh"})
+        front = solver.get_pareto_front()
+        self.assertTrue(all(front['loss_1'] >= 1))
+
+    def test_small_budgets(self):
+        for max_iterations, population_size, expected in [(1, 20, [1]), (3, 20, [3]), (5, 1, [2, 2, 1])]:
+            config = zdt1_config(2, max_iterations)
+            config["population_size"] = population_size
+            solver = SolverPool.get("nsga2", HyppopyProject(config))
+            batches = []
+            loss_function_batch = solver.loss_function_batch
+            solver.loss_function_batch = lambda candidates: batches.append(len(candidates)) or \
+                loss_function_batch(candidates)
+            solver.blackbox = zdt1
+            solver.run(print_stats=False)
+            self.assertEqual(batches, expected)
+            self.assertEqual(len(solver.get_results()[0]), max_iterations)
+
+    def test_mpi(self):
+        df, best = run_local(run_mpi, 3)
+        self.assertEqual(len(df), 60)
+        self.assertTrue(df['pareto'].sum() > 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
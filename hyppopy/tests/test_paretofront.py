@@ -0,0 +1,107 @@
+# Hyppopy - A Hyper-Parameter Optimization Toolbox
+#
+# Copyright (c) German Cancer Research Center,
+# Division of Medical Image Computing.
+# All rights reserved.
+#
+# This software is distributed WITHOUT ANY WARRANTY; without
+# even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE.
+#
+# See LICENSE
+
+import unittest
+import numpy as np
+
+from hyppopy.SolverPool import SolverPool
+from hyppopy.HyppopyProject import HyppopyProject
+from hyppopy.ParetoFront import *
+
+
+def brute_force_front(F):
+    return sorted(i for i in range(len(F)) if not any(dominates(F[j], F[i]) for j in range(len(F))))
+
+
+def two_objectives(x, y):
+    return [x**2 + y**2, (x - 1.0)**2 + y**2]
+
+
+class ParetoFrontTestSuite(unittest.TestCase):
+
+    def setUp(self):
+        np.random.seed(7)
+
+    def test_dominates(self):
+        self.assertTrue(dominates([1, 2], [1, 3]))
+        self.assertFalse(dominates([1, 3], [1, 3]))
+        self.assertFalse(dominates([0, 4], [1, 3]))
+
+    def test_non_dominated_sort(self):
+        F = np.round(np.random.uniform(size=(200, 3)), 1)
+        fronts = non_dominated_sort(F)
+        self.assertEqual(sorted(np.concatenate(fronts).tolist()), list(range(200)))
+        self.assertEqual(sorted(fronts[0].tolist()), brute_force_front(F))
+        remaining = np.ones(200, dtype=bool)
+        for front in fronts:
+            indices = np.where(remaining)[0]
+            expected = indices[brute_force_front(F[indices])]
+            self.assertEqual(sorted(front.tolist()), sorted(expected.tolist()))
+            remaining[front] = False
+
+    def test_crowding_distance(self):
+        distance = crowding_distance(np.array([[0.0, 4.0], [1.0, 2.0], [3.0, 1.0], [4.0, 0.0]]))
+        self.assertTrue(np.isinf(distance[0]) and np.isinf(distance[3]))
+        self.assertAlmostEqual(distance[1], 3.0 / 4.0 + 3.0 / 4.0)
+        self.assertAlmostEqual(distance[2], 3.0 / 4.0 + 2.0 / 4.0)
+
+    def test_incremental_front(self):
+        F = np.random.uniform(size=(300, 2))
+        front = ParetoFront()
+        for n, f in enumerate(F):
+            front.add(n, f)
+        self.assertEqual(sorted(front.ids), brute_force_front(F))
+        self.assertFalse(front.add(300, F[front.ids[0]]))
+        self.assertFalse(front.add(301, [np.nan, 0.0]))
+        self.assertTrue(front.add(302, [-1.0, -1.0]))
+        self.assertEqual(front.ids, [302])
+        self.assertAlmostEqual(front.hypervolume([1.0, 1.0]), 4.0)
+        self.assertTrue(front.add(303, [-2.0, 2.0]))
+        self.assertAlmostEqual(front.hypervolume([1.0, 1.0]), 4.0)
+
+    def test_best_compromise(self):
+        F = np.array([[0.0, 10.0], [4.0, 4.0], [10.0, 0.0], [5.0, 5.0], [np.nan, 0.0]])
+        self.assertEqual(best_compromise(F), 1)
+        self.assertIsNone(best_compromise(np.full((2, 2), np.nan)))
+
+    def test_randomsearch(self):
+        config = {"hyperparameter": {"x": {"domain": "uniform", "data": [-1.0, 2.0], "type": float},
+                                     "y": {"domain": "uniform", "data": [-1.0, 1.0], "type": float}},
+                  "max_iterations": 50}
+        solver = SolverPool.get("randomsearch", HyppopyProject(config))
+        solver.blackbox = two_objectives
+        solver.run(print_stats=False)
+        df, best = solver.get_results()
+        self.assertEqual(len(df), 50)
+        self.assertEqual(len(df['losses'][0]), 2)
+        losses = np.array(df['losses'].tolist())
+        self.assertEqual(sorted(np.where(df['pareto'])[0].tolist()), brute_force_front(losses))
+        front = solver.get_pareto_front()
+        self.assertEqual(len(front), int(df['pareto'].sum()))
+        self.assertEqual(sorted(front.columns.tolist()), ['loss_0', 'loss_1', 'x', 'y'])
+        self.assertTrue(np.all(np.diff(front['loss_0']) >= 0))
+        self.assertTrue(any(best['x'] == x and best['y'] == y for x, y in zip(front['x'], front['y'])))
+
+    def test_scalar_results_unchanged(self):
+        config = {"hyperparameter": {"x": {"domain": "uniform", "data": [-1.0, 2.0], "type": float}},
+                  "max_iterations": 10}
+        solver = SolverPool.get("randomsearch", HyppopyProject(config))
+        solver.blackbox = lambda x: x**2
+        solver.run(print_stats=False)
+        df, best = solver.get_results()
+        self.assertFalse('pareto' in df.columns)
+        self.assertEqual(len(solver.pareto_front), 0)
+        self.assertEqual(len(solver.get_pareto_front()), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
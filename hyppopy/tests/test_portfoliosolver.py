@@ -0,0 +1,96 @@
+# Hyppopy - A Hyper-Parameter Optimization Toolbox
+#
+# Copyright (c) German Cancer Research Center,
+# Division of Medical Image Computing.
+# All rights reserved.
+#
+# This software is distributed WITHOUT ANY WARRANTY; without
+# even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE.
+#
+# See LICENSE
+
+import unittest
+import numpy as np
+
+from hyppopy.SolverPool import SolverPool
+from hyppopy.HyppopyProject import HyppopyProject
+from hyppopy.solvers.PortfolioSolver import PortfolioSolver
+
+
+def sphere_config(max_iterations, solvers):
+    return {"hyperparameter": {"x": {"domain": "uniform", "data": [-5.0, 5.0], "type": float},
+                               "y": {"domain": "uniform", "data": [-5.0, 5.0], "type": float}},
+            "max_iterations": max_iterations,
+            "solvers": solvers}
+
+
+def counting_blackbox(calls):
+    def blackbox(x, y):
+        calls.append((x, y))
+        return (x - 1.0)**2 + (y + 2.0)**2
+    return blackbox
+
+
+class PortfolioTestSuite(unittest.TestCase):
+
+    def setUp(self):
+        np.random.seed(3)
+
+    def test_solver(self):
+        calls = []
+        solver = SolverPool.get("portfolio", HyppopyProject(sphere_config(60, ["randomsearch", "hyperopt", "optuna"])))
+        self.assertTrue(isinstance(solver, PortfolioSolver))
+        solver.blackbox = counting_blackbox(calls)
+        solver.run(print_stats=False)
+        df, best = solver.get_results()
+        self.assertEqual(len(df), 60)
+        self.assertEqual(len(calls), 60)
+        self.assertEqual(len(set(calls)), 60)
+        self.assertEqual(set(df['solver']), {"randomsearch", "hyperopt", "optuna"})
+        stats = solver.portfolio_stats
+        self.assertEqual(sum(s['evaluations'] for s in stats.values()), 60)
+        self.assertTrue(all(s['evaluations'] >= 5 for s in stats.values()))
+        self.assertAlmostEqual(min(s['best'] for s in stats.values()), df['losses'].min())
+        self.assertAlmostEqual((best['x'] - 1.0)**2 + (best['y'] + 2.0)**2, df['losses'].min())
+
+    def test_shared_cache(self):
+        # both members propose the same 9 grid points, each point is evaluated once and the budget is not spent
+        config = sphere_config(80, ["gridsearch", "gridsearch"])
+        config["hyperparameter"]["x"]["frequency"] = 3
+        config["hyperparameter"]["y"]["frequency"] = 3
+        config["warmup"] = 3
+        calls = []
+        solver = SolverPool.get("portfolio", HyppopyProject(config))
+        solver.blackbox = counting_blackbox(calls)
+        solver.run(print_stats=False)
+        df, best = solver.get_results()
+        self.assertEqual(len(calls), 9)
+        self.assertEqual(len(set(calls)), 9)
+        self.assertEqual(len(df), 9)
+        self.assertEqual(sum(s['cache_hits'] for s in solver.portfolio_stats.values()), 9)
+
+    def test_bandit_prefers_improving_member(self):
+        config = sphere_config(100, ["randomsearch", "cmaes"])
+        config["hyperparameter"]["x"]["data"] = [-50.0, 50.0]
+        config["hyperparameter"]["y"]["data"] = [-50.0, 50.0]
+        solver = SolverPool.get("portfolio", HyppopyProject(config))
+        solver.blackbox = counting_blackbox([])
+        solver.run(print_stats=False)
+        stats = solver.portfolio_stats
+        self.assertTrue(stats["cmaes"]["evaluations"] > stats["randomsearch"]["evaluations"])
+
+    def test_parallel(self):
+        config = sphere_config(40, ["randomsearch", "quasirandomsearch", "optuna"])
+        config["max_parallel"] = 3
+        calls = []
+        solver = SolverPool.get("portfolio", HyppopyProject(config))
+        solver.blackbox = counting_blackbox(calls)
+        solver.run(print_stats=False)
+        df, best = solver.get_results()
+        self.assertEqual(len(df), 40)
+        self.assertEqual(len(calls), 40)
+
+
+if __name__ == '__main__':
+    unittest.main()
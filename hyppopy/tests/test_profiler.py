@@ -0,0 +1,128 @@
+# Hyppopy - A Hyper-Parameter Optimization Toolbox
+#
+# Copyright (c) German Cancer Research Center,
+# Division of Medical Image Computing.
+# All rights reserved.
+#
+# This software is distributed WITHOUT ANY WARRANTY; without
+# even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE.
+#
+# See LICENSE
+
+import os
+import json
+import time
+import pstats
+import shutil
+import tempfile
+import unittest
+
+from hyppopy.SolverPool import SolverPool
+from hyppopy.HyppopyProject import HyppopyProject
+from hyppopy.BlackboxFunction import BlackboxFunction
+from hyppopy.Profiler import PHASES, PhaseProfiler
+
+
+def sphere_config(solver, max_iterations):
+    return {"hyperparameter": {"x": {"domain": "uniform", "data": [-1.0, 1.0], "type": float},
+                               "y": {"domain": "uniform", "data": [-1.0, 1.0], "type": float}},
+            "max_iterations": max_iterations,
+            "solver": solver}
+
+
+def slow_sphere(x, y):
+    time.sleep(0.002)
+    return x**2 + y**2
+
+
+class ProfilerTestSuite(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_phase(self):
+        profiler = PhaseProfiler(trace=True)
+        for _ in range(3):
+            with profiler.phase("blackbox"):
+                time.sleep(0.001)
+        report = profiler.report()
+        self.assertEqual(report['phases']['blackbox']['count'], 3)
+        self.assertTrue(report['phases']['blackbox']['total'] >= 0.003)
+        self.assertAlmostEqual(report['overhead'], 0.0)
+
+    def test_randomsearch(self):
+        solver = SolverPool.get(project=HyppopyProject(sphere_config("randomsearch", 50)))
+        solver.profiler = PhaseProfiler()
+        hook_calls = []
+        solver.add_evaluation_hook(hook_calls.append)
+        solver.blackbox = slow_sphere
+        solver.run(print_stats=False)
+        report = solver.profiler.report()
+        phases = report['phases']
+        for name in ["convert_searchspace", "candidate_generation", "blackbox", "bookkeeping", "callbacks", "solver"]:
+            self.assertTrue(name in phases, name)
+        self.assertEqual(phases['blackbox']['count'], 50)
+        self.assertEqual(phases['bookkeeping']['count'], 50)
+        self.assertEqual(phases['callbacks']['count'], 50)
+        self.assertTrue(phases['blackbox']['total'] >= 0.1)
+        self.assertTrue(sum(p['total'] for p in phases.values()) <= report['wall'] * 1.01)
+        self.assertTrue(all(name in PHASES for name in phases))
+
+    def test_model_based_solvers(self):
+        for name, phases in [("gaussianprocess", ["candidate_generation", "model_update"]),
+                             ("cmaes", ["candidate_generation", "model_update"]),
+                             ("optuna", ["solver"]),
+                             ("hyperopt", ["solver"])]:
+            solver = SolverPool.get(project=HyppopyProject(sphere_config(name, 20)))
+            solver.profiler = PhaseProfiler()
+            solver.blackbox = lambda x, y: x**2 + y**2
+            solver.run(print_stats=False)
+            report = solver.profiler.report()
+            self.assertEqual(report['phases']['blackbox']['count'], 20, name)
+            for phase in phases:
+                self.assertTrue(report['phases'][phase]['total'] > 0, (name, phase))
+
+    def test_vectorized_blackbox(self):
+        solver = SolverPool.get(project=HyppopyProject(sphere_config("randomsearch", 30)))
+        solver.profiler = PhaseProfiler()
+        solver.blackbox = BlackboxFunction(blackbox_func=lambda batch: batch["x"]**2 + batch["y"]**2, vectorized=True)
+        solver.run(print_stats=False)
+        self.assertEqual(solver.profiler.report()['phases']['blackbox']['count'], 1)
+
+    def test_trace_and_cprofile(self):
+        solver = SolverPool.get(project=HyppopyProject(sphere_config("randomsearch", 10)))
+        solver.profiler = PhaseProfiler(trace=True, cprofile=True)
+        solver.blackbox = slow_sphere
+        solver.run(print_stats=False)
+
+        trace = os.path.join(self.root, "trace.json")
+        solver.profiler.write_chrome_trace(trace)
+        with open(trace) as f:
+            events = json.load(f)["traceEvents"]
+        self.assertEqual(sum(e["name"] == "blackbox" for e in events), 10)
+        self.assertEqual(sum(e["name"] == "execute_solver" for e in events), 1)
+        self.assertTrue(all(e["ph"] == "X" and e["dur"] >= 0 for e in events))
+
+        dump = os.path.join(self.root, "run.prof")
+        solver.profiler.dump_cprofile(dump)
+        stats = pstats.Stats(dump)
+        self.assertTrue(any(func[2] == "slow_sphere" for func in stats.stats))
+
+        self.assertRaises(AssertionError, PhaseProfiler().write_chrome_trace, trace)
+        self.assertRaises(AssertionError, PhaseProfiler().dump_cprofile, dump)
+
+    def test_disabled(self):
+        solver = SolverPool.get(project=HyppopyProject(sphere_config("randomsearch", 10)))
+        self.assertIsNone(solver.profiler)
+        solver.blackbox = lambda x, y: x**2 + y**2
+        solver.run(print_stats=False)
+        self.assertIsNone(solver.profiler)
+        self.assertRaises(AssertionError, setattr, solver, "profiler", "foo")
+
+
+if __name__ == '__main__':
+    unittest.main()
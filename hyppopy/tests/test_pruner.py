@@ -0,0 +1,143 @@
+# Hyppopy - A Hyper-Parameter Optimization Toolbox
+#
+# Copyright (c) German Cancer Research Center,
+# Division of Medical Image Computing.
+# All rights reserved.
+#
+# This software is distributed WITHOUT ANY WARRANTY; without
+# even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE.
+#
+# See LICENSE
+
+import unittest
+
+from hyppopy.SolverPool import SolverPool
+from hyppopy.HyppopyProject import HyppopyProject
+from hyppopy.BlackboxFunction import BlackboxFunction
+from hyppopy.Pruner import *
+
+
+class PrunerTestSuite(unittest.TestCase):
+
+    def setUp(self):
+        self.steps = []
+        self.config = {
+            "hyperparameter": {
+                "x": {
+                    "domain": "uniform",
+                    "data": [0.0, 10.0],
+                    "type": float
+                }
+            },
+            "max_iterations": 30
+        }
+
+    def blackbox(self):
+        steps = self.steps
+
+        def learning_curve(x, reporter):
+            # the loss decreases per step towards x, trials with a large x are hopeless early on
+            loss = None
+            for step in range(10):
+                loss = x + 10.0 / (step + 1)
+                reporter.report(step, loss)
+                steps.append(step)
+                if reporter.should_prune():
+                    raise TrialPruned()
+            return loss
+        return learning_curve
+
+    def test_median_pruner(self):
+        pruner = MedianPruner(n_startup_trials=2)
+        for n, offset in enumerate([0.0, 2.0]):
+            reporter = TrialReporter(pruner, n)
+            for step in range(3):
+                reporter.report(step, offset + 3 - step)
+            self.assertFalse(reporter.should_prune())
+            reporter.complete()
+
+        reporter = TrialReporter(pruner, 2)
+        reporter.report(0, 10.0)
+        self.assertTrue(reporter.should_prune())
+        self.assertEqual(reporter.last_value, 10.0)
+
+        reporter = TrialReporter(pruner, 3)
+        reporter.report(0, 1.0)
+        self.assertFalse(reporter.should_prune())
+
+        pruner.reset()
+        reporter = TrialReporter(pruner, 4)
+        reporter.report(0, 10.0)
+        self.assertFalse(reporter.should_prune())
+
+    def test_percentile_pruner(self):
+        pruner = PercentilePruner(percentile=10.0, n_startup_trials=4, n_warmup_steps=1)
+        for n in range(4):
+            reporter = TrialReporter(pruner, n)
+            reporter.report(0, float(n))
+            reporter.report(1, float(n))
+            reporter.complete()
+        reporter = TrialReporter(pruner, 4)
+        reporter.report(0, 1.0)
+        self.assertFalse(reporter.should_prune())
+        reporter.report(1, 1.0)
+        self.assertTrue(reporter.should_prune())
+        self.assertFalse(TrialReporter(None).should_prune())
+
+    def test_accepts_reporter(self):
+        self.assertTrue(accepts_reporter(self.blackbox()))
+        self.assertFalse(accepts_reporter(lambda x: x))
+        self.assertTrue(accepts_reporter(BlackboxFunction(blackbox_func=self.blackbox())))
+
+    def test_randomsearch(self):
+        solver = SolverPool.get("randomsearch", HyppopyProject(self.config))
+        solver.blackbox = self.blackbox()
+        solver.pruner = MedianPruner(n_startup_trials=5)
+        solver.run(print_stats=False)
+        df, best = solver.get_results()
+        self.assertEqual(len(df), 30)
+        # pruned trials are not ok but keep their last reported loss
+        self.assertTrue(len(df[~df['status']]) > 0)
+        self.assertTrue(all(df['losses'].notna()))
+        self.assertTrue(len(self.steps) < 300)
+        self.assertEqual(sum(t['result']['status'] == 'pruned' for t in solver.trials.trials), len(df[~df['status']]))
+        # only the completed trials are kept as reference
+        self.assertEqual(solver.pruner._running, {})
+        self.assertEqual(len(solver.pruner._completed), len(df[df['status']]))
+
+    def test_failing_trial(self):
+        def failing_curve(x, reporter):
+            reporter.report(0, x)
+            raise ValueError("diverged")
+        solver = SolverPool.get("randomsearch", HyppopyProject(dict(self.config, max_iterations=5)))
+        solver.blackbox = failing_curve
+        solver.pruner = MedianPruner()
+        with self.assertRaises(AssertionError):
+            solver.run(print_stats=False)
+        self.assertEqual(len(solver.trials.trials), 5)
+        self.assertEqual(solver.pruner._running, {})
+        self.assertEqual(solver.pruner._completed, [])
+
+    def test_optuna(self):
+        solver = SolverPool.get("optuna", HyppopyProject(self.config))
+        solver.blackbox = self.blackbox()
+        solver.run(print_stats=False)
+        df, best = solver.get_results()
+        self.assertEqual(len(df), 30)
+        self.assertTrue(len(self.steps) < 300)
+        self.assertTrue(0.0 <= best['x'] <= 10.0)
+
+    def test_hyperopt(self):
+        solver = SolverPool.get("hyperopt", HyppopyProject(self.config))
+        solver.blackbox = self.blackbox()
+        solver.pruner = MedianPruner(n_startup_trials=5)
+        solver.run(print_stats=False)
+        df, best = solver.get_results()
+        self.assertEqual(len(df), 30)
+        self.assertTrue(len(self.steps) < 300)
+        self.assertTrue(0.0 <= best['x'] <= 10.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+# Hyppopy - A Hyper-Parameter Optimization Toolbox
+#
+# Copyright (c) German Cancer Research Center,
+# Division of Medical Image Computing.
+# All rights reserved.
+#
+# This software is distributed WITHOUT ANY WARRANTY; without
+# even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE.
+#
+# See LICENSE
+
+import os
+import copy
+import json
+import shutil
+import tempfile
+import unittest
+
+from hyppopy.benchmark.SolverBenchmark import benchmark_solver, run_benchmarks, compare_results, main
+
+
+class SolverBenchmarkTestSuite(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_benchmark_solver(self):
+        result = benchmark_solver("randomsearch", "3D", max_iterations=30, repeats=2, target_gap=1.0)
+        self.assertEqual(len(result["runs"]), 2)
+        self.assertEqual([run["seed"] for run in result["runs"]], [0, 1])
+        self.assertEqual(result["evaluations"], 30)
+        self.assertTrue(result["overhead_per_iteration"] > 0)
+        self.assertTrue(result["throughput"] > 0)
+        self.assertTrue(result["memory_peak"] > 0)
+        # the whole value range is below the target, the first evaluation reaches it
+        self.assertEqual(result["iterations_to_target"], 1)
+        self.assertEqual(result["reached"], 1.0)
+        self.assertEqual(result["runs"][0]["best_loss"],
+                         benchmark_solver("randomsearch", "3D", 30, 1, target_gap=1.0, memory=False)["best_loss"])
+
+    def test_run_and_compare(self):
+        result = run_benchmarks(solvers=["randomsearch", "hyperopt", "foo"], functions=["5D"], max_iterations=20,
+                                repeats=1, memory=False)
+        result = json.loads(json.dumps(result))
+        self.assertEqual(result["meta"]["settings"]["max_iterations"], 20)
+        self.assertEqual([r["solver"] for r in result["results"]], ["randomsearch", "hyperopt", "foo"])
+        self.assertEqual(result["results"][1]["evaluations"], 20)
+        self.assertTrue("error" in result["results"][2])
+        self.assertEqual(compare_results(result, result), [])
+
+        slower = copy.deepcopy(result)
+        slower["results"][0]["overhead_per_iteration"] *= 2
+        slower["results"][0]["throughput"] /= 2
+        regressions = compare_results(result, slower, tolerance=0.4)
+        self.assertEqual(sorted(r["metric"] for r in regressions), ["overhead_per_iteration", "throughput"])
+
+    def test_main(self):
+        output = os.path.join(self.root, "benchmark.json")
+        result, regressions = main(["--solvers", "randomsearch", "--iterations", "10", "--repeats", "1",
+                                    "--no-memory", "--output", output])
+        with open(output) as f:
+            self.assertEqual(json.load(f)["results"][0]["evaluations"], 10)
+        _, regressions = main(["--input", output, "--baseline", output])
+        self.assertEqual(regressions, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
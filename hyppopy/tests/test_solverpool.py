@@ -10,7 +10,11 @@
 #
 # See LICENSE
 
+import sys
 import unittest
+import subprocess
+from unittest import mock
+from importlib.metadata import EntryPoint
 
 from hyppopy.SolverPool import SolverPool
 from hyppopy.HyppopyProject import HyppopyProject
@@ -36,6 +40,13 @@ class SolverPoolTestSuite(unittest.TestCase):
         self.assertTrue("randomsearch" in names)
         self.assertTrue("quasirandomsearch" in names)
         self.assertTrue("gridsearch" in names)
+        self.assertTrue("hyperband" in names)
+        self.assertTrue("asha" in names)
+        self.assertTrue("gaussianprocess" in names)
+        self.assertTrue("cmaes" in names)
+        self.assertTrue("designofexperiments" in names)
+        self.assertTrue("nsga2" in names)
+        self.assertTrue("portfolio" in names)
 
     def test_getHyperoptSolver(self):
         config = {
@@ -287,3 +298,28 @@ class SolverPoolTestSuite(unittest.TestCase):
         solver = SolverPool.get("gridsearch")
 
         self.assertRaises(AssertionError, SolverPool.get, "foo")
+
+    def test_lazyImport(self):
+        code = "import sys, hyppopy.SolverPool; print(','.join(m for m in ['optuna', 'hyperopt', 'optunity', 'scipy', " \
+               "'pandas'] if m in sys.modules))"
+        out = subprocess.check_output([sys.executable, "-c", code], universal_newlines=True)
+        self.assertEqual(out.strip(), "")
+
+    def test_register(self):
+        SolverPool.register("myrandomsearch", RandomsearchSolver)
+        SolverPool.register("myquasirandomsearch", "hyppopy.solvers.QuasiRandomsearchSolver:QuasiRandomsearchSolver")
+        self.assertTrue("myrandomsearch" in SolverPool.get_solver_names())
+        self.assertTrue(isinstance(SolverPool.get("myrandomsearch"), RandomsearchSolver))
+        self.assertTrue(isinstance(SolverPool.get("myquasirandomsearch"), QuasiRandomsearchSolver))
+        self.assertRaises(AssertionError, SolverPool.register, "foo", "hyppopy.solvers.RandomsearchSolver")
+
+    def test_entryPoints(self):
+        entry_points = [EntryPoint("pluginsolver", "hyppopy.solvers.RandomsearchSolver:RandomsearchSolver",
+                                   "hyppopy.solvers"),
+                        EntryPoint("optuna", "hyppopy.solvers.RandomsearchSolver:RandomsearchSolver",
+                                   "hyppopy.solvers")]
+        SolverPool._entry_points_loaded = False
+        with mock.patch("hyppopy.SolverPool._solver_entry_points", return_value=entry_points):
+            self.assertTrue("pluginsolver" in SolverPool.get_solver_names())
+        self.assertTrue(isinstance(SolverPool.get("pluginsolver"), RandomsearchSolver))
+        self.assertTrue(isinstance(SolverPool.get("optuna"), OptunaSolver))
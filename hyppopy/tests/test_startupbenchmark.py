@@ -0,0 +1,46 @@
+# Hyppopy - A Hyper-Parameter Optimization Toolbox
+#
+# Copyright (c) German Cancer Research Center,
+# Division of Medical Image Computing.
+# All rights reserved.
+#
+# This software is distributed WITHOUT ANY WARRANTY; without
+# even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE.
+#
+# See LICENSE
+
+import sys
+import unittest
+import subprocess
+
+from hyppopy.benchmark.StartupBenchmark import measure_import_time
+
+
+class StartupBenchmarkTestSuite(unittest.TestCase):
+
+    def test_lazy_dependencies(self):
+        code = "import sys, logging, hyppopy.solvers.RandomsearchSolver, hyppopy.FunctionSimulator; " \
+               "print(','.join(m for m in ['matplotlib', 'visdom', 'pandas'] if m in sys.modules)); " \
+               "print(all(getattr(h, 'stream', None) is None for h in logging.root.handlers))"
+        out = subprocess.check_output([sys.executable, "-c", code], universal_newlines=True).split("\n")
+        self.assertEqual(out[0], "")
+        # the log file is opened on the first record, not at import time
+        self.assertEqual(out[1], "True")
+
+    def test_measure_import_time(self):
+        result = measure_import_time("hyppopy.CandidateDescriptor", repeats=2, top=3)
+        self.assertEqual(len(result["times"]), 2)
+        self.assertTrue(result["median"] > 0)
+        self.assertTrue(result["import_time"] < result["median"])
+        self.assertEqual(result["heavy_modules"], [])
+        self.assertTrue(len(result["slowest_imports"]) <= 3)
+        self.assertTrue(any(entry["module"] == "hyppopy.CandidateDescriptor" for entry in result["slowest_imports"]))
+
+    def test_solver_heavy_modules(self):
+        result = measure_import_time("hyppopy.solvers.RandomsearchSolver", repeats=1, top=1)
+        self.assertFalse(set(result["heavy_modules"]) & {"matplotlib", "visdom", "pandas"})
+
+
+if __name__ == '__main__':
+    unittest.main()
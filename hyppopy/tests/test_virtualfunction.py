@@ -11,11 +11,18 @@
 # See LICENSE
 
 import os
+import shutil
+import tempfile
 import unittest
 import numpy as np
+from unittest import mock
 
+from hyppopy import FunctionSimulator as module
 from hyppopy.FunctionSimulator import FunctionSimulator
 from hyppopy.globals import TESTDATA_DIR
+from hyppopy.SolverPool import SolverPool
+from hyppopy.HyppopyProject import HyppopyProject
+from hyppopy.BlackboxFunction import BlackboxFunction
 
 
 class FunctionSimulatorTestSuite(unittest.TestCase):
@@ -88,6 +95,93 @@ class FunctionSimulatorTestSuite(unittest.TestCase):
 
         self.assertAlmostEqual(minima, gt)
 
+    def test_evaluate_batch(self):
+        vfunc = FunctionSimulator()
+        vfunc.load_images(os.path.join(TESTDATA_DIR, 'functionsimulator'))
+        axis = np.array(vfunc.axis, dtype=float)
+        X = axis[:, 0] + np.random.rand(200, 5) * (axis[:, 1] - axis[:, 0])
+        X = np.vstack([X, axis[:, 0], axis[:, 1]])
+        losses = vfunc.evaluate_batch(X)
+        self.assertEqual(losses.shape, (202,))
+        for x, loss in zip(X, losses):
+            self.assertAlmostEqual(vfunc(*x), loss)
+        self.assertEqual(vfunc.evaluate_batch(np.zeros((0, 5))).shape, (0,))
+
+        X[3, 2] = axis[2, 1] + 1
+        self.assertRaises(AssertionError, vfunc.evaluate_batch, X)
+        self.assertRaises(AssertionError, vfunc.evaluate_batch, X[:, :4])
+
+    def test_vectorized_blackbox(self):
+        vfunc = FunctionSimulator()
+        vfunc.load_default("5D")
+        config = {"hyperparameter": {"axis_{}".format(str(i).zfill(2)): {"domain": "uniform", "data": [0, 1],
+                                                                          "type": float} for i in range(5)},
+                  "max_iterations": 50}
+        solver = SolverPool.get("randomsearch", HyppopyProject(config))
+        solver.blackbox = BlackboxFunction(blackbox_func=vfunc.evaluate_batch, vectorized=True, batch_format='array')
+        solver.run(print_stats=False)
+        df, best = solver.get_results()
+        self.assertEqual(len(df), 50)
+        self.assertAlmostEqual(df['losses'].min(), vfunc(**best))
+
+    def test_cache(self):
+        root = tempfile.mkdtemp()
+        try:
+            path = os.path.join(root, 'functionsimulator')
+            shutil.copytree(os.path.join(TESTDATA_DIR, 'functionsimulator'), path,
+                            ignore=shutil.ignore_patterns(".functionsimulator.npz"))
+            cachedir = os.path.join(root, "cache")
+            local_cache = os.path.join(path, ".functionsimulator.npz")
+            with mock.patch.object(module, "FUNCTIONSIMULATOR_CACHEDIR", cachedir):
+                reference = FunctionSimulator()
+                reference.load_images(path, cache=False)
+                self.assertFalse(os.path.isdir(cachedir))
+
+                vfunc = FunctionSimulator()
+                vfunc.load_images(path)
+                self.assertEqual(len(os.listdir(os.path.join(cachedir, "functionsimulator"))), 1)
+                self.assertFalse(os.path.isfile(local_cache))
+                with mock.patch.object(FunctionSimulator, "sample_image") as sample_image:
+                    cached = FunctionSimulator()
+                    cached.load_images(path)
+                    mapped = FunctionSimulator()
+                    mapped.load_images(path, mmap_mode='r')
+                self.assertEqual(sample_image.call_count, 0)
+                for f in [vfunc, cached, mapped]:
+                    self.assertTrue(np.array_equal(f.data, reference.data))
+                    self.assertEqual(f.axis, reference.axis)
+                    self.assertEqual(f.config.sections(), reference.config.sections())
+                self.assertTrue(isinstance(mapped.data, np.memmap))
+                self.assertEqual(mapped(0.5, 0, 10, -10, 7), reference(0.5, 0, 10, -10, 7))
+
+                # a changed image invalidates the cache
+                os.utime(os.path.join(path, "plot_01.png"), ns=(0, 0))
+                with mock.patch.object(FunctionSimulator, "sample_image", wraps=cached.sample_image) as sample_image:
+                    FunctionSimulator().load_images(path)
+                self.assertEqual(sample_image.call_count, 5)
+
+                # the image folder is used if the cache dir is not writable
+                shutil.rmtree(cachedir)
+                savez = np.savez
+                calls = []
+
+                def read_only(f, **kwargs):
+                    calls.append(f.name)
+                    if len(calls) == 1:
+                        raise PermissionError("read-only")
+                    savez(f, **kwargs)
+
+                with mock.patch.object(module.np, "savez", side_effect=read_only):
+                    FunctionSimulator().load_images(path)
+                self.assertEqual(len(calls), 2)
+                self.assertEqual(os.listdir(os.path.join(cachedir, "functionsimulator")), [])
+                self.assertTrue(os.path.isfile(local_cache))
+                with mock.patch.object(FunctionSimulator, "sample_image") as sample_image:
+                    FunctionSimulator().load_images(path)
+                self.assertEqual(sample_image.call_count, 0)
+        finally:
+            shutil.rmtree(root)
+
 
 if __name__ == '__main__':
     unittest.main()